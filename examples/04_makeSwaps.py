@@ -60,6 +60,11 @@ print("Transaction cost:", gas_infos[1],"ETH") # In the provided Python code sni
 
 print()
 
+#Or sell in one call: approves the swapper first if needed and sends the swap right behind the approve
+status, txHash, gas_infos = BS.sellToken(BS.get_token_balance())
+print(status, txHash, gas_infos)
+print()
+
 
 print(
 f"""
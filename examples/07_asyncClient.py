@@ -0,0 +1,23 @@
+import asyncio
+from pyBaseSwap import AsyncBaseSwap
+
+TOKENS = [
+    "0x65e570b560027F493f2b1907e8e8e3B9546053bD", #Tyler Token
+    "0x833589fcd6edb6e08f4c7c32d4f71b54bda02913", #USDC
+    "0x4200000000000000000000000000000000000006", #WETH
+]
+
+async def main():
+    # The `AsyncBaseSwap` mirrors `BaseSwap`, but every RPC method is a coroutine
+    BS = await AsyncBaseSwap.create(settings_file_path="./Settings.json")
+
+    # All price reads are in flight at the same time on one event loop
+    prices = await asyncio.gather(*[BS.getUSDPriceOf(token) for token in TOKENS])
+    for token, price in zip(TOKENS, prices):
+        print(token, price, "$")
+
+    BS.changeToken(TOKENS[0]) # no RPC request needed
+    print(await BS.get_token_Name(), await BS.getLiquidityUSD(), "$ Liquidity")
+    await BS.close()
+
+asyncio.run(main())
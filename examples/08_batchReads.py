@@ -0,0 +1,26 @@
+from pyBaseSwap import BaseSwap
+
+BS = BaseSwap()
+
+TYLER = "0x65e570b560027F493f2b1907e8e8e3B9546053bD" #Tyler Token
+DOLA = "0x4621b7A9c75199271F773Ebd9A499dbd165c3191" #Dola USD Stablecoin (DOLA)
+
+# Every read added to a batch is packed into one Multicall3 eth_call
+price, liquidity, decimals, symbol, ethBalance = (
+    BS.batch()
+    .getUSDPriceOf(TYLER)
+    .getLiquidityUSD(TYLER)
+    .decimals(DOLA)
+    .symbol(DOLA)
+    .getETHBalanceOf("0x304eC59cad4060856D6796Ff948fA3f5Adb322fa")
+    .execute()
+)
+
+print(
+f"""
+Tyler Price: {BS.custom_round(price)} $
+Tyler Liquidity: {BS.custom_round(liquidity)} $
+{symbol} Decimals: {decimals}
+Wallet ETH Balance: {BS.custom_round(ethBalance)}
+"""
+)
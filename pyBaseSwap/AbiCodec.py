@@ -0,0 +1,136 @@
+from web3 import Web3
+from eth_abi import abi
+from eth_utils import function_abi_to_4byte_selector
+
+
+class AbiCodec:
+    """
+    Offline encoder/decoder for the functions of a contract ABI.
+
+    Selectors and argument/return type lists are computed once per ABI, so encoding a
+    call is a plain `eth_abi.encode` without the lookups web3's contract objects do.
+
+    Attributes:
+        functions (dict): Function name -> (selector, input types, output types).
+    """
+
+    _codecs = {}  # id(abi) -> AbiCodec, the ABIs in core_abis are module constants
+
+    def __init__(self, contract_abi: list):
+        """
+        Builds the selector and type tables of an ABI.
+
+        Args:
+            contract_abi (list): Contract ABI as found in `core_abis`.
+        """
+        self.functions = {}
+        for entry in contract_abi:
+            if entry.get("type") == "function" and entry["name"] not in self.functions:
+                self.functions[entry["name"]] = (
+                    function_abi_to_4byte_selector(entry),
+                    self.types(entry["inputs"]),
+                    self.types(entry["outputs"])
+                )
+
+    @classmethod
+    def of(cls, contract_abi: list):
+        """
+        Returns the shared codec of an ABI, building it on first use.
+
+        Args:
+            contract_abi (list): Contract ABI as found in `core_abis`.
+
+        Returns:
+            AbiCodec: The codec for that ABI.
+        """
+        codec = cls._codecs.get(id(contract_abi))
+        if codec is None:
+            codec = cls._codecs[id(contract_abi)] = cls(contract_abi)
+        return codec
+
+    @staticmethod
+    def types(params: list) -> list:
+        """
+        Converts ABI parameter entries into `eth_abi` type strings (tuples included).
+
+        Args:
+            params (list): The `inputs` or `outputs` of an ABI entry.
+
+        Returns:
+            list: Type strings such as `['address', 'uint256[]', '(address,bool,bytes)[]']`.
+        """
+        out = []
+        for param in params:
+            if param["type"].startswith("tuple"):
+                out.append("(" + ",".join(AbiCodec.types(param["components"])) + ")" + param["type"][5:])
+            else:
+                out.append(param["type"])
+        return out
+
+    def selector(self, name: str) -> bytes:
+        """
+        Returns the 4 byte selector of a function.
+        """
+        return self.functions[name][0]
+
+    def encode(self, name: str, args: list = ()) -> bytes:
+        """
+        Encodes the calldata of a function call.
+
+        Args:
+            name (str): Function name.
+            args (list, optional): Function arguments.
+
+        Returns:
+            bytes: Selector followed by the ABI encoded arguments.
+        """
+        selector, input_types, _ = self.functions[name]
+        return selector + abi.encode(input_types, list(args))
+
+    def transaction(self, name: str, args: list, to: str, sender: str, value: int = 0, **fields) -> dict:
+        """
+        Builds a raw transaction dict for a function call without any RPC request, ready to be
+        completed with `gas`, `gasPrice`/fee fields, `nonce` and `chainId` and signed locally.
+
+        Args:
+            name (str): Function name.
+            args (list): Function arguments.
+            to (str): Contract address.
+            sender (str): Sender address.
+            value (int, optional): ETH value in wei. Defaults to 0.
+            **fields: Further transaction fields, e.g. `gasPrice` or `chainId`.
+
+        Returns:
+            dict: The transaction with `from`, `to`, `value` and `data` set.
+        """
+        return {"from": sender, "to": to, "value": int(value), "data": Web3.to_hex(self.encode(name, args)), **fields}
+
+    def decode(self, name: str, data: bytes):
+        """
+        Decodes the return data of a function call the same way `ContractFunction.call()` does:
+        addresses are checksummed, arrays are lists, single return values are unwrapped.
+
+        Args:
+            name (str): Function name.
+            data (bytes): Raw return data.
+
+        Returns:
+            The decoded value, or a list of values for functions with several outputs.
+        """
+        output_types = self.functions[name][2]
+        values = [self.normalize(t, v) for t, v in zip(output_types, abi.decode(output_types, bytes(data)))]
+        if len(values) == 1:
+            return values[0]
+        return values
+
+    @staticmethod
+    def normalize(abi_type: str, value):
+        """
+        Checksums addresses and turns array tuples into lists.
+        """
+        if abi_type == "address":
+            return Web3.to_checksum_address(value)
+        if abi_type.endswith("]"):
+            inner = abi_type[:abi_type.rindex("[")]
+            return [AbiCodec.normalize(inner, v) for v in value]
+        return value
@@ -0,0 +1,111 @@
+import threading
+from hexbytes import HexBytes
+from web3 import Web3
+
+
+class AllowanceCache:
+    """
+    Process-wide cache of the spenders a wallet has max-approved, per token.
+
+    Only unlimited approvals are kept: they are not consumed by swaps, so once an allowance
+    is known to be unlimited it never has to be read again. Finite allowances shrink with
+    every `transferFrom` and are always read from the chain. Entries come from allowance
+    reads, from the wallet's own approvals (set when the approve is sent, dropped if it
+    fails) and from `Approval` events, which also drop revoked or lowered approvals.
+
+    Attributes:
+        UNLIMITED (int): Allowances from this value on count as unlimited.
+        APPROVAL_TOPIC (str): Topic of the ERC-20 `Approval(owner, spender, value)` event.
+    """
+
+    UNLIMITED = 2**255
+    APPROVAL_TOPIC = Web3.to_hex(Web3.keccak(text="Approval(address,address,uint256)"))
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._approved = set()  # (chain_id, token, owner, spender) of unlimited approvals
+        self._synced = {}  # (chain_id, owner) -> last block whose Approval events were applied
+        self.hits = self.misses = 0
+
+    @staticmethod
+    def key(chain_id, token: str, owner: str, spender: str) -> tuple:
+        """
+        Returns the cache key of an allowance.
+        """
+        return int(chain_id), Web3.to_checksum_address(token), Web3.to_checksum_address(owner), Web3.to_checksum_address(spender)
+
+    def approved(self, key) -> bool:
+        """
+        Returns True if the spender is known to be max-approved, no RPC is needed then.
+        - `key`: The cache key.
+        """
+        with self._lock:
+            if key in self._approved:
+                self.hits += 1
+                return True
+            self.misses += 1
+            return False
+
+    def set(self, key, allowance: int):
+        """
+        Stores a read or sent allowance, only unlimited ones are kept.
+        - `key`: The cache key.
+        - `allowance`: The allowance in wei.
+        """
+        with self._lock:
+            if int(allowance) >= self.UNLIMITED:
+                self._approved.add(key)
+            else:
+                self._approved.discard(key)
+
+    def invalidate(self, chain_id=None, token: str = None, owner: str = None):
+        """
+        Drops cached approvals, all of them or the ones of a token and/or owner.
+        - `chain_id`: Drop only the approvals of this chain (optional).
+        - `token`: Drop only the approvals of this token (optional).
+        - `owner`: Drop only the approvals of this wallet (optional).
+        """
+        token = Web3.to_checksum_address(token) if token else None
+        owner = Web3.to_checksum_address(owner) if owner else None
+        with self._lock:
+            self._approved = {
+                key for key in self._approved
+                if not ((chain_id is None or key[0] == int(chain_id)) and (token is None or key[1] == token) and (owner is None or key[2] == owner))
+            }
+
+    def applyLogs(self, chain_id, logs: list):
+        """
+        Applies `Approval` event logs, in chain order.
+        - `chain_id`: Chain ID of the logs.
+        - `logs`: Raw or decoded logs with the `Approval` topic.
+        """
+        for log in logs:
+            topics = [Web3.to_hex(HexBytes(topic)) for topic in log["topics"]]  # Hex strings of raw logs, bytes of decoded ones
+            if len(topics) != 3 or topics[0] != self.APPROVAL_TOPIC:
+                continue
+            data = log["data"]
+            value = int(data, 16) if isinstance(data, str) else int.from_bytes(data, "big")
+            key = self.key(chain_id, log["address"], "0x" + topics[1][-40:], "0x" + topics[2][-40:])
+            self.set(key, value)
+
+    def checkpoint(self, chain_id, owner: str):
+        """
+        Returns the last block whose `Approval` events of a wallet were applied, None if never synced.
+        """
+        return self._synced.get((int(chain_id), Web3.to_checksum_address(owner)))
+
+    def setCheckpoint(self, chain_id, owner: str, block: int):
+        """
+        Records that the `Approval` events of a wallet were applied up to a block.
+        """
+        self._synced[(int(chain_id), Web3.to_checksum_address(owner))] = int(block)
+
+    def stats(self) -> dict:
+        """
+        Returns the hit and miss counters and the number of cached approvals.
+        """
+        with self._lock:
+            return {"hits": self.hits, "misses": self.misses, "approvals": len(self._approved)}
+
+
+ALLOWANCES = AllowanceCache()  # Shared by every client in the process
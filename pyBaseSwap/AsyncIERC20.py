@@ -0,0 +1,200 @@
+from web3 import Web3
+from .core_abis import IERC20_ABI  # Import the ERC-20 ABI
+from .TokenMetadataCache import TOKEN_METADATA  # Process-wide cache for decimals, name and symbol
+from .GasModel import GasModel  # Learned gas limits of known transaction shapes
+from .AllowanceCache import ALLOWANCES  # Process-wide cache of unlimited approvals
+from .AbiCodec import AbiCodec  # Offline calldata encoder
+
+
+class AsyncIERC20:
+    """
+    Async counterpart of `IERC20` for interacting with ERC-20 token contracts through `AsyncWeb3`.
+
+    Every method that talks to the chain is a coroutine, so many reads can be awaited
+    concurrently on one event loop.
+
+    Attributes:
+        settings: Core settings for managing RPC connection and user account.
+        user_address (str): User's wallet address from settings.
+        priv_key (str): User's private key for signing transactions.
+        w3 (AsyncWeb3): AsyncWeb3 instance for blockchain interaction.
+        token (str): ERC-20 token contract address.
+        w3U: Async utility object for helper functions.
+        chain: Chain instance associated with the current network.
+        token_Instance: Async contract instance of the ERC-20 token.
+    """
+
+    def __init__(self, settings, w3, token, w3U, chain):
+        """
+        Initializes the AsyncIERC20 class for interacting with ERC-20 tokens.
+        - `settings`: Core settings for managing RPC connection and user account.
+        - `w3`: AsyncWeb3 instance for blockchain interaction.
+        - `token`: ERC-20 token address.
+        - `w3U`: Async utility class for helper functions like converting Wei.
+        - `chain`: Chain setup of the connected network (resolved once by the caller, no RPC here).
+        """
+        self.settings = settings  # Store settings object
+        self.user_address = settings.settings["address"]  # User's wallet address from settings
+        self.priv_key = settings.settings["private_key"]  # User's private key for signing transactions
+        self.w3 = w3  # AsyncWeb3 instance for blockchain connection
+        self.token = token  # ERC-20 token contract address
+        self.w3U = w3U  # Utility object for helper functions
+        self.chain = chain  # Chain setup of the connected network
+        self.token_Instance = self.init_token_instance()  # Initialize the ERC-20 contract instance
+
+    def init_token_instance(self):
+        """
+        Initializes and returns the async ERC-20 contract instance.
+        """
+        token_Instance = self.w3.eth.contract(
+            address=Web3.to_checksum_address(self.token), abi=IERC20_ABI)  # Create contract instance with token address and ABI
+        return token_Instance
+
+    async def get_token_balanceOf(self, address):
+        """
+        Returns the balance of the token in a human-readable format (converted from Wei).
+        - `address`: Address to check the balance for.
+        """
+        return self.w3U.from_wei(await self.get_token_balance_(address), await self.get_token_decimals())
+
+    async def get_token_balanceOf_(self, address):
+        """
+        Returns the balance of the token in Wei.
+        - `address`: Address to check the balance for.
+        """
+        return await self.get_token_balance_(address)
+
+    async def get_token_balance(self):
+        """
+        Returns the user's token balance in a human-readable format (converted from Wei).
+        """
+        return self.w3U.from_wei(await self.get_token_balance_(self.user_address), await self.get_token_decimals())
+
+    async def get_token_balance_(self, address=None):
+        """
+        Returns the token balance in Wei for a specific address.
+        - `address`: Address to check the balance for (defaults to the user's own address).
+        """
+        address = address or self.user_address
+        return await self.token_Instance.functions.balanceOf(Web3.to_checksum_address(address)).call()
+
+    def get_token_address(self):
+        """
+        Returns the token's contract address.
+        """
+        return Web3.to_checksum_address(self.token_Instance.address)  # Convert to checksum address format
+
+    async def get_token_decimals(self):
+        """
+        Returns the number of decimals for the token (cached process-wide).
+        """
+        return await self.get_token_metadata("decimals")
+
+    async def get_token_Name(self):
+        """
+        Returns the name of the token (cached process-wide).
+        """
+        return await self.get_token_metadata("name")
+
+    async def get_token_Symbol(self):
+        """
+        Returns the symbol of the token (cached process-wide).
+        """
+        return await self.get_token_metadata("symbol")
+
+    async def get_token_metadata(self, field):
+        """
+        Returns a metadata field of the token from the metadata cache, fetching it on a miss.
+        - `field`: One of `decimals`, `name`, `symbol`.
+        """
+        value = TOKEN_METADATA.get(self.chain.chainID, self.token, field)
+        if value is None:
+            value = await getattr(self.token_Instance.functions, field)().call()
+            TOKEN_METADATA.set(self.chain.chainID, self.token, **{field: value})
+        return value
+
+    async def get_token_allowance_(self, spender):
+        """
+        Returns the token allowance for a spender in Wei.
+        - `spender`: Address of the spender.
+        """
+        return await self.token_Instance.functions.allowance(self.user_address, Web3.to_checksum_address(spender)).call()
+
+    async def get_token_allowance(self, spender):
+        """
+        Returns the token allowance for a specific spender in a human-readable format (converted from Wei).
+        - `spender`: Address of the spender to check allowance for.
+        """
+        return self.w3U.from_wei(await self.get_token_allowance_(spender), await self.get_token_decimals())
+
+    async def sync_allowances(self):
+        """
+        Applies the `Approval` events of the wallet since the last sync to the allowance cache,
+        for all tokens, with one `eth_getLogs` request. The first call only sets the starting block.
+        """
+        head = await self.w3.eth.block_number
+        start = ALLOWANCES.checkpoint(self.chain.chainID, self.user_address)
+        if start is not None and head > start:
+            logs = await self.w3.eth.get_logs({
+                "fromBlock": start + 1,
+                "toBlock": head,
+                "topics": [ALLOWANCES.APPROVAL_TOPIC, "0x" + "00" * 12 + self.user_address[2:].lower()]
+            })
+            ALLOWANCES.applyLogs(self.chain.chainID, logs)
+        ALLOWANCES.setCheckpoint(self.chain.chainID, self.user_address, head)
+
+    async def approveSwapper_(self, amount):
+        """
+        Approves an amount in Wei for the Swapper contract to spend tokens.
+        - `amount`: Amount to approve in Wei.
+        """
+        return await self.approve(self.chain.BTTSwapper, amountIn=amount)
+
+    async def approveSwapper(self, amount):
+        """
+        Approves a specific amount for the Swapper contract to spend, converting from a human-readable format to Wei.
+        - `amount`: Amount to approve.
+        """
+        return await self.approve(self.chain.BTTSwapper, self.w3U.to_wei(amount, await self.get_token_decimals()))
+
+    async def is_approved(self, spender, amountIn):
+        """
+        Checks if the spender is already approved for a given amount. Spenders known to be
+        max-approved are answered from the allowance cache without an RPC request.
+        - `spender`: Address of the spender.
+        - `amountIn`: Amount to check for approval (in Wei).
+        """
+        key = ALLOWANCES.key(self.chain.chainID, self.token, self.user_address, spender)
+        if ALLOWANCES.approved(key):
+            return True
+        allowance = await self.get_token_allowance_(spender)  # Get current allowance for spender
+        ALLOWANCES.set(key, allowance)
+        return int(allowance) >= int(amountIn)
+
+    async def _approveTransaction(self, spender, amount: int):
+        """
+        Builds an approve transaction offline with the current fee fields, gas and nonce are set when it is sent.
+        - `spender`: Address of the spender.
+        - `amount`: Amount to approve in Wei.
+        """
+        return AbiCodec.of(IERC20_ABI).transaction(
+            "approve", [Web3.to_checksum_address(spender), int(amount)], self.token, self.user_address,
+            chainId=self.chain.chainID, **await self.w3U.getFees()
+        )
+
+    async def approve(self, spender, amountIn: int = 0):
+        """
+        Approves the spender to spend a specified amount of tokens on the user's behalf.
+        - `spender`: Address of the spender.
+        - `amountIn`: Amount to approve (default is 0, meaning full approval).
+        """
+        if not await self.is_approved(spender, amountIn):
+            approveAmount = 2**256 - 1  # Set the approval amount to max (2^256 - 1)
+            if amountIn > 0:
+                approveAmount = amountIn  # Use the specified amount if it's greater than 0
+            txn = await self._approveTransaction(spender, approveAmount)
+            result = await self.w3U.signAndSend(txn, GasModel.key(self.chain.chainID, "approve", [self.token]))
+            ALLOWANCES.set(ALLOWANCES.key(self.chain.chainID, self.token, self.user_address, spender), approveAmount if result[0] else 0)
+            return result
+        else:
+            return True, "0", "Already Approved"  # Return if already approved
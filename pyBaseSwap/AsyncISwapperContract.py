@@ -0,0 +1,964 @@
+import asyncio
+from web3 import Web3
+from eth_abi import abi
+from .core_abis import BTTSwapper_ABI
+from .TokenMetadataCache import TOKEN_METADATA
+from .Multicall import AsyncMulticallBatch
+from .ISwapperContract import InterfaceSwapperContract
+from .WalletAssets import WalletAssets
+from .RouteCache import ROUTES, RouteCache
+from .NonceManager import AsyncNonceManager
+from .AbiCodec import AbiCodec
+from .DryRun import DryRun, SwapSimulation
+from .RetryPolicy import RetryPolicy
+from .GasModel import GasModel
+from .AllowanceCache import ALLOWANCES
+
+
+class AsyncInterfaceSwapperContract: #AISC
+    """
+    Async counterpart of `InterfaceSwapperContract` built on `AsyncWeb3`.
+
+    Every read and every swap is a coroutine, so quotes for many tokens and several
+    swaps can be in flight on a single event loop.
+    """
+
+    def __init__(self, settings, w3, IERC20, w3U, chain):
+        """
+        Initializes the AsyncInterfaceSwapperContract instance with AsyncWeb3 and token contract information.
+
+        :param settings: Object containing configuration and user settings.
+        :param w3: AsyncWeb3 instance to interact with Ethereum-like blockchain.
+        :param IERC20: Async interface for interacting with ERC20 tokens.
+        :param w3U: Async utility functions for Web3-related conversions.
+        :param chain: Chain setup of the connected network (resolved once by the caller, no RPC here).
+        """
+        self.settings, self.user_address, self.priv_key, self.w3, self.IERC20, self.w3U = settings, settings.settings["address"], settings.settings["private_key"], w3, IERC20, w3U
+        self.chain = chain
+        self.BTTSwapper = self.initRouter()
+
+    def initRouter(self):
+        """
+        Initializes and returns the async swapper smart contract.
+
+        :return: AsyncWeb3 contract instance of the swapper.
+        """
+        BTTSwapper = self.w3.eth.contract(
+            address=self.chain.BTTSwapper, abi=BTTSwapper_ABI)
+        return BTTSwapper
+
+    def batch(self):
+        """
+        Starts a batch of reads that is executed with a single `eth_call` through Multicall3.
+
+        Example:
+            price, liquidity, decimals = await BS.batch().getUSDPriceOf(a).getLiquidityUSD(b).decimals(c).execute()
+
+        :return: An empty AsyncMulticallBatch bound to this interface.
+        """
+        return AsyncMulticallBatch(self)
+
+    async def getAmountsOutV3(self, pools, path, amountIn):
+        """
+        Fetches the amount of tokens obtainable from a V3 swap route.
+
+        :param pools: List of pool addresses involved in the V3 swap.
+        :param path: Token addresses specifying the swap path.
+        :param amountIn: Input amount of tokens.
+        :return: The output token amount for the given input and path.
+        """
+        return await self._swapperRead("getAmountsOutV3", [pools, path, amountIn])
+
+    async def getAmountsOutV2(self, amountIn, path, dexPath):
+        """
+        Fetches the amount of tokens obtainable from a V2 swap route.
+
+        :param amountIn: Input amount of tokens.
+        :param path: Token addresses specifying the swap path.
+        :param dexPath: Decentralized exchanges involved in the swap.
+        :return: The output token amount for the given input and path.
+        """
+        return await self._swapperRead("getAmountsOutV2", [amountIn, path, dexPath])
+
+    async def getUSDPrice_(self):
+        """
+        Fetches the USD price of the current token from the contract (raw Wei format).
+
+        :return: Token price in USD (Wei).
+        """
+        return await self.BTTSwapper.functions.getUSDPrice(
+            self.IERC20.get_token_address()
+            ).call()
+
+    async def getUSDPrice(self):
+        """
+        Fetches the USD price of the current token and converts it to Ether format.
+
+        :return: Token price in USD (Ether).
+        """
+        return Web3.from_wei(await self.getUSDPrice_(), "mwei")
+
+    async def getUSDPriceOf(self, tokenAddress):
+        """
+        Fetches the USD price of a specified token and converts it to Ether format.
+
+        :param tokenAddress: Address of the token.
+        :return: Token price in USD (Ether).
+        """
+        return Web3.from_wei(await self.getUSDPriceOf_(tokenAddress), "mwei")
+
+    async def getUSDPriceOf_(self, tokenAddress):
+        """
+        Fetches the USD price of a specified token (raw Wei format).
+
+        :param tokenAddress: Address of the token.
+        :return: Token price in USD (Wei).
+        """
+        return await self.BTTSwapper.functions.getUSDPrice(
+            Web3.to_checksum_address(tokenAddress)
+            ).call()
+
+    async def getTokenETHPrice_(self, tokenAddress):
+        """
+        Fetches the ETH price of a specified token (raw Wei format).
+
+        :param tokenAddress: Address of the token.
+        :return: Token price in ETH (Wei).
+        """
+        return await self.BTTSwapper.functions.getETHPrice(
+            Web3.to_checksum_address(tokenAddress)
+            ).call()
+
+    async def getTokenETHPrice(self, tokenAddress):
+        """
+        Fetches the ETH price of a specified token (ether format).
+
+        :param tokenAddress: Address of the token.
+        :return: Token price in ETH (Ether).
+        """
+        return Web3.from_wei(await self.getTokenETHPrice_(tokenAddress), "ether")
+
+    async def getNativPrice_(self):
+        """
+        Fetches the USD price of Wrapped ETH (WETH) from the contract (raw Wei format).
+
+        :return: WETH price in USD (Wei).
+        """
+        return await self.BTTSwapper.functions.getUSDPrice(
+            self.chain.WETH).call()
+
+    async def getNativPrice(self):
+        """
+        Fetches the USD price of  ETH (WETH) and converts it to Ether format.
+
+        :return: WETH price in USD (Ether).
+        """
+        return Web3.from_wei(await self.getNativPrice_(), "mwei")
+
+    async def getAmountsOutTokenToETH_(self, inputAmount:int):
+        """
+        Fetches the output ETH amount when swapping from the current token to ETH.
+
+        :param inputAmount: Input token amount.
+        :return: Output amounts in Wei.
+        """
+        return await self._swapperRead("getAmountsOut", [
+            self.IERC20.get_token_address(),
+            self.chain.WETH,
+            inputAmount
+        ])
+
+    async def getAmountsOutETHToToken_(self, inputAmount:int):
+        """
+        Fetches the output token amount when swapping from ETH to the current token.
+
+        :param inputAmount: Input ETH amount.
+        :return: Output amounts in Wei.
+        """
+        return await self._swapperRead("getAmountsOut", [
+            self.chain.WETH,
+            self.IERC20.get_token_address(),
+            inputAmount
+        ])
+
+    async def getAmountsOutTokenToToken_(self, tokenIn, tokenOut, inputAmount:int):
+        """
+        Fetches the output token amount when swapping between two tokens.
+
+        :param tokenIn: Address of the input token.
+        :param tokenOut: Address of the output token.
+        :param inputAmount: Input token amount.
+        :return: Output amounts in Wei.
+        """
+        return await self._swapperRead("getAmountsOut", [
+            Web3.to_checksum_address(tokenIn),
+            Web3.to_checksum_address(tokenOut),
+            inputAmount
+        ])
+
+    async def getLiquidityUSD_(self):
+        """
+        Fetches the liquidity available for the current token in the USD pair (raw Wei format).
+
+        :return: Available liquidity in USD (Wei).
+        """
+        return await self.BTTSwapper.functions.getLiquidity(
+            self.IERC20.get_token_address()
+        ).call()
+
+    async def getLiquidityUSD(self):
+        """
+        Fetches the liquidity available for the current token in the USD pair and converts it to Ether.
+
+        :return: Available liquidity in USD (Ether).
+        """
+        return self.w3U.from_wei(await self.getLiquidityUSD_(), 6)
+
+    async def getSwapProtocollVersion(self):
+        """
+        Returns the swap protocol version used for the current token.
+
+        :return: Swap protocol version number.
+        """
+        return await self._cachedRoute(self.IERC20.get_token_address(), None, None, "checkVersion", [self.IERC20.get_token_address()])
+
+    async def getTokenInfos(self):
+        """
+        Fetches detailed token information including tax rates, honeypot status, etc.
+
+        :return: Tuple containing buy tax, sell tax, and honeypot status.
+        """
+        function_signature = self.BTTSwapper.encode_abi("getTokenInfos", args=[self.IERC20.get_token_address()])
+        data = {
+            "to": self.BTTSwapper.address,
+            "data": function_signature,
+            "from": self.chain.ZERO
+        }
+        _data = await self.w3.eth.call(data)
+        call = abi.decode(
+            ['uint256', 'uint256', 'uint256', 'uint256', 'bool', 'bool', 'bool', 'bool', 'string'],
+            _data
+        )
+        buy_tax = round(
+            ((call[0] - call[1]) / (call[0]) * 100) - 1, 3)
+        sell_tax = round(
+            ((call[2] - call[3]) / (call[2]) * 100) - 1, 3)
+
+        if call[4] and call[5] and call[6] and call[7] == True:
+            honeypot = False
+        else:
+            honeypot = True
+        return buy_tax, sell_tax, honeypot
+
+    async def getETHUSDPrice(self):
+        """
+        Fetches the USD price of ETH (WETH) in Ether format.
+
+        :return: ETH price in USD.
+        """
+        return Web3.from_wei(await self.BTTSwapper.functions.getUSDPrice(
+            self.chain.WETH
+            ).call(), "mwei")
+
+    async def getWalletTokenDATA(self, wallet_address:str, tokenList:list, columnar: bool = False):
+        """
+        Fetches wallet token data such as balances, decimals, prices for the provided list of tokens.
+        Breaks the calls into batches and requests all batches, the ETH price and the ETH balance
+        concurrently. The batch size is tuned like in the sync client, batches that revert are
+        split and sent again.
+
+        :param wallet_address: Wallet to fetch the holdings of.
+        :param tokenList: List of token addresses.
+        :param columnar: Return a `WalletAssets` with raw wei columns instead of dicts, values are formatted on access.
+        :returns: List of token data dicts (or `WalletAssets`) sorted by USD balance.
+        """
+        wallet_address = Web3.to_checksum_address(wallet_address)
+        tokenList = [Web3.to_checksum_address(address) for address in tokenList]
+        batchSize = self._walletBatchSize()
+        batches = [tokenList[i:i + batchSize] for i in range(0, len(tokenList), batchSize)]
+        ethPrice, ethBalance, *batchResults = await asyncio.gather(
+            self.getETHUSDPrice(),
+            self.getETHBalanceOf_(wallet_address),
+            *[self.BTTSwapper.functions.getWalletTokenDATA(wallet_address, tokenBatch).call() for tokenBatch in batches],
+            return_exceptions=True
+        )
+        for result in (ethPrice, ethBalance):
+            if isinstance(result, Exception):
+                raise result
+        if columnar:
+            assets = await self._walletTokenRows(wallet_address, batches, ethPrice, batchResults, WalletAssets(ethPrice, self.w3U.get_human_amount))
+            assets.append_native(ethBalance)
+            return assets.sort()
+        tokenDataList = await self._walletTokenRows(wallet_address, batches, ethPrice, batchResults)
+        tokenDataList.append(self._nativData(ethPrice, ethBalance))
+        return sorted(tokenDataList, key=lambda x: float(x["BalanceUSD"]), reverse=True)
+
+    async def _walletTokenRows(self, wallet_address, tokenBatches, ethPrice, results=None, assets=None):
+        """
+        Prices token batches with `getWalletTokenDATA`, the batches of a round concurrently.
+
+        :param wallet_address: Wallet to fetch the holdings of.
+        :param tokenBatches: Lists of token addresses.
+        :param ethPrice: ETH price in USD.
+        :param results: Results of the first round, if it was sent together with other reads.
+        :param assets: `WalletAssets` to add the rows to instead of building dicts (optional).
+        :returns: List of token data dicts, or `assets`.
+        """
+        tokenDataList = []
+        while tokenBatches:
+            if results is None:
+                results = await asyncio.gather(
+                    *[self.BTTSwapper.functions.getWalletTokenDATA(wallet_address, tokenBatch).call() for tokenBatch in tokenBatches],
+                    return_exceptions=True
+                )
+            rows, tokenBatches = self._settleWalletBatches(tokenBatches, results, ethPrice, assets=assets)
+            tokenDataList += rows
+            results = None
+        return tokenDataList if assets is None else assets
+
+    # Pure formatting and batch size tuning, shared with the sync client
+    WALLET_BATCH_SIZE = InterfaceSwapperContract.WALLET_BATCH_SIZE
+    MAX_WALLET_BATCH_SIZE = InterfaceSwapperContract.MAX_WALLET_BATCH_SIZE
+    RETRY_POLICY = InterfaceSwapperContract.RETRY_POLICY
+    SELL_GAS_LIMIT = InterfaceSwapperContract.SELL_GAS_LIMIT
+    _walletBatchSizes = InterfaceSwapperContract._walletBatchSizes
+    _walletBatchLimits = InterfaceSwapperContract._walletBatchLimits
+    BATCH_LIMIT_ERRORS = InterfaceSwapperContract.BATCH_LIMIT_ERRORS
+    _settleWalletBatches = InterfaceSwapperContract._settleWalletBatches
+    _walletBatchKey = InterfaceSwapperContract._walletBatchKey
+    _walletBatchSize = InterfaceSwapperContract._walletBatchSize
+    _tokenDataRows = InterfaceSwapperContract._tokenDataRows
+    _keepTokenMetadata = InterfaceSwapperContract._keepTokenMetadata
+    _nativData = InterfaceSwapperContract._nativData
+
+    async def getWalletAssets(self, wallet_address: str, batch_size: int=10000, blocks_to_check: int = 150000, incremental: bool = True, columnar: bool = False):
+        """
+        Discovers the tokens a wallet received in the last `blocks_to_check` blocks and values them.
+
+        :param wallet_address: Wallet to scan.
+        :param batch_size: Number of blocks per `eth_getLogs` window.
+        :param blocks_to_check: Number of past blocks to scan.
+        :param incremental: Scan only the blocks since the wallet's checkpoint in the wallet index.
+        :param columnar: Return a `WalletAssets` instead of a list of dicts.
+        :returns: List of token data dicts (or `WalletAssets`) sorted by USD balance.
+        """
+        tokenList = await self.w3U.getWalletTokens(wallet_address, batch_size, blocks_to_check, incremental=incremental)
+        return await self.getWalletTokenDATA(wallet_address, tokenList, columnar)
+
+    async def iterWalletAssets(self, wallet_address: str, batch_size: int=10000, blocks_to_check: int = 150000, incremental: bool = True):
+        """
+        Async iterator version of `getWalletAssets`. Yields the ETH row first and then the token
+        data rows of every token batch as soon as it is priced, while the log scan is still running.
+        Rows come unsorted.
+
+        :param wallet_address: Wallet to scan.
+        :param batch_size: Number of blocks per `eth_getLogs` window.
+        :param blocks_to_check: Number of past blocks to scan.
+        :param incremental: Scan only the blocks since the wallet's checkpoint in the wallet index.
+        :returns: Async iterator of token data dicts.
+        """
+        batchSize = self._walletBatchSize()
+        wallet_address = Web3.to_checksum_address(wallet_address)
+        ethPrice, ethBalance = await asyncio.gather(self.getETHUSDPrice(), self.getETHBalanceOf_(wallet_address))
+        yield self._nativData(ethPrice, ethBalance)
+
+        async def price(tokenBatch):
+            return await self._walletTokenRows(wallet_address, [tokenBatch], ethPrice)
+
+        tokens = self.w3U.iterWalletTokens(wallet_address, batch_size, blocks_to_check, incremental=incremental)
+        nextToken = asyncio.ensure_future(tokens.__anext__())
+        pricing, tokenBatch = set(), []
+        try:
+            while nextToken or pricing:
+                done, _ = await asyncio.wait(pricing | ({nextToken} if nextToken else set()), return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task is nextToken:
+                        try:
+                            tokenBatch.append(task.result())
+                            nextToken = asyncio.ensure_future(tokens.__anext__())
+                        except StopAsyncIteration:
+                            nextToken = None
+                        if len(tokenBatch) == batchSize or (nextToken is None and tokenBatch):
+                            pricing.add(asyncio.ensure_future(price(tokenBatch)))
+                            tokenBatch = []
+                    else:
+                        pricing.discard(task)
+                        for row in task.result():
+                            yield row
+        finally:
+            for task in pricing | ({nextToken} if nextToken else set()):
+                task.cancel()
+
+    async def getBestPool(self):
+        """
+        Retrieves the best liquidity pool for the default token.
+
+        Returns:
+            tuple: DexIdent, pool address and base token of the best pool.
+        """
+        return await self.BTTSwapper.functions.getBestPool(self.IERC20.get_token_address()).call()
+
+    async def getBestPoolFor(self, token_address):
+        """
+        Retrieves the best liquidity pool for a specific token.
+
+        Args:
+            token_address (str): The address of the token for which to find the best pool.
+
+        Returns:
+            tuple: DexIdent, pool address and base token of the best pool.
+        """
+        return await self.BTTSwapper.functions.getBestPool(Web3.to_checksum_address(token_address)).call()
+
+    async def getETHtoTokenPathV3(self):
+        """
+        Retrieves the Uniswap V3 path from ETH (WETH) to the current token.
+
+        Returns:
+            tuple: Path and pool information for swapping ETH to a token in V3.
+        """
+        return await self._cachedRoute(self.chain.WETH, self.IERC20.get_token_address(), 3, "getSwapPathV3", [self.chain.WETH, self.IERC20.get_token_address()])
+
+    async def getTokentoETHPathV3(self):
+        """
+        Retrieves the Uniswap V3 path from the current token to ETH (WETH).
+
+        Returns:
+            tuple: Path and pool information for swapping a token to ETH in V3.
+        """
+        return await self._cachedRoute(self.IERC20.get_token_address(), self.chain.WETH, 3, "getSwapPathV3", [self.IERC20.get_token_address(), self.chain.WETH])
+
+    async def getTokentoTokenPathV3(self, tokenIn, tokenOut):
+        """
+        Retrieves the Uniswap V3 path between two specified tokens.
+
+        Args:
+            tokenIn (str): Address of the input token.
+            tokenOut (str): Address of the output token.
+
+        Returns:
+            tuple: Path and pool information for swapping from one token to another in V3.
+        """
+        return await self._cachedRoute(tokenIn, tokenOut, 3, "getSwapPathV3", [Web3.to_checksum_address(tokenIn), Web3.to_checksum_address(tokenOut)])
+
+    async def getETHtoTokenPathV2(self):
+        """
+        Retrieves the Uniswap V2 path from ETH (WETH) to the current token.
+
+        Returns:
+            tuple: Path and dex identifiers for swapping ETH to a token in V2.
+        """
+        return await self._cachedRoute(self.chain.WETH, self.IERC20.get_token_address(), 2, "getSwapPathV2", [self.chain.WETH, self.IERC20.get_token_address()])
+
+    async def getTokentoETHPathV2(self):
+        """
+        Retrieves the Uniswap V2 path from the current token to ETH (WETH).
+
+        Returns:
+            tuple: Path and dex identifiers for swapping a token to ETH in V2.
+        """
+        return await self._cachedRoute(self.IERC20.get_token_address(), self.chain.WETH, 2, "getSwapPathV2", [self.IERC20.get_token_address(), self.chain.WETH])
+
+    async def getTokentoTokenPathV2(self, tokenIn, tokenOut):
+        """
+        Retrieves the Uniswap V2 path between two specified tokens.
+
+        Args:
+            tokenIn (str): Address of the input token.
+            tokenOut (str): Address of the output token.
+
+        Returns:
+            tuple: Path and dex identifiers for swapping from one token to another in V2.
+        """
+        return await self._cachedRoute(tokenIn, tokenOut, 2, "getSwapPathV2", [Web3.to_checksum_address(tokenIn), Web3.to_checksum_address(tokenOut)])
+
+    async def _cachedRoute(self, tokenIn, tokenOut, version, name, args):
+        """
+        Returns a swap route (or the protocol version if `tokenOut` is None) from the route cache,
+        reading it with the precompiled encoder on a miss. Nothing is encoded on a hit.
+
+        :param tokenIn: Address of the input token.
+        :param tokenOut: Address of the output token, None for the protocol version.
+        :param version: Protocol version of the route, None for the protocol version.
+        :param name: Name of the swapper function reading the route.
+        :param args: Arguments of the call, addresses in checksum format.
+        :return: The route.
+        """
+        ttl, maxBlocks = self._routeLimits()
+        if not ttl:
+            return await self._swapperRead(name, args)
+        key, block = RouteCache.key(self.chain.chainID, tokenIn, tokenOut, version), self._headBlock()
+        route = ROUTES.get(key, ttl, maxBlocks, block)
+        if route is None:
+            route = await self._swapperRead(name, args)
+            ROUTES.put(key, route, block)
+        return route
+
+    _routeLimits = InterfaceSwapperContract._routeLimits
+    _headBlock = InterfaceSwapperContract._headBlock
+    _gasShape = InterfaceSwapperContract._gasShape
+    _onSwapError = InterfaceSwapperContract._onSwapError
+    _swapOutcome = staticmethod(InterfaceSwapperContract._swapOutcome)
+    invalidateRoutes = InterfaceSwapperContract.invalidateRoutes
+
+    async def getETHBalance_(self):
+        """
+        Gets the ETH balance of the user in wei.
+
+        Returns:
+            int: The user's ETH balance in wei.
+        """
+        return await self.w3.eth.get_balance(self.user_address)
+
+    async def getETHBalance(self):
+        """
+        Gets the ETH balance of the user in ether.
+
+        Returns:
+            Decimal: The user's ETH balance in ether.
+        """
+        return Web3.from_wei(await self.getETHBalance_(), "ether")
+
+    async def getETHBalanceOf_(self, address):
+        """
+        Gets the ETH balance of a specified address in wei.
+
+        Args:
+            address (str): The address to check the balance for.
+
+        Returns:
+            int: The ETH balance of the address in wei.
+        """
+        return await self.w3.eth.get_balance(address)
+
+    async def getETHBalanceOf(self, address):
+        """
+        Gets the ETH balance of a specified address in ether.
+
+        Args:
+            address (str): The address to check the balance for.
+
+        Returns:
+            Decimal: The ETH balance of the address in ether.
+        """
+        return Web3.from_wei(await self.getETHBalanceOf_(address), "ether")
+
+    def _minOutput(self, amountOut):
+        """
+        Applies the configured slippage to a quoted output amount.
+        """
+        return int(amountOut - (amountOut * int(self.settings.settings["Slippage"])) / 100)
+
+    async def _swapperRead(self, name, args):
+        """
+        Calls a view function of the swapper with the precompiled encoder, skipping the function
+        lookup and argument normalization of the contract object.
+
+        Args:
+            name (str): Name of the swapper function.
+            args (list): Arguments of the call, addresses in checksum format.
+
+        Returns:
+            The decoded result, like `ContractFunction.call()`.
+        """
+        codec = AbiCodec.of(BTTSwapper_ABI)
+        return codec.decode(name, await self.w3.eth.call({"to": self.chain.BTTSwapper, "data": Web3.to_hex(codec.encode(name, args))}))
+
+    async def _swapTransaction(self, name, args, value: int = 0):
+        """
+        Builds a swap transaction offline with the precompiled encoder and the current fee fields.
+        The gas is estimated and the nonce allocated when it is sent.
+
+        Args:
+            name (str): Name of the swapper swap function.
+            args (list): Arguments of the swap.
+            value (int, optional): ETH value in wei sent with the transaction.
+
+        Returns:
+            dict: The transaction.
+        """
+        return AbiCodec.of(BTTSwapper_ABI).transaction(
+            name, args, self.chain.BTTSwapper, self.user_address, value,
+            chainId=self.chain.chainID, **await self.w3U.getFees()
+        )
+
+    async def _dryRunSwap(self, name, swapArgs, quote, value, dryRun):
+        """
+        Simulates a swap instead of sending it. The quote is read at the simulated block and
+        state, then the exact swap calldata with the slippage applied is run with `eth_call`
+        and `eth_estimateGas` concurrently. No nonce is used and nothing is signed.
+
+        Args:
+            name (str): Name of the swapper swap function.
+            swapArgs (callable): Returns the swap arguments for a minimum output.
+            quote (tuple): Name and arguments of the `getAmountsOut*` call.
+            value (int): ETH value in wei sent with the swap.
+            dryRun (DryRun): Block and state overrides to simulate against.
+
+        Returns:
+            SwapSimulation: Success, quoted and minimum output, gas estimate and revert reason.
+        """
+        codec = AbiCodec.of(BTTSwapper_ABI)
+        state = dryRun.stateOverride(self.user_address, self.chain.BTTSwapper)
+        quoteCall = {"to": self.chain.BTTSwapper, "data": Web3.to_hex(codec.encode(*quote))}
+        try:
+            quoted = await self.w3.manager.coro_request("eth_call", dryRun.params(quoteCall, state))
+        except Exception as e:
+            return SwapSimulation(False, 0, 0, None, DryRun.revertReason(e))
+        amountOut = codec.decode(quote[0], Web3.to_bytes(hexstr=quoted))[-1]
+        minOut = self._minOutput(amountOut)
+        call = codec.transaction(name, swapArgs(minOut), self.chain.BTTSwapper, self.user_address)
+        call["value"] = Web3.to_hex(int(value))  # Raw JSON-RPC request
+        result, estimate = await asyncio.gather(
+            self.w3.manager.coro_request("eth_call", dryRun.params(call, state)),
+            self.w3.manager.coro_request("eth_estimateGas", dryRun.params(call, state)),
+            return_exceptions=True
+        )
+        if isinstance(result, Exception):
+            return SwapSimulation(False, amountOut, minOut, None, DryRun.revertReason(result))
+        return SwapSimulation(True, amountOut, minOut, None if isinstance(estimate, Exception) else int(estimate, 16), None)
+
+    async def _fastSwap(self, name, swapArgs, quote, value: int = 0):
+        """
+        Prepares a swap with all reads in flight at once and sends it. The quote, the fee fields,
+        the gas estimate and, if the nonce is not known locally, the transaction count are
+        awaited together. The gas is estimated with a minimum output of 0, which runs the same
+        swap as the final transaction, unless the gas model knows the swap shape. The transaction
+        is then encoded and signed locally.
+
+        Args:
+            name (str): Name of the swapper swap function.
+            swapArgs (callable): Returns the swap arguments for a minimum output.
+            quote: The `getAmountsOut*` coroutine.
+            value (int, optional): ETH value in wei sent with the swap.
+
+        Returns:
+            tuple: A tuple containing a boolean (success status), transaction hex, and gas estimate.
+        """
+        codec = AbiCodec.of(BTTSwapper_ABI)
+        nonces = AsyncNonceManager.of(self.w3, self.user_address, self.chain.chainID)
+        shape = self._gasShape(name, swapArgs(0)[0])
+        limit = self.w3U.learnedGas(shape)
+        reads = [quote, self.w3U.getFees(), nonces.prefetch()]
+        if not limit:
+            reads.append(self.w3.eth.estimate_gas(codec.transaction(name, swapArgs(0), self.chain.BTTSwapper, self.user_address, value)))
+        amountsOut, fees, _, *estimate = await asyncio.gather(*reads)
+        price = fees.get("maxFeePerGas") or fees["gasPrice"]
+        gas = self.w3U.checkGasCost(estimate[0], price) if estimate else self.w3U.checkGasCost(limit, price, overhead=False)
+        if not gas[2]:
+            return False, "0", gas
+        return await self.w3U.sendAndWait(codec.transaction(
+            name, swapArgs(self._minOutput(amountsOut[-1])), self.chain.BTTSwapper, self.user_address, value,
+            gas=gas[0], chainId=self.chain.chainID, **fees
+        ), gas, shape)
+
+    async def TestSwapETHtoToken(self, inputAmount: float):
+        """
+        Tests swapping ETH for the current token using the correct Uniswap protocol version.
+
+        Args:
+            inputAmount (float): The amount of ETH to swap.
+
+        Returns:
+            bool: True if the test swap could be built, False otherwise.
+        """
+        try:
+            v = await self.getSwapProtocollVersion()
+            inputETH = self.w3U.to_wei(inputAmount, 18)
+            if int(v) == 2:
+                return await self.TestSwapFromETHtoTokenV2(inputETH)
+            elif int(v) == 3:
+                return await self.TestSwapFromETHtoTokenV3(inputETH)
+        except Exception as e:
+            if RetryPolicy.classify(e) == RetryPolicy.INSUFFICIENT_FUNDS:
+                print("ERROR:", "insufficient ETH funds for transaction!")
+            else:
+                print(e)
+            return False
+
+    async def TestSwapFromETHtoTokenV2(self, inputAmount: int):
+        """
+        Tests swapping ETH for the current token using Uniswap V2.
+
+        Args:
+            inputAmount (int): The amount of ETH (in wei) to swap.
+
+        Returns:
+            bool: True if the test swap could be built.
+        """
+        path, dexIdents = await self.getETHtoTokenPathV2()
+        amountOut = (await self.getAmountsOutV2(inputAmount, path, dexIdents))[-1]
+        txn = await self._swapTransaction("swapETHtoTokenV2", [
+            path,
+            dexIdents,
+            self._minOutput(amountOut)
+        ], inputAmount)
+        await self.w3U.estimateGas(txn)  # Raises if the swap would fail, e.g. for insufficient funds
+        return True
+
+    async def TestSwapFromETHtoTokenV3(self, inputAmount: int):
+        """
+        Tests swapping ETH for the current token using Uniswap V3.
+
+        Args:
+            inputAmount (int): The amount of ETH (in wei) to swap.
+
+        Returns:
+            bool: True if the test swap could be built.
+        """
+        path, _, pools, poolFees = await self.getETHtoTokenPathV3()
+        amountOut = (await self.getAmountsOutV3(pools, path, inputAmount))[-1]
+        txn = await self._swapTransaction("swapETHtoTokenV3", [
+            path,
+            pools,
+            poolFees,
+            self._minOutput(amountOut)
+        ], inputAmount)
+        await self.w3U.estimateGas(txn)  # Raises if the swap would fail, e.g. for insufficient funds
+        return True
+
+    async def SwapETHtoToken(self, inputAmount: float, trys: int = 1, dryRun: DryRun = None):
+        """
+        Executes the swap from ETH to the current token using the correct Uniswap protocol version.
+
+        Args:
+            inputAmount (float): The amount of ETH to swap.
+            trys (int, optional): The maximum number of attempts, errors are retried as `RETRY_POLICY` decides. Defaults to 1.
+            dryRun (DryRun, optional): Simulate the swap against the given block and state instead of sending it, a `SwapSimulation` is returned. Defaults to None.
+
+        Returns:
+            SwapOutcome: The (success status, transaction hex, gas estimate) tuple with the error class and attempts.
+        """
+        inputETH = self.w3U.to_wei(inputAmount, 18)
+
+        async def attempt():
+            if int(await self.getSwapProtocollVersion()) == 2:
+                return await self.SwapFromETHtoTokenV2(inputETH, dryRun=dryRun)
+            return await self.SwapFromETHtoTokenV3(inputETH, dryRun=dryRun)
+
+        return self._swapOutcome(await self.RETRY_POLICY.runAsync(attempt, trys, self._onSwapError), True, dryRun)
+
+    async def SwapFromETHtoTokenV2(self, inputAmount: int, dryRun: DryRun = None):
+        """
+        Swaps ETH for the current token using Uniswap V2.
+
+        Args:
+            inputAmount (int): The amount of ETH (in wei) to swap.
+            dryRun (DryRun, optional): Simulate the swap against the given block and state instead of sending it, a `SwapSimulation` is returned. Defaults to None.
+
+        Returns:
+            tuple: A tuple containing a boolean (success status), transaction hex, and gas estimate.
+        """
+        path, dexIdents = await self.getETHtoTokenPathV2()
+        if dryRun is not None:
+            return await self._dryRunSwap("swapETHtoTokenV2", lambda minOut: [path, dexIdents, minOut], ("getAmountsOutV2", [inputAmount, path, dexIdents]), inputAmount, dryRun)
+        if self.settings.settings.get("FastPrepare"):
+            return await self._fastSwap("swapETHtoTokenV2", lambda minOut: [path, dexIdents, minOut], self.getAmountsOutV2(inputAmount, path, dexIdents), inputAmount)
+        amountOut = (await self.getAmountsOutV2(inputAmount, path, dexIdents))[-1]
+        txn = await self._swapTransaction("swapETHtoTokenV2", [
+            path,
+            dexIdents,
+            self._minOutput(amountOut)
+        ], inputAmount)
+        return await self.w3U.signAndSend(txn, self._gasShape("swapETHtoTokenV2", path))
+
+    async def SwapFromETHtoTokenV3(self, inputAmount: int, dryRun: DryRun = None):
+        """
+        Swaps ETH for the current token using Uniswap V3.
+
+        Args:
+            inputAmount (int): The amount of ETH (in wei) to swap.
+            dryRun (DryRun, optional): Simulate the swap against the given block and state instead of sending it, a `SwapSimulation` is returned. Defaults to None.
+
+        Returns:
+            tuple: A tuple containing a boolean (success status), transaction hex, and gas estimate.
+        """
+        path, _, pools, poolFees = await self.getETHtoTokenPathV3()
+        if dryRun is not None:
+            return await self._dryRunSwap("swapETHtoTokenV3", lambda minOut: [path, pools, poolFees, minOut], ("getAmountsOutV3", [pools, path, inputAmount]), inputAmount, dryRun)
+        if self.settings.settings.get("FastPrepare"):
+            return await self._fastSwap("swapETHtoTokenV3", lambda minOut: [path, pools, poolFees, minOut], self.getAmountsOutV3(pools, path, inputAmount), inputAmount)
+        amountOut = (await self.getAmountsOutV3(pools, path, inputAmount))[-1]
+        txn = await self._swapTransaction("swapETHtoTokenV3", [
+            path,
+            pools,
+            poolFees,
+            self._minOutput(amountOut)
+        ], inputAmount)
+        return await self.w3U.signAndSend(txn, self._gasShape("swapETHtoTokenV3", path))
+
+    async def SwapTokentoETH(self, inputAmount: float, trys: int = 1, dryRun: DryRun = None):
+        """
+        Executes the swap from the current token to ETH using the correct Uniswap protocol version.
+
+        Args:
+            inputAmount (float): The amount of the token to swap.
+            trys (int, optional): The maximum number of attempts, errors are retried as `RETRY_POLICY` decides. Defaults to 1.
+            dryRun (DryRun, optional): Simulate the swap against the given block and state instead of sending it, a `SwapSimulation` is returned. Defaults to None.
+
+        Returns:
+            SwapOutcome: The (success status, transaction hex, gas estimate) tuple with the error class and attempts.
+        """
+        async def attempt():
+            v, decimals = await asyncio.gather(self.getSwapProtocollVersion(), self.IERC20.get_token_decimals())
+            inputToken = self.w3U.to_wei(inputAmount, decimals)
+            if int(v) == 2:
+                return await self.SwapFromTokentoETHV2(inputToken, dryRun=dryRun)
+            return await self.SwapFromTokentoETHV3(inputToken, dryRun=dryRun)
+
+        return self._swapOutcome(await self.RETRY_POLICY.runAsync(attempt, trys, self._onSwapError), True, dryRun)
+
+    async def sellToken(self, inputAmount: float):
+        """
+        Sells an amount of the current token for ETH, approving the swapper first if needed.
+
+        A swapper known to be max-approved is answered from the allowance cache and the sell is
+        a plain `SwapTokentoETH`. Otherwise the max approve and the swap are sent right after
+        each other with consecutive nonces, only the swap's receipt is awaited. The swap can not
+        be estimated before the approve is mined, it is sent with the learned gas limit of its
+        shape or `SELL_GAS_LIMIT`.
+
+        Args:
+            inputAmount (float): The amount of the token to sell.
+
+        Returns:
+            tuple: A tuple containing a boolean (success status), transaction hex, and gas estimate.
+        """
+        inputToken = self.w3U.to_wei(inputAmount, await self.IERC20.get_token_decimals())
+        if await self.IERC20.is_approved(self.chain.BTTSwapper, inputToken):
+            return await self.SwapTokentoETH(inputAmount)
+        if int(await self.getSwapProtocollVersion()) == 2:
+            path, dexIdents = await self.getTokentoETHPathV2()
+            amountOut = (await self.getAmountsOutV2(inputToken, path, dexIdents))[-1]
+            name, args = "swapTokentoETHV2", [path, dexIdents, inputToken, self._minOutput(amountOut)]
+        else:
+            path, _, pools, poolFees = await self.getTokentoETHPathV3()
+            amountOut = (await self.getAmountsOutV3(pools, path, inputToken))[-1]
+            name, args = "swapTokenToETHV3", [path, pools, poolFees, inputToken, self._minOutput(amountOut)]
+        approval, txn = await asyncio.gather(
+            self.IERC20._approveTransaction(self.chain.BTTSwapper, 2**256 - 1),
+            self._swapTransaction(name, args)
+        )
+        limit = self.w3U.learnedGas(GasModel.key(self.chain.chainID, "approve", [self.IERC20.token]))
+        approveGas = self.w3U.checkGasCost(limit, approval.get("maxFeePerGas") or approval["gasPrice"], overhead=False) if limit else await self.w3U.estimateGas(approval)
+        shape = self._gasShape(name, path)
+        gas = self.w3U.checkGasCost(self.w3U.learnedGas(shape) or self.SELL_GAS_LIMIT, txn.get("maxFeePerGas") or txn["gasPrice"], overhead=False)
+        for result in (approveGas, gas):
+            if not result[2]:
+                return False, "0", result
+        approval["gas"], txn["gas"] = approveGas[0], gas[0]
+        key = ALLOWANCES.key(self.chain.chainID, self.IERC20.token, self.user_address, self.chain.BTTSwapper)
+        await self.w3U.sendTransaction(approval)
+        ALLOWANCES.set(key, 2**256 - 1)
+        result = await self.w3U.sendAndWait(txn, gas, shape)  # Next nonce, mined right after the approve
+        if not result[0]:
+            ALLOWANCES.set(key, 0)  # The approve may have failed too, read the allowance next time
+        return result
+
+    async def SwapFromTokentoETHV3(self, inputAmount: int, dryRun: DryRun = None):
+        """
+        Swaps the current token for ETH using Uniswap V3.
+
+        Args:
+            inputAmount (int): The amount of the token (in wei) to swap.
+            dryRun (DryRun, optional): Simulate the swap against the given block and state instead of sending it, a `SwapSimulation` is returned. Defaults to None.
+
+        Returns:
+            tuple: A tuple containing a boolean (success status), transaction hex, and gas estimate.
+        """
+        path, _, pools, poolFees = await self.getTokentoETHPathV3()
+        if dryRun is not None:
+            return await self._dryRunSwap("swapTokenToETHV3", lambda minOut: [path, pools, poolFees, inputAmount, minOut], ("getAmountsOutV3", [pools, path, inputAmount]), 0, dryRun)
+        if self.settings.settings.get("FastPrepare"):
+            return await self._fastSwap("swapTokenToETHV3", lambda minOut: [path, pools, poolFees, inputAmount, minOut], self.getAmountsOutV3(pools, path, inputAmount))
+        amountOut = (await self.getAmountsOutV3(pools, path, inputAmount))[-1]
+        txn = await self._swapTransaction("swapTokenToETHV3", [
+            path,
+            pools,
+            poolFees,
+            inputAmount,
+            self._minOutput(amountOut)
+        ])
+        return await self.w3U.signAndSend(txn, self._gasShape("swapTokenToETHV3", path))
+
+    async def SwapFromTokentoTokenV3(self, tokenIn, tokenOut, inputAmount: int, dryRun: DryRun = None):
+        """
+        Swaps one token for another using Uniswap V3.
+
+        Args:
+            tokenIn (str): Address of the input token.
+            tokenOut (str): Address of the output token.
+            inputAmount (int): The amount of the input token (in wei) to swap.
+            dryRun (DryRun, optional): Simulate the swap against the given block and state instead of sending it, a `SwapSimulation` is returned. Defaults to None.
+
+        Returns:
+            tuple: A tuple containing a boolean (success status), transaction hex, and gas estimate.
+        """
+        path, _, pools, poolFees = await self.getTokentoTokenPathV3(tokenIn, tokenOut)
+        if dryRun is not None:
+            return await self._dryRunSwap("swapTokentoTokenV3", lambda minOut: [path, pools, poolFees, inputAmount, minOut], ("getAmountsOutV3", [pools, path, inputAmount]), 0, dryRun)
+        if self.settings.settings.get("FastPrepare"):
+            return await self._fastSwap("swapTokentoTokenV3", lambda minOut: [path, pools, poolFees, inputAmount, minOut], self.getAmountsOutV3(pools, path, inputAmount))
+        amountOut = (await self.getAmountsOutV3(pools, path, inputAmount))[-1]
+        txn = await self._swapTransaction("swapTokentoTokenV3", [
+            path,
+            pools,
+            poolFees,
+            inputAmount,
+            self._minOutput(amountOut)
+        ])
+        return await self.w3U.signAndSend(txn, self._gasShape("swapTokentoTokenV3", path))
+
+    async def SwapFromTokentoETHV2(self, inputAmount: int, trys: int = 1, dryRun: DryRun = None):
+        """
+        Swaps the current token for ETH using Uniswap V2.
+
+        Args:
+            inputAmount (int): The amount of the token (in wei) to swap.
+            trys (int, optional): Kept for signature parity with `InterfaceSwapperContract`.
+            dryRun (DryRun, optional): Simulate the swap against the given block and state instead of sending it, a `SwapSimulation` is returned. Defaults to None.
+
+        Returns:
+            tuple: A tuple containing a boolean (success status), transaction hex, and gas estimate.
+        """
+        path, dexIdents = await self.getTokentoETHPathV2()
+        if dryRun is not None:
+            return await self._dryRunSwap("swapTokentoETHV2", lambda minOut: [path, dexIdents, inputAmount, minOut], ("getAmountsOutV2", [inputAmount, path, dexIdents]), 0, dryRun)
+        if self.settings.settings.get("FastPrepare"):
+            return await self._fastSwap("swapTokentoETHV2", lambda minOut: [path, dexIdents, inputAmount, minOut], self.getAmountsOutV2(inputAmount, path, dexIdents))
+        amountOut = (await self.getAmountsOutV2(inputAmount, path, dexIdents))[-1]
+        txn = await self._swapTransaction("swapTokentoETHV2", [
+            path,
+            dexIdents,
+            inputAmount,
+            self._minOutput(amountOut)
+        ])
+        return await self.w3U.signAndSend(txn, self._gasShape("swapTokentoETHV2", path))
+
+    async def SwapFromTokentoTokenV2(self, tokenIn, tokenOut, inputAmount: int, trys: int = 1, dryRun: DryRun = None):
+        """
+        Swaps one token for another using Uniswap V2.
+
+        Args:
+            tokenIn (str): Address of the input token.
+            tokenOut (str): Address of the output token.
+            inputAmount (int): The amount of the input token (in wei) to swap.
+            trys (int, optional): Kept for signature parity with `InterfaceSwapperContract`.
+            dryRun (DryRun, optional): Simulate the swap against the given block and state instead of sending it, a `SwapSimulation` is returned. Defaults to None.
+
+        Returns:
+            tuple: A tuple containing a boolean (success status), transaction hex, and gas estimate.
+        """
+        path, dexIdents = await self.getTokentoTokenPathV2(tokenIn, tokenOut)
+        if dryRun is not None:
+            return await self._dryRunSwap("swapTokentoTokenV2", lambda minOut: [path, dexIdents, inputAmount, minOut], ("getAmountsOutV2", [inputAmount, path, dexIdents]), 0, dryRun)
+        if self.settings.settings.get("FastPrepare"):
+            return await self._fastSwap("swapTokentoTokenV2", lambda minOut: [path, dexIdents, inputAmount, minOut], self.getAmountsOutV2(inputAmount, path, dexIdents))
+        amountOut = (await self.getAmountsOutV2(inputAmount, path, dexIdents))[-1]
+        txn = await self._swapTransaction("swapTokentoTokenV2", [
+            path,
+            dexIdents,
+            inputAmount,
+            self._minOutput(amountOut)
+        ])
+        return await self.w3U.signAndSend(txn, self._gasShape("swapTokentoTokenV2", path))
@@ -0,0 +1,231 @@
+from .AsyncW3Utils import AsyncW3Utils
+from .core_settings import CoreSettings
+from .TokenHandle import AsyncTokenHandle
+from .core_chains import chains
+from .TokenMetadataCache import TOKEN_METADATA
+from .WalletIndex import WALLET_INDEX
+from .BlockCache import AsyncBlockCache
+from .Signer import Signer
+from .AsyncIERC20 import AsyncIERC20
+from .AsyncISwapperContract import AsyncInterfaceSwapperContract
+from web3 import AsyncWeb3, Web3
+import json
+import logging
+
+class AsyncBaseSwap(AsyncInterfaceSwapperContract, AsyncW3Utils, AsyncIERC20):
+    """
+    Async counterpart of `BaseSwap` built on `AsyncWeb3`.
+
+    All quotes, paths, wallet reads, approvals and swaps are coroutines, so one event loop
+    can keep many price reads and several swaps in flight at once. Because the chain id
+    has to be awaited, the client is created with `await AsyncBaseSwap.create(...)`
+    (or constructed and then `await BS.init()`).
+
+    Example:
+        BS = await AsyncBaseSwap.create("0x65e570b560027F493f2b1907e8e8e3B9546053bD")
+        prices = await asyncio.gather(*[BS.getUSDPriceOf(t) for t in tokens])
+
+    Args:
+        token (str): The token address to initialize. If not provided, falls back to BasedTools Governance Token.
+        settings_file_path (str): The path to the settings file (default is "./Settings.json").
+        saveSettings (bool): Flag to save settings changes back to the file (default is False).
+    """
+    def __init__(self, token:str=None, settings_file_path:str="./Settings.json", saveSettings:bool=False):
+        """
+        Load the settings and create the AsyncWeb3 connection. No RPC request is made here,
+        call `await init()` before using the client.
+
+        Args:
+            token (str, optional): The token address for interactions (in checksum format).
+            settings_file_path (str, optional): Path to the settings JSON file. Defaults to "./Settings.json".
+            saveSettings (bool, optional): Whether to save changes to the settings file. Defaults to False.
+        """
+        self.settings = CoreSettings(settings_file_path,  saveSettings)
+        if self.settings.settings.get("MetadataCache"):
+            TOKEN_METADATA.open(self.settings.settings["MetadataCache"])
+        if self.settings.settings.get("WalletIndex"):
+            WALLET_INDEX.open(self.settings.settings["WalletIndex"])
+        self.w3 = self.connect()
+        AsyncW3Utils.__init__(self, self.settings, self.w3)
+        self.token = Web3.to_checksum_address(token) if Web3.is_address(token) else None
+        self.chain = None
+
+    @classmethod
+    async def create(cls, token:str=None, settings_file_path:str="./Settings.json", saveSettings:bool=False):
+        """
+        Construct and initialize an AsyncBaseSwap in one step.
+
+        Returns:
+            AsyncBaseSwap: The ready to use client.
+        """
+        self = cls(token, settings_file_path, saveSettings)
+        await self.init()
+        return self
+
+    async def init(self):
+        """
+        Resolve the chain of the connected RPC and set up the token and swapper contract interfaces.
+
+        Returns:
+            AsyncBaseSwap: The client itself.
+        """
+        if isinstance(self.w3.provider, AsyncWeb3.WebSocketProvider):
+            if not await self.w3.provider.is_connected():
+                await self.w3.provider.connect()
+            if self.blockCache is not None and not self.blockCache.subscribed:
+                await self.blockCache.subscribe(self.w3)  # Heads arrive over the socket, no polling
+        self.chain = chains(await self.w3.eth.chain_id)
+        if self.token is None:
+            logging.info("No token address provided, falling back to USDC")
+            self.token = Web3.to_checksum_address(self.chain.BTT)
+        AsyncIERC20.__init__(self, self.settings, self.w3, self.token, self, self.chain)
+        AsyncInterfaceSwapperContract.__init__(self, self.settings, self.w3, self, self, self.chain)
+        return self
+
+    async def reload(self):
+        """
+        Reload the AsyncWeb3 connection, utilities, and contract interfaces after a settings change.
+        """
+        await self.close()
+        self.w3 = self.connect()
+        AsyncW3Utils.__init__(self, self.settings, self.w3)
+        await self.init()
+
+    def connect(self):
+        """
+        Create an AsyncWeb3 connection using the RPC endpoint specified in settings.
+
+        Returns:
+            AsyncWeb3: The AsyncWeb3 instance for the specified RPC endpoint.
+        """
+        keys = self.settings.settings
+        cache = {"cache_allowed_requests": True, "cacheable_requests": {"eth_chainId"}}  # web3 validates eth_call/estimateGas against the chain id, ask for it only once
+        if keys["RPC"][:2].lower() == "ws":
+            w3 = AsyncWeb3(AsyncWeb3.WebSocketProvider(keys["RPC"], request_timeout=keys["timeout"], **cache))
+        else:
+            w3 = AsyncWeb3(AsyncWeb3.AsyncHTTPProvider(keys["RPC"], request_kwargs={'timeout': int(keys["timeout"])}, **cache))
+        self.blockCache = AsyncBlockCache.attach(w3, keys["BlockCache"]) if keys.get("BlockCache") else None  # Opt-in, serves repeated reads within a block
+        return w3
+
+    async def close(self):
+        """
+        Close the underlying provider session or websocket.
+        """
+        if self.blockCache is not None:
+            await self.blockCache.close()
+        if hasattr(self.w3.provider, "disconnect"):
+            await self.w3.provider.disconnect()
+
+    async def __aenter__(self):
+        return await self.init()
+
+    async def __aexit__(self, *exc):
+        await self.close()
+
+    def check_settings(self) -> str:
+        """
+        Validate the critical settings such as address and private key.
+
+        Returns:
+            str: Message indicating the validation result of settings.
+        """
+        if self.settings.settings.get("address") and not Web3.is_address(self.settings.settings["address"]):
+            return "Invalid address in settings!"
+        if len(self.settings.settings.get("private_key")) and len(self.settings.settings["private_key"]) not in [64, 66]:
+            return"Invalid private_key in settings!"
+        return "Address Setup is done"
+
+    def printSettings(self):
+        """
+        Print the current settings in a formatted JSON style.
+        """
+        print(json.dumps(self.settings.settings, indent=4))
+
+    async def loadWalletFromMnomic(self, mnemoic):
+        """
+        Load a wallet from a mnemonic phrase and update the address and private key in the settings.
+        The connection is kept, only the wallet of the client changes.
+
+        Args:
+            mnemoic (str): The mnemonic phrase to derive the wallet from.
+        """
+        mne_address, private_key = self.w3U.getMnemonicToPrivKey(mnemoic)
+        await self.editSettings("address", mne_address, skipReload=True)
+        await self.editSettings("private_key", private_key, skipReload=True)
+        self._useWallet()
+
+    async def loadWalletFromPrivKey(self, private_key):
+        """
+        Load a wallet from a private key and update the address in the settings.
+        The connection is kept, only the wallet of the client changes.
+
+        Args:
+            private_key (str): The private key for the wallet.
+        """
+        address = self.w3U.getAddresFromPrivKey(private_key)
+        await self.editSettings("address", address, skipReload=True)
+        await self.editSettings("private_key", private_key, skipReload=True)
+        self._useWallet()
+
+    def _useWallet(self):
+        """
+        Switch the client to the wallet in the settings without reloading the connection.
+        The key is parsed once into the shared `Signer`, token handles follow the client.
+        """
+        self.user_address, self.priv_key = self.settings.settings["address"], self.settings.settings["private_key"]
+        Signer.of(self.priv_key)  # Parse the key now, not on the first transaction
+
+    async def changeRPC(self, newRPC):
+        """
+        Change the RPC endpoint in the settings and reload the connection.
+
+        Args:
+            newRPC (str): The new RPC endpoint to use.
+        """
+        await self.editSettings("RPC", newRPC)
+
+    async def editSettings(self, key, newValue, skipReload:bool = False):
+        """
+        Edit a setting in the configuration and optionally reload the connection.
+
+        Args:
+            key (str): The key of the setting to change.
+            newValue (any): The new value for the setting.
+            skipReload (bool, optional): Whether to skip reloading the connection after changing the setting. Defaults to False.
+        """
+        self.settings.change_settings(key, newValue)
+        if not skipReload:
+            await self.reload()
+
+    def getSettings(self):
+        """
+        Retrieve the current settings.
+
+        Returns:
+            dict: The settings dictionary.
+        """
+        return self.settings.settings
+
+    def changeToken(self, token:str):
+        """
+        Change the token being swapped. The chain is already known, so no RPC request is made.
+
+        Args:
+            token (str): The new token address.
+        """
+        self.token = Web3.to_checksum_address(token)
+        AsyncIERC20.__init__(self, self.settings, self.w3, self.token, self, self.chain)
+
+    def tokenHandle(self, token:str):
+        """
+        Create an immutable handle bound to one token. The handle shares the connection, settings,
+        caches and wallet state with this client but never changes `self.token`, so different
+        tokens can be traded in parallel from one client.
+
+        Args:
+            token (str): The token address.
+
+        Returns:
+            AsyncTokenHandle: The handle for the token.
+        """
+        return AsyncTokenHandle(self, token)
@@ -0,0 +1,338 @@
+import asyncio
+import logging
+import time
+from web3 import Web3
+from web3.datastructures import AttributeDict
+from web3.exceptions import TimeExhausted
+from web3._utils.method_formatters import receipt_formatter
+from .W3Utils import W3Utils
+from .NonceManager import NonceManager, AsyncNonceManager
+from .WalletIndex import WALLET_INDEX
+from .PendingSwap import ReceiptPoller
+from .TxAccelerator import TxAccelerator
+from .RetryPolicy import RetryPolicy, UnconfirmedTransaction
+
+
+class AsyncW3Utils(W3Utils):
+    """
+    Async counterpart of `W3Utils` for use with an `AsyncWeb3` instance.
+
+    The pure helpers (rounding, wei conversion, key derivation) are inherited unchanged,
+    only the methods that hit the RPC are coroutines here.
+    """
+
+    def __init__(self, settings, w3):
+        """
+        Initializes the AsyncW3Utils class.
+
+        Parameters:
+        -----------
+        settings : object
+            Configuration object containing gas-related settings like GWEI offset and max transaction fees.
+        w3 : AsyncWeb3 instance
+            Instance of AsyncWeb3 used to interact with the Ethereum blockchain.
+        """
+        W3Utils.__init__(self, settings, w3)
+
+    async def block(self):
+        """
+        Returns the current Ethereum block number.
+
+        Returns:
+        --------
+        int
+            The current block number.
+        """
+        return await self.w3.eth.block_number
+
+    async def estimateGas(self, txn):
+        """
+        Estimates gas required for a transaction and checks if the gas cost is within the allowed limit.
+
+        Parameters:
+        -----------
+        txn : dict
+            A dictionary representing the transaction object (e.g., to, from, value, etc.).
+
+        Returns:
+        --------
+        tuple
+            A tuple containing:
+            - int: Estimated gas amount (with 10% overhead).
+            - str: Estimated gas cost in Ether.
+            - bool: Whether the gas cost is within the maximum allowed transaction fee.
+        """
+        if txn.get("maxFeePerGas") or txn.get("gasPrice"):
+            return self.checkGasCost(await self.w3.eth.estimate_gas(txn), txn.get("maxFeePerGas") or txn["gasPrice"])
+        gas, gas_price = await asyncio.gather(self.w3.eth.estimate_gas(txn), self.getGasPrice())
+        return self.checkGasCost(gas, gas_price)
+
+    async def getGasPrice(self):
+        """
+        Returns the current gas price including the configured GWEI offset.
+
+        Returns:
+        --------
+        int
+            The gas price in wei.
+        """
+        return int(await self.w3.eth.gas_price + Web3.to_wei(int(self.settings.settings["GWEI_OFFSET"]), "gwei"))
+
+    async def getFees(self) -> dict:
+        """
+        Returns the fee fields of a transaction sent now. With the fee engine this is a type-2
+        transaction whose fees are read at most once per block.
+
+        Returns:
+        --------
+        dict
+            The fee fields, see `feeFields`.
+        """
+        request = self.feeRequest()
+        return self.feeFields(await self.w3.manager.coro_request(*request) if request else None)
+
+    async def sendTransaction(self, txn, retries: int = 1):
+        """
+        Allocates the next local nonce of the sender, signs the transaction with the key from the
+        settings and sends it, without waiting for the receipt.
+
+        Parameters:
+        -----------
+        txn : dict
+            The built transaction including `gas`, the nonce is set here.
+        retries : int, optional
+            How often the send is retried with a resynced nonce after a nonce error, by default 1.
+
+        Returns:
+        --------
+        HexBytes
+            The transaction hash.
+        """
+        nonces = AsyncNonceManager.of(self.w3, txn["from"], txn["chainId"])
+        while True:
+            txn["nonce"] = await nonces.allocate()
+            signed_txn = None
+            try:
+                signed_txn = self.signer.sign(txn)
+                return await self.w3.eth.send_raw_transaction(signed_txn.raw_transaction)
+            except Exception as e:
+                if signed_txn is not None and NonceManager.is_known_error(e):
+                    # The node already holds this signed transaction, its nonce stays in use
+                    raise UnconfirmedTransaction(signed_txn.hash.hex(), e) from e
+                if signed_txn is not None and RetryPolicy.classify(e) == RetryPolicy.TIMEOUT:
+                    # The node may have taken the transaction, resync instead of reusing the nonce
+                    nonces.invalidate()
+                    raise UnconfirmedTransaction(signed_txn.hash.hex(), e) from e
+                if not nonces.release(txn["nonce"], e) or retries <= 0:
+                    raise
+                retries -= 1
+
+    async def signAndSend(self, txn, shape=None):
+        """
+        Estimates gas for a built transaction, sends it with the next local nonce and waits for the receipt.
+        A transaction whose gas cost exceeds `MaxTXFeeETH` is not sent. Known shapes use their
+        learned gas limit instead of `eth_estimateGas`.
+
+        Parameters:
+        -----------
+        txn : dict
+            The built transaction dictionary, e.g. from `AbiCodec.transaction`.
+        shape : tuple, optional
+            The shape from `GasModel.key`, its receipt is recorded in the gas model.
+
+        Returns:
+        --------
+        tuple
+            A tuple containing a boolean (success status), transaction hex, and gas estimate.
+        """
+        limit = self.learnedGas(shape)
+        if limit:
+            gas = self.checkGasCost(limit, txn.get("maxFeePerGas") or txn.get("gasPrice") or await self.getGasPrice(), overhead=False)
+        else:
+            gas = await self.estimateGas(txn)
+        if not gas[2]:
+            return False, "0", gas
+        txn.update({'gas': gas[0]})
+        return await self.sendAndWait(txn, gas, shape)
+
+    async def sendAndWait(self, txn, gas, shape=None):
+        """
+        Sends a transaction whose gas limit is already set with the next local nonce and waits for the receipt.
+
+        Parameters:
+        -----------
+        txn : dict
+            The complete transaction except the nonce.
+        gas : tuple
+            The gas estimate tuple returned with the result.
+        shape : tuple, optional
+            The shape from `GasModel.key`, its receipt is recorded in the gas model.
+
+        Returns:
+        --------
+        tuple
+            A tuple containing a boolean (success status), transaction hex, and gas estimate.
+        """
+        tx_hash = await self.sendTransaction(txn)
+        try:
+            if self.settings.settings.get("Accelerate"):
+                txn_receipt, tx_hash, gas = await self.waitAccelerated(txn, tx_hash.hex(), gas)
+            else:
+                txn_receipt = await self.w3.eth.wait_for_transaction_receipt(
+                    tx_hash, timeout=self.settings.settings["timeout"])
+                tx_hash = tx_hash.hex()
+        except TimeExhausted:
+            # The transaction may have been dropped, resync the nonce before the next send
+            AsyncNonceManager.of(self.w3, txn["from"], txn["chainId"]).invalidate()
+            raise
+        except Exception as e:
+            # Sent, but the wait broke off: the transaction may still be mined
+            raise UnconfirmedTransaction(tx_hash if isinstance(tx_hash, str) else tx_hash.hex(), e) from e
+        self.learnGas(shape, txn_receipt)
+        if txn_receipt["status"] == 1:
+            return True, tx_hash, gas
+        else:
+            return False, tx_hash, gas
+
+    async def waitAccelerated(self, txn, tx_hash: str, gas):
+        """
+        Waits for the receipt of a sent transaction like `wait_for_transaction_receipt`, but replaces
+        it with the same nonce and bumped fees while it stays pending for `Accelerate` blocks (settings),
+        within `MaxTXFeeETH`. Whichever of the sent transactions is mined first is returned.
+
+        Parameters:
+        -----------
+        txn : dict
+            The sent transaction, nonce, gas and fee fields set.
+        tx_hash : str
+            Hash of the sent transaction.
+        gas : tuple
+            The gas estimate tuple of the sent transaction.
+
+        Returns:
+        --------
+        tuple
+            The receipt, hash and gas tuple of the mined transaction.
+
+        Raises:
+        -------
+        TimeExhausted
+            If none of the transactions is mined within the `timeout` setting.
+        """
+        accelerator = TxAccelerator(self)
+        accelerator.watch(tx_hash, txn)
+        hashes = {tx_hash: gas}  # Every hash sent for the nonce -> its gas tuple
+        deadline = time.monotonic() + float(self.settings.settings["timeout"])
+        while time.monotonic() < deadline:
+            await asyncio.sleep(ReceiptPoller.interval)
+            try:
+                head, *receipts = await asyncio.gather(self.w3.eth.block_number, *(
+                    self.w3.manager.coro_request("eth_getTransactionReceipt", [Web3.to_hex(hexstr=sent)]) for sent in hashes
+                ))
+            except Exception as e:
+                logging.warning(f"Polling receipts failed, retrying: {e}")
+                continue
+            for (sent, sentGas), receipt in zip(hashes.items(), receipts):
+                if receipt is not None:
+                    return AttributeDict.recursive(receipt_formatter(receipt)), sent, sentGas
+            if not accelerator.due(head):
+                continue
+            replacement = accelerator.replace(tx_hash, await self.getFees())
+            if replacement is None:
+                continue
+            try:
+                sent = await self.w3.eth.send_raw_transaction(self.signer.sign(replacement[0]).raw_transaction)
+            except Exception as e:
+                logging.warning(f"Replacing {tx_hash} failed: {e}")  # e.g. already mined, the next round finds it
+                continue
+            hashes[sent.hex()] = replacement[1]
+        raise TimeExhausted(f"Transaction {tx_hash} is not in the chain after the timeout")
+
+    async def getWalletTokens(self, wallet_address: str, batch_size: int=10000, blocks_to_check: int = 150000, concurrency: int = 8, incremental: bool = True):
+        """
+        Fetches a list of unique token addresses that have been transferred to a specified wallet address
+        within a defined range of Ethereum blocks.
+
+        Works like `W3Utils.getWalletTokens`, but the block windows are requested concurrently,
+        at most `concurrency` at a time. Scans are recorded in the same wallet index.
+
+        Args:
+            wallet_address (str): The Ethereum address of the wallet to check for token transfers.
+            batch_size (int, optional): The number of blocks to process in each batch when querying logs. Defaults to 10,000.
+            blocks_to_check (int, optional): The number of past blocks to check for transfers, starting from the latest block. Defaults to 150,000.
+            concurrency (int, optional): Maximum number of `eth_getLogs` requests in flight. Defaults to 8.
+            incremental (bool, optional): Scan only the blocks not covered by the wallet's checkpoint. Defaults to True.
+
+        Returns:
+            list: A list of token contract addresses that have transferred tokens to the specified wallet.
+        """
+        return [token async for token in self.iterWalletTokens(wallet_address, batch_size, blocks_to_check, concurrency, incremental)]
+
+    async def iterWalletTokens(self, wallet_address: str, batch_size: int=10000, blocks_to_check: int = 150000, concurrency: int = 8, incremental: bool = True):
+        """
+        Async iterator version of `getWalletTokens`. Yields every token address once, as soon as
+        the window it was found in is fetched. Tokens already in the wallet index for the range
+        come first. The checkpoint is recorded once all windows were fetched without error.
+
+        Args:
+            wallet_address (str): The Ethereum address of the wallet to check for token transfers.
+            batch_size (int, optional): The number of blocks to process in each batch when querying logs. Defaults to 10,000.
+            blocks_to_check (int, optional): The number of past blocks to check for transfers, starting from the latest block. Defaults to 150,000.
+            concurrency (int, optional): Maximum number of `eth_getLogs` requests in flight. Defaults to 8.
+            incremental (bool, optional): Scan only the blocks not covered by the wallet's checkpoint. Defaults to True.
+
+        Yields:
+            str: Token contract addresses transferred to the wallet.
+        """
+        wallet_address = Web3.to_checksum_address(wallet_address)
+        latest_block = await self.w3.eth.block_number
+        start_block = max(0, latest_block - blocks_to_check)
+        transfer_event_signature = self.w3.keccak(text="Transfer(address,address,uint256)")
+        wallet_address_padded = '0x' + wallet_address[2:].lower().rjust(64, '0')
+        semaphore = asyncio.Semaphore(concurrency)
+        failed = []
+
+        async def fetch_token_transfer_logs(start_block, end_block):
+            async with semaphore:
+                try:
+                    filter_params = {
+                        'fromBlock': Web3.to_hex(start_block),
+                        'toBlock': Web3.to_hex(end_block),
+                        'topics': [transfer_event_signature, None, wallet_address_padded]
+                    }
+                    return await self.w3.eth.get_logs(filter_params)
+                except Exception as e:
+                    print(f"Error fetching logs: {e}")
+                    failed.append((start_block, end_block))
+                    return []
+
+        chain_id = await self.w3.eth.chain_id
+        seen = set()
+        if incremental:
+            ranges = WALLET_INDEX.missing(chain_id, wallet_address, start_block, latest_block)
+            for token in WALLET_INDEX.tokens(chain_id, wallet_address, start_block):
+                seen.add(token)
+                yield token
+        else:
+            ranges = [(start_block, latest_block)]
+
+        windows = []
+        for from_block, to_block in ranges:
+            while from_block <= to_block:
+                end_block = min(from_block + batch_size - 1, to_block)
+                windows.append(asyncio.ensure_future(fetch_token_transfer_logs(from_block, end_block)))
+                from_block = end_block + 1
+
+        token_blocks = {}  # Token address -> last block a transfer to the wallet arrived in
+        try:
+            for window in asyncio.as_completed(windows):
+                for log in await window:
+                    token_blocks[log['address']] = max(token_blocks.get(log['address'], 0), log['blockNumber'])
+                    if log['address'] not in seen:
+                        seen.add(log['address'])
+                        yield log['address']
+        finally:
+            for window in windows:
+                window.cancel()
+        if not failed:  # Otherwise keep the checkpoint, the next call scans the missing windows again
+            WALLET_INDEX.record(chain_id, wallet_address, start_block, latest_block, token_blocks)
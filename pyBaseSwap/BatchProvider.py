@@ -0,0 +1,93 @@
+import threading
+from web3 import Web3
+from web3._utils.caching import handle_request_caching
+
+
+class _BatchedRequest:
+    """
+    A single JSON-RPC request waiting in the batch queue.
+    """
+    __slots__ = ("method", "params", "response", "error", "queued", "done")
+
+    def __init__(self, method, params):
+        self.method, self.params = method, params
+        self.response, self.error, self.queued, self.done = None, None, True, False
+
+
+class BatchHTTPProvider(Web3.HTTPProvider):
+    """
+    HTTP provider that coalesces concurrent requests into JSON-RPC batch arrays.
+
+    Requests from all threads go into one queue. While all `max_in_flight` POSTs are busy, new
+    requests wait in the queue, and the next free sender posts everything queued as one batch
+    and hands each caller its own response. A caller whose request was taken into another
+    thread's batch waits for that POST instead of sending one of its own. A caller that is
+    alone sends a normal single request, so sequential code sees no extra latency.
+
+    `max_in_flight` trades POSTs for latency: with 1, every thread waits behind the current
+    POST, so one slow `eth_getLogs` or `eth_call` also holds up e.g. the receipt polling.
+    A few parallel POSTs let other requests pass a slow one while still batching under load.
+
+    Args:
+        endpoint_uri (str): RPC endpoint.
+        request_kwargs (dict, optional): Keyword arguments passed to `requests`, e.g. the timeout.
+        max_batch_size (int, optional): Maximum requests per POST. Defaults to 100.
+        max_in_flight (int, optional): Maximum POSTs in flight at the same time. Defaults to 4.
+    """
+
+    def __init__(self, endpoint_uri=None, request_kwargs=None, max_batch_size: int = 100, max_in_flight: int = 4, **kwargs):
+        super().__init__(endpoint_uri, request_kwargs, **kwargs)
+        self.max_batch_size, self.max_in_flight = max_batch_size, max_in_flight
+        self._condition = threading.Condition()
+        self._queue = []  # Requests not sent yet, in arrival order
+        self._in_flight = 0  # POSTs currently being sent
+        self.posts = 0  # Number of HTTP POSTs made, for monitoring
+
+    @handle_request_caching
+    def make_request(self, method, params):
+        request = _BatchedRequest(method, params)
+        with self._condition:
+            self._queue.append(request)
+        while True:
+            with self._condition:
+                # Wait while all senders are busy or another thread already took this request into its batch
+                while not request.done and (self._in_flight >= self.max_in_flight or not request.queued):
+                    self._condition.wait()
+                if request.done:
+                    break
+                self._in_flight += 1
+                batch, self._queue = self._queue[:self.max_batch_size], self._queue[self.max_batch_size:]
+                for queued in batch:
+                    queued.queued = False
+            try:
+                self._send(batch)
+            finally:
+                with self._condition:
+                    self._in_flight -= 1
+                    self._condition.notify_all()
+        if request.error is not None:
+            raise request.error
+        return request.response
+
+    def _send(self, batch):
+        """
+        Posts a batch and stores each response on its request.
+        """
+        self.posts += 1
+        try:
+            if len(batch) == 1:
+                responses = [super().make_request(batch[0].method, batch[0].params)]
+            else:
+                responses = self.make_batch_request([(request.method, request.params) for request in batch])
+                if isinstance(responses, dict):  # The whole batch was rejected with one error object
+                    responses = [responses] * len(batch)
+                if len(responses) != len(batch):
+                    raise ValueError(f"RPC answered {len(responses)} of {len(batch)} batched requests")
+            for request, response in zip(batch, responses):
+                request.response = response
+        except Exception as e:
+            for request in batch:
+                request.error = e
+        finally:
+            for request in batch:
+                request.done = True
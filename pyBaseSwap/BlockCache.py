@@ -0,0 +1,279 @@
+import asyncio
+import json
+import logging
+import threading
+import time
+from web3.middleware.base import Web3Middleware
+
+
+class BlockCache:
+    """
+    Read cache keyed by `(block, request)` that serves repeated reads within one block from memory.
+
+    Reads of the `latest` state (`eth_call`, `eth_getBalance`, `eth_gasPrice`, ...) return the
+    same value until the next block, so the cache answers repeats of a request without an RPC
+    round trip and drops everything when a new head is seen. Heads are tracked by polling
+    `eth_blockNumber` every `interval` seconds in a background thread, which only runs while
+    the cache is used. Reads against a fixed block or `pending` are never cached.
+
+    The cache is installed as middleware of one connection with `BlockCache.attach(w3)`.
+
+    Example:
+        cache = BlockCache.attach(w3, interval=0.5)
+        ...
+        print(cache.stats())  # {"block": ..., "hits": ..., "misses": ..., "entries": ...}
+
+    Attributes:
+        CACHED_METHODS (dict): Cached method -> position of its block parameter, None if it has none.
+        interval (float): Seconds between two block number polls.
+        idle (float): Seconds without reads after which the poller stops.
+        block (int): Current head, None while unknown (nothing is cached then).
+        hits (int): Requests answered from the cache.
+        misses (int): Cacheable requests that went to the RPC.
+    """
+
+    CACHED_METHODS = {
+        "eth_call": 1,
+        "eth_getBalance": 1,
+        "eth_getCode": 1,
+        "eth_getStorageAt": 2,
+        "eth_getTransactionCount": 1,
+        "eth_gasPrice": None,
+        "eth_maxPriorityFeePerGas": None,
+        "eth_blobBaseFee": None,
+    }
+
+    def __init__(self, interval: float = 1.0, idle: float = 30.0):
+        """
+        Initializes an empty cache, no RPC request is made here.
+        - `interval`: Seconds between two block number polls (default 1).
+        - `idle`: Seconds without reads after which the poller stops (default 30).
+        """
+        self.interval, self.idle = float(interval), float(idle)
+        self._lock = threading.Lock()
+        self._entries = {}  # (method, params) -> response of the current block
+        self._lastRead = 0.0
+        self._poller = None
+        self.block = None
+        self.hits = self.misses = 0
+
+    @classmethod
+    def attach(cls, w3, interval: float = 1.0, **kwargs):
+        """
+        Creates a cache and installs it as the outermost middleware of a connection.
+        - `w3`: Web3 instance.
+        - `interval`: Seconds between two block number polls (default 1).
+
+        Returns the cache, e.g. to read its counters.
+        """
+        cache = cls(interval, **kwargs)
+        w3.middleware_onion.add(lambda w3: _BlockCacheMiddleware(w3, cache), name="block_cache")
+        return cache
+
+    def key(self, method, params):
+        """
+        Returns the cache key of a request, or None if the request must not be cached.
+        """
+        if method not in self.CACHED_METHODS:
+            return None
+        position = self.CACHED_METHODS[method]
+        if position is not None and len(params) > position and params[position] not in ("latest", None):
+            return None  # Reads of a fixed block, `pending` or `safe` are left to the RPC
+        return method, json.dumps(params, sort_keys=True, default=str)
+
+    def get(self, key):
+        """
+        Returns the cached response of a key in the current block, or None.
+        """
+        with self._lock:
+            self._lastRead = time.monotonic()
+            response = self._entries.get(key) if self.block is not None else None
+            if response is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+            return response
+
+    def put(self, key, block, response):
+        """
+        Stores a response if the head did not move while it was requested and it is no error.
+        - `key`: The cache key.
+        - `block`: The head when the request was sent.
+        - `response`: The raw JSON-RPC response.
+        """
+        if block is None or "error" in response:
+            return
+        with self._lock:
+            if block == self.block:
+                self._entries[key] = response
+
+    def new_head(self, number: int):
+        """
+        Moves the cache to a new head, every entry of the previous block is dropped. Can be fed
+        from an own `newHeads` subscription.
+        - `number`: The block number of the new head.
+        """
+        number = int(number)
+        with self._lock:
+            if number != self.block:
+                self._entries = {}
+                self.block = number
+
+    def clear(self):
+        """
+        Drops all entries and forgets the head until the next poll.
+        """
+        with self._lock:
+            self._entries = {}
+            self.block = None
+
+    def stats(self) -> dict:
+        """
+        Returns the current head, the hit and miss counters and the number of cached entries.
+        """
+        with self._lock:
+            return {"block": self.block, "hits": self.hits, "misses": self.misses, "entries": len(self._entries)}
+
+    def watch(self, make_request):
+        """
+        Starts the block number poller if it is not running.
+        - `make_request`: Sends a request to the RPC, below the cache.
+        """
+        with self._lock:
+            if self._poller is not None:
+                return
+            self._poller = threading.Thread(target=self._poll, args=(make_request,), name="BlockCache", daemon=True)
+            self._poller.start()
+
+    def _poll(self, make_request):
+        while True:
+            try:
+                response = make_request("eth_blockNumber", [])
+                self.new_head(int(response["result"], 16))
+            except Exception as e:
+                logging.warning(f"Polling the block number failed, cache disabled until the next poll: {e}")
+                self.clear()
+            time.sleep(self.interval)
+            with self._lock:
+                if time.monotonic() - self._lastRead > self.idle:
+                    self._poller = None
+                    self._entries, self.block = {}, None  # Heads are not followed anymore
+                    return
+
+
+class AsyncBlockCache(BlockCache):
+    """
+    Async counterpart of `BlockCache` for `AsyncWeb3`. Heads come from a `newHeads`
+    subscription on websocket connections (`await cache.subscribe(w3)`), otherwise a
+    task polls `eth_blockNumber` like the sync cache.
+    """
+
+    def __init__(self, interval: float = 1.0, idle: float = 30.0):
+        super().__init__(interval, idle)
+        self._subscription = None
+
+    @property
+    def subscribed(self) -> bool:
+        """
+        True while a `newHeads` subscription feeds the heads.
+        """
+        return self._subscription is not None
+
+    def watch(self, make_request):
+        """
+        Starts the block number polling task if it is not running and no subscription feeds the heads.
+        - `make_request`: Sends a request to the RPC, below the cache.
+        """
+        with self._lock:
+            if self._poller is not None or self._subscription is not None:
+                return
+            self._poller = asyncio.ensure_future(self._poll(make_request))
+
+    async def _poll(self, make_request):
+        while True:
+            try:
+                response = await make_request("eth_blockNumber", [])
+                self.new_head(int(response["result"], 16))
+            except Exception as e:
+                logging.warning(f"Polling the block number failed, cache disabled until the next poll: {e}")
+                self.clear()
+            await asyncio.sleep(self.interval)
+            with self._lock:
+                if time.monotonic() - self._lastRead > self.idle:
+                    self._poller = None
+                    self._entries, self.block = {}, None
+                    return
+
+    async def subscribe(self, w3):
+        """
+        Follows the heads with a `newHeads` subscription instead of polling. The subscription
+        is handled by the connection's subscription manager, its handler task is started here.
+        - `w3`: AsyncWeb3 instance with a persistent (websocket) provider.
+        """
+        from web3.utils.subscriptions import NewHeadsSubscription
+
+        async def on_head(context):
+            self.new_head(context.result["number"])
+
+        if self._poller is not None:
+            self._poller.cancel()
+            self._poller = None
+        self._subscription = NewHeadsSubscription(handler=on_head, label="block_cache")
+        await w3.subscription_manager.subscribe(self._subscription)
+        self._handler = asyncio.ensure_future(w3.subscription_manager.handle_subscriptions(run_forever=True))
+
+    async def close(self):
+        """
+        Stops the polling task or the subscription.
+        """
+        if self._poller is not None:
+            self._poller.cancel()
+            self._poller = None
+        if self._subscription is not None:
+            self._handler.cancel()
+            try:
+                await self._subscription.unsubscribe()
+            except Exception:
+                pass
+            self._subscription = None
+        self.clear()
+
+
+class _BlockCacheMiddleware(Web3Middleware):
+    """
+    Middleware that answers cacheable requests from a `BlockCache`.
+    """
+
+    def __init__(self, w3, cache):
+        super().__init__(w3)
+        self.cache = cache
+
+    def wrap_make_request(self, make_request):
+        def middleware(method, params):
+            key = self.cache.key(method, params)
+            if key is None:
+                return make_request(method, params)
+            self.cache.watch(make_request)
+            response = self.cache.get(key)
+            if response is None:
+                block = self.cache.block
+                response = make_request(method, params)
+                self.cache.put(key, block, response)
+            return response
+
+        return middleware
+
+    async def async_wrap_make_request(self, make_request):
+        async def middleware(method, params):
+            key = self.cache.key(method, params)
+            if key is None:
+                return await make_request(method, params)
+            self.cache.watch(make_request)
+            response = self.cache.get(key)
+            if response is None:
+                block = self.cache.block
+                response = await make_request(method, params)
+                self.cache.put(key, block, response)
+            return response
+
+        return middleware
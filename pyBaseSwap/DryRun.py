@@ -0,0 +1,122 @@
+from typing import NamedTuple, Optional
+from eth_abi import abi
+from web3 import Web3
+
+
+class SwapSimulation(NamedTuple):
+    """
+    Result of a simulated swap.
+
+    Attributes:
+        success (bool): True if the swap would not revert.
+        amountOut (int): Quoted output in wei at the simulated block and state.
+        minOut (int): Minimum output the swap was simulated with (slippage applied).
+        gasUsed (int): Gas estimate of the swap, None if it reverts.
+        revertReason (str): Decoded revert reason, None on success.
+    """
+    success: bool
+    amountOut: int
+    minOut: int
+    gasUsed: Optional[int]
+    revertReason: Optional[str]
+
+
+class DryRun:
+    """
+    Options of a simulated swap: the block and the state overrides it runs against.
+
+    Passing `dryRun=DryRun(...)` to a `Swap*` method runs the quote and then the exact swap
+    calldata with `eth_call` and `eth_estimateGas` instead of sending it. No nonce is used
+    and nothing is signed, so many candidate trades can be checked in parallel. The swap
+    functions return no data, the output is the quote read against the same block and state;
+    a successful simulation means the swap passes its minimum output check.
+
+    Allowances are overridden by writing the token's allowance mapping, whose storage slot
+    depends on the token contract (1 for the OpenZeppelin ERC20, for example).
+
+    Example:
+        sim = BS.SwapFromTokentoETHV2(amount, dryRun=DryRun(balance=10**18, allowances={token: 1}))
+        if sim.success: ...
+
+    Attributes:
+        block: Block to simulate on, "pending", "latest" or a block number.
+        balance (int): ETH balance of the sender in wei, None keeps the real balance.
+        allowances (dict): Token -> storage slot of its allowance mapping, the sender's
+            allowance for the swapper is set to the maximum.
+        code (dict): Address -> runtime bytecode to run in place of the deployed code.
+        overrides (dict): Further raw state overrides, merged last.
+    """
+
+    ERROR_SELECTOR = "0x08c379a0"  # Error(string)
+    PANIC_SELECTOR = "0x4e487b71"  # Panic(uint256)
+
+    def __init__(self, block="pending", balance: int = None, allowances: dict = None, code: dict = None, overrides: dict = None):
+        self.block = Web3.to_hex(block) if isinstance(block, int) else block
+        self.balance = balance
+        self.allowances = allowances or {}
+        self.code = code or {}
+        self.overrides = overrides or {}
+
+    @staticmethod
+    def allowanceSlot(owner: str, spender: str, slot: int) -> str:
+        """
+        Returns the storage key of `allowance[owner][spender]` of a Solidity
+        `mapping(address => mapping(address => uint256))` at a slot.
+        """
+        inner = Web3.keccak(abi.encode(["address", "uint256"], [owner, slot]))
+        return Web3.to_hex(Web3.keccak(abi.encode(["address", "bytes32"], [spender, inner])))
+
+    def stateOverride(self, sender: str, spender: str) -> dict:
+        """
+        Returns the `eth_call` state override set of the options, empty if nothing is overridden.
+        - `sender`: The swapping wallet.
+        - `spender`: The swapper contract.
+        """
+        state = {}
+
+        def account(address):
+            return state.setdefault(Web3.to_checksum_address(address), {})
+
+        if self.balance is not None:
+            account(sender)["balance"] = Web3.to_hex(int(self.balance))
+        for token, slot in self.allowances.items():
+            account(token).setdefault("stateDiff", {})[self.allowanceSlot(sender, spender, int(slot))] = "0x" + "ff" * 32
+        for address, code in self.code.items():
+            account(address)["code"] = code if isinstance(code, str) else Web3.to_hex(code)
+        for address, fields in self.overrides.items():
+            account(address).update(fields)
+        return state
+
+    def params(self, call: dict, state: dict) -> list:
+        """
+        Returns the params of an `eth_call` or `eth_estimateGas` request at the simulated block.
+        """
+        return [call, self.block, state] if state else [call, self.block]
+
+    @classmethod
+    def revertReason(cls, error) -> str:
+        """
+        Decodes the revert reason of a failed call from the RPC error, `Error(string)` and
+        `Panic(uint256)` included, otherwise returns the error message.
+        - `error`: The exception or the JSON-RPC error dict.
+        """
+        if isinstance(error, Exception):
+            data = getattr(error, "data", None)
+            response = getattr(error, "rpc_response", None)
+            if isinstance(response, dict) and isinstance(response.get("error"), dict):
+                error = response["error"]
+            elif error.args and isinstance(error.args[0], dict):
+                error = error.args[0]
+            elif isinstance(data, str):
+                error = {"message": str(error), "data": data}
+            else:
+                return str(error)
+        data = error.get("data")
+        if isinstance(data, dict):
+            data = data.get("data")
+        if isinstance(data, str):
+            if data.startswith(cls.ERROR_SELECTOR):
+                return abi.decode(["string"], bytes.fromhex(data[10:]))[0]
+            if data.startswith(cls.PANIC_SELECTOR):
+                return f"Panic({abi.decode(['uint256'], bytes.fromhex(data[10:]))[0]:#x})"
+        return error.get("message", str(error))
@@ -0,0 +1,158 @@
+import statistics
+import threading
+import time
+
+
+class FeeEngine:
+    """
+    EIP-1559 fee fields from a local base fee model, refreshed at most once per block.
+
+    One `eth_feeHistory` read gives the base fee of the next block, the gas used ratios and
+    the priority fees paid at a percentile over the last blocks. From that the engine predicts
+    the base fee of the following blocks with the EIP-1559 update rule of the chain, so the
+    fee fields of every transaction in the same block are computed without an RPC request.
+    `maxFeePerGas` covers the worst case base fee `headroom` blocks ahead, which is also the
+    price checked against `MaxTXFeeETH`.
+
+    There is one engine per `(chain_id, percentile)` in the process. It is stale once the
+    block cache reports a newer head or, without a block cache, after one block time.
+
+    Example:
+        engine = FeeEngine.of(8453)
+        if engine.stale():
+            engine.update(w3.manager.request_blocking(*engine.request()))
+        txn.update(engine.fees())
+
+    Attributes:
+        PARAMS (dict): Chain ID -> (elasticity multiplier, base fee change denominator).
+        DEFAULT_PARAMS (tuple): Update rule of chains missing in `PARAMS` (Ethereum mainnet).
+        HISTORY_BLOCKS (int): Blocks read with `eth_feeHistory`.
+        block (int): Latest block of the fee history, None until the first update.
+        baseFee (int): Base fee of the block after `block` in wei.
+        priorityFee (int): Median priority fee at the percentile in wei.
+        gasUsedRatio (float): Mean gas used ratio of the history blocks.
+    """
+
+    PARAMS = {
+        8453: (6, 250),  # Base
+        84532: (6, 250),  # Base Sepolia
+    }
+    DEFAULT_PARAMS = (2, 8)
+    HISTORY_BLOCKS = 10
+
+    _engines = {}  # (chain_id, percentile) -> FeeEngine
+    _engines_lock = threading.Lock()
+
+    def __init__(self, chain_id: int, percentile: float = 50, headroom: int = 3, block_time: float = 2.0):
+        """
+        Initializes an empty engine, no RPC request is made here.
+        - `chain_id`: Chain ID, selects the base fee update rule.
+        - `percentile`: Percentile of the priority fees paid in the history blocks (default 50).
+        - `headroom`: Blocks of worst case base fee growth covered by `maxFeePerGas` (default 3).
+        - `block_time`: Seconds per block, the history is refreshed after this without a block cache (default 2).
+        """
+        self.chain_id = int(chain_id)
+        self.percentile = percentile
+        self.headroom = int(headroom)
+        self.block_time = float(block_time)
+        self.elasticity, self.denominator = self.PARAMS.get(self.chain_id, self.DEFAULT_PARAMS)
+        self._lock = threading.Lock()
+        self._updated = 0.0
+        self.block = self.baseFee = self.priorityFee = None
+        self.gasUsedRatio = 1 / self.elasticity
+
+    @classmethod
+    def of(cls, chain_id: int, percentile: float = 50):
+        """
+        Returns the shared engine of a chain and percentile, creating it on first use.
+        - `chain_id`: Chain ID.
+        - `percentile`: Percentile of the priority fees (default 50).
+        """
+        key = int(chain_id), percentile
+        with cls._engines_lock:
+            engine = cls._engines.get(key)
+            if engine is None:
+                engine = cls._engines[key] = cls(chain_id, percentile)
+            return engine
+
+    def request(self) -> tuple:
+        """
+        Returns the raw `eth_feeHistory` request as (method, params), e.g. to batch it with other reads.
+        """
+        return "eth_feeHistory", [hex(self.HISTORY_BLOCKS), "latest", [self.percentile]]
+
+    def stale(self, head: int = None) -> bool:
+        """
+        Returns True if the history has to be read again before the next transaction.
+        - `head`: Current block number if known, e.g. from the block cache (optional).
+        """
+        if self.block is None:
+            return True
+        if head is not None:
+            return head > self.block
+        return time.monotonic() - self._updated >= self.block_time
+
+    def update(self, history):
+        """
+        Takes a fee history read with `request()`.
+        - `history`: The raw (hex) JSON-RPC result or the decoded `fee_history` result.
+        """
+        baseFees = [_int(fee) for fee in history["baseFeePerGas"]]
+        ratios = history["gasUsedRatio"]
+        rewards = [_int(reward[0]) for reward in history.get("reward") or [] if reward]
+        with self._lock:
+            self.block = _int(history["oldestBlock"]) + len(ratios) - 1
+            self.baseFee = baseFees[-1]  # The node returns the base fee of the next block as last entry
+            self.gasUsedRatio = statistics.fmean(ratios) if ratios else 1 / self.elasticity
+            self.priorityFee = int(statistics.median(rewards)) if rewards else 0
+            self._updated = time.monotonic()
+
+    def nextBaseFee(self, baseFee: int, gasUsedRatio: float) -> int:
+        """
+        Returns the base fee of the block after a block, by the EIP-1559 update rule of the chain.
+        - `baseFee`: Base fee of the block in wei.
+        - `gasUsedRatio`: Gas used divided by the gas limit of the block.
+        """
+        target = 1 / self.elasticity
+        change = baseFee * (gasUsedRatio - target) / target / self.denominator
+        if change > 0:
+            return baseFee + max(1, int(change))
+        return max(0, baseFee + int(change))
+
+    def predictBaseFee(self, blocks: int = 1) -> int:
+        """
+        Returns the expected base fee some blocks after the latest history block, assuming the
+        blocks stay as full as the history on average.
+        - `blocks`: Blocks ahead, 1 is the next block (default 1).
+        """
+        baseFee = self.baseFee
+        for _ in range(blocks - 1):
+            baseFee = self.nextBaseFee(baseFee, self.gasUsedRatio)
+        return baseFee
+
+    def maxBaseFee(self, blocks: int = 1) -> int:
+        """
+        Returns the highest possible base fee some blocks after the latest history block, when
+        every block in between is full. Exact integer math, rounded up.
+        - `blocks`: Blocks ahead, 1 is the next block (default 1).
+        """
+        growth = self.denominator + self.elasticity - 1
+        steps = blocks - 1
+        return -(-self.baseFee * growth**steps // self.denominator**steps)
+
+    def fees(self, offset: int = 0) -> dict:
+        """
+        Returns the fee fields of a type-2 transaction sent now, computed locally.
+        - `offset`: Added to the priority fee in wei, e.g. the `GWEI_OFFSET` (default 0).
+        """
+        with self._lock:
+            elapsed = int((time.monotonic() - self._updated) / self.block_time)
+            priorityFee = self.priorityFee + int(offset)
+            return {
+                "maxFeePerGas": self.maxBaseFee(1 + elapsed + self.headroom) + priorityFee,
+                "maxPriorityFeePerGas": priorityFee,
+            }
+
+
+def _int(value) -> int:
+    return int(value, 16) if isinstance(value, str) else int(value)
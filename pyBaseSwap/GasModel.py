@@ -0,0 +1,85 @@
+import math
+import threading
+from collections import deque
+from web3 import Web3
+
+
+class GasModel:
+    """
+    Process-wide model of the gas limits of known transaction shapes, learned from receipts.
+
+    The gas of a swap depends mostly on the swapper function (which also fixes the protocol
+    version) and the route, so a shape is `(chain_id, function, hops, path)`. Every mined
+    transaction of a shape records its `gasUsed`, the limit served for the shape is the
+    highest of the last `WINDOW` samples plus a safety margin. Shapes without samples return
+    None and are estimated with `eth_estimateGas`. A failed transaction drops its shape,
+    so the next one is estimated again.
+
+    Attributes:
+        WINDOW (int): Samples kept per shape.
+    """
+
+    WINDOW = 20
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._samples = {}  # shape -> deque of gasUsed
+        self.hits = self.misses = 0
+
+    @staticmethod
+    def key(chain_id, function: str, path) -> tuple:
+        """
+        Returns the shape of a transaction.
+        - `chain_id`: Chain ID.
+        - `function`: Name of the called contract function, e.g. `swapETHtoTokenV3` or `approve`.
+        - `path`: Token path of a swap, or the token of an approve.
+        """
+        path = tuple(Web3.to_checksum_address(token) for token in path)
+        return int(chain_id), function, len(path) - 1, path
+
+    def limit(self, shape, margin: float):
+        """
+        Returns the learned gas limit of a shape, or None if the shape was not seen yet.
+        - `shape`: The shape from `key`.
+        - `margin`: Safety margin on top of the highest sample, e.g. 0.2 for 20%.
+        """
+        with self._lock:
+            samples = self._samples.get(shape)
+            if not samples:
+                self.misses += 1
+                return None
+            self.hits += 1
+            return math.ceil(max(samples) * (1 + margin))
+
+    def record(self, shape, gasUsed: int):
+        """
+        Adds the `gasUsed` of a mined transaction to its shape.
+        - `shape`: The shape from `key`.
+        - `gasUsed`: Gas used according to the receipt.
+        """
+        with self._lock:
+            samples = self._samples.get(shape)
+            if samples is None:
+                samples = self._samples[shape] = deque(maxlen=self.WINDOW)
+            samples.append(int(gasUsed))
+
+    def forget(self, shape=None):
+        """
+        Drops the samples of one shape or of all shapes.
+        - `shape`: The shape from `key`, None for all (optional).
+        """
+        with self._lock:
+            if shape is None:
+                self._samples = {}
+            else:
+                self._samples.pop(shape, None)
+
+    def stats(self) -> dict:
+        """
+        Returns the hit and miss counters and the number of learned shapes.
+        """
+        with self._lock:
+            return {"hits": self.hits, "misses": self.misses, "shapes": len(self._samples)}
+
+
+GAS_MODEL = GasModel()  # Shared by every client in the process
@@ -1,6 +1,12 @@
+import logging
 from web3 import Web3
 from .core_abis import IERC20_ABI  # Import the ERC-20 ABI, adjust the import path as necessary
 from .core_chains import chains  # Import the chains class, adjust the import path as necessary
+from .TokenMetadataCache import TOKEN_METADATA  # Process-wide cache for decimals, name and symbol
+from .PendingSwap import PendingSwap  # Handle of a sent transaction
+from .GasModel import GasModel  # Learned gas limits of known transaction shapes
+from .AllowanceCache import ALLOWANCES  # Process-wide cache of unlimited approvals
+from .AbiCodec import AbiCodec  # Offline calldata encoder
 
 class IERC20:
     """
@@ -34,10 +40,40 @@ class IERC20:
         self.user_address = settings.settings["address"]  # User's wallet address from settings
         self.priv_key = settings.settings["private_key"]  # User's private key for signing transactions
         self.w3 = w3  # Web3 instance for blockchain connection
-        self.token = token  # ERC-20 token contract address
+        self.token = token  # ERC-20 token contract address, None falls back to the chain's default token
         self.w3U = w3U  # Utility object for helper functions
-        self.chain = chains(self.w3.eth.chain_id)  # Chain setup using the chain ID from Web3 instance
-        self.token_Instance = self.init_token_instance()  # Initialize the ERC-20 contract instance
+        self._token_Instance = None  # ERC-20 contract instance, built on first use
+
+    @property
+    def chain(self):
+        """
+        Chain setup of the connected network, the chain ID is fetched once per provider.
+        """
+        return chains.of(self.w3)
+
+    @property
+    def token(self):
+        """
+        Checksummed address of the current token. Without a token the chain's default token is used,
+        resolved on first access.
+        """
+        if self._token is None:
+            logging.info("No token address provided, falling back to USDC")
+            self._token = Web3.to_checksum_address(self.chain.BTT)
+        return self._token
+
+    @token.setter
+    def token(self, token):
+        self._token = Web3.to_checksum_address(token) if token else None
+
+    @property
+    def token_Instance(self):
+        """
+        ERC-20 contract instance of the current token, rebuilt only when the token or connection changed.
+        """
+        if self._token_Instance is None or self._token_Instance.address != self.token or self._token_Instance.w3 is not self.w3:
+            self._token_Instance = self.init_token_instance()
+        return self._token_Instance
         
     def init_token_instance(self):
         """
@@ -61,12 +97,6 @@ class IERC20:
         """
         return self.get_token_balance_(address)
     
-    def get_token_balance_(self):
-        """
-        Returns the user's token balance in Wei.
-        """
-        return self.get_token_balance_(self.user_address)  # Use the user's own address for balance lookup
-    
     def get_token_balance(self):
         """
         Returns the user's token balance in a human-readable format (converted from Wei).
@@ -84,39 +114,76 @@ class IERC20:
         """
         Returns the token's contract address.
         """
-        return Web3.to_checksum_address(self.token_Instance.address)  # Convert to checksum address format
+        return self.token  # Already checksummed, no contract instance needed
 
     def get_token_decimals(self):
         """
         Returns the number of decimals for the token (used for conversion from Wei).
+        The value is cached process-wide, only the first call per token does an RPC request.
         """
-        return self.token_Instance.functions.decimals().call()  # Calls the `decimals` function on the ERC-20 token contract
+        return self.get_token_metadata("decimals")
 
     def get_token_Name(self):
         """
-        Returns the name of the token.
+        Returns the name of the token (cached process-wide).
         """
-        return self.token_Instance.functions.name().call()  # Calls the `name` function on the ERC-20 token contract
+        return self.get_token_metadata("name")
 
     def get_token_Symbol(self):
         """
-        Returns the symbol of the token.
+        Returns the symbol of the token (cached process-wide).
         """
-        return self.token_Instance.functions.symbol().call()  # Calls the `symbol` function on the ERC-20 token contract
-    
-    def get_token_balance_(self, address):
+        return self.get_token_metadata("symbol")
+
+    def get_token_metadata(self, field):
+        """
+        Returns a metadata field of the token from the metadata cache, fetching it on a miss.
+        - `field`: One of `decimals`, `name`, `symbol`.
+        """
+        value = TOKEN_METADATA.get(self.chain.chainID, self.token, field)
+        if value is None:
+            value = getattr(self.token_Instance.functions, field)().call()  # Calls `decimals`, `name` or `symbol` on the ERC-20 token contract
+            TOKEN_METADATA.set(self.chain.chainID, self.token, **{field: value})
+        return value
+
+    def prefetch_token_metadata(self, tokens: list):
+        """
+        Fetches decimals, name and symbol of many tokens with Multicall3 and stores them in the metadata cache.
+        - `tokens`: Token addresses.
+        """
+        TOKEN_METADATA.prefetch(self.w3, self.chain, tokens)
+
+    def get_token_balance_(self, address=None):
         """
         Returns the token balance in Wei for a specific address.
-        - `address`: Address to check the balance for.
+        - `address`: Address to check the balance for (defaults to the user's own address).
         """
+        address = address or self.user_address  # Use the user's own address for balance lookup
         return self.token_Instance.functions.balanceOf(Web3.to_checksum_address(address)).call()  # Calls the `balanceOf` function
     
-    def get_token_allowance(self, spender):
+    def get_token_allowance_(self, spender):
         """
         Returns the token allowance for a spender in Wei.
         - `spender`: Address of the spender.
         """
-        return self.token_Instance.functions.allowance(self.user_address, spender).call()  # Calls the `allowance` function
+        return self.token_Instance.functions.allowance(self.user_address, Web3.to_checksum_address(spender)).call()  # Calls the `allowance` function
+
+    def sync_allowances(self):
+        """
+        Applies the `Approval` events of the wallet since the last sync to the allowance cache,
+        for all tokens, with one `eth_getLogs` request. The first call only sets the starting block.
+        Call it periodically in long running bots to notice approvals changed by other apps.
+        """
+        head = self.w3.eth.block_number
+        start = ALLOWANCES.checkpoint(self.chain.chainID, self.user_address)
+        if start is not None and head > start:
+            logs = self.w3.eth.get_logs({
+                "fromBlock": start + 1,
+                "toBlock": head,
+                "topics": [ALLOWANCES.APPROVAL_TOPIC, "0x" + "00" * 12 + self.user_address[2:].lower()]
+            })
+            ALLOWANCES.applyLogs(self.chain.chainID, logs)
+        ALLOWANCES.setCheckpoint(self.chain.chainID, self.user_address, head)
     
     def approveSwapper_(self, amount):
         """
@@ -134,44 +201,73 @@ class IERC20:
     
     def is_approved(self, spender, amountIn):
         """
-        Checks if the spender is already approved for a given amount.
+        Checks if the spender is already approved for a given amount. Spenders known to be
+        max-approved are answered from the allowance cache without an RPC request.
         - `spender`: Address of the spender.
         - `amountIn`: Amount to check for approval.
         """
-        allowance = self.get_token_allowance(spender)  # Get current allowance for spender
+        key = ALLOWANCES.key(self.chain.chainID, self.token, self.user_address, spender)
+        if ALLOWANCES.approved(key):
+            return True
+        allowance = self.get_token_allowance_(spender)  # Get current allowance for spender
+        ALLOWANCES.set(key, allowance)
         return int(allowance) >= int(amountIn)  # Check if the allowance is greater than or equal to the required amount
+
+    def _approveTransaction(self, spender, amount: int):
+        """
+        Builds an approve transaction offline with the current fee fields, gas and nonce are set when it is sent.
+        - `spender`: Address of the spender.
+        - `amount`: Amount to approve in Wei.
+        """
+        return AbiCodec.of(IERC20_ABI).transaction(
+            "approve", [Web3.to_checksum_address(spender), int(amount)], self.token, self.user_address,
+            chainId=self.chain.chainID, **self.w3U.getFees()  # Gas price or EIP-1559 fees including the GWEI offset
+        )
+
+    def _trackApproval(self, spender, amount: int, result):
+        """
+        Keeps the allowance cache in line with a sent approval: the approval counts from the moment it
+        is sent and is dropped again if it fails.
+        - `spender`: Address of the spender.
+        - `amount`: Approved amount in Wei.
+        - `result`: The result of `signAndSend`, a tuple or a `PendingSwap`.
+        """
+        key = ALLOWANCES.key(self.chain.chainID, self.token, self.user_address, spender)
+        if isinstance(result, PendingSwap):
+            ALLOWANCES.set(key, amount)
+
+            def dropIfFailed(done):
+                if done.exception() is not None or not done.result()[0]:
+                    ALLOWANCES.set(key, 0)  # The approval failed, read the allowance next time
+
+            result.add_done_callback(dropIfFailed)
+        else:
+            ALLOWANCES.set(key, amount if result[0] else 0)
+        return result
+    
+    def _sendApproval(self, spender, amount: int, wait: bool = True):
+        """
+        Sends an approve transaction without checking the current allowance and keeps the allowance cache in line.
+        - `spender`: Address of the spender.
+        - `amount`: Amount to approve in Wei.
+        - `wait`: Wait for the receipt (default). If False, a `PendingSwap` is returned right after sending.
+        """
+        txn = self._approveTransaction(spender, amount)
+        result = self.w3U.signAndSend(txn, wait, GasModel.key(self.chain.chainID, "approve", [self.token]))
+        return self._trackApproval(spender, amount, result)
     
-    def approve(self, spender, amountIn: int = 0):
+    def approve(self, spender, amountIn: int = 0, wait: bool = True):
         """
         Approves the spender to spend a specified amount of tokens on the user's behalf.
         - `spender`: Address of the spender.
         - `amountIn`: Amount to approve (default is 0, meaning full approval).
+        - `wait`: Wait for the receipt (default). If False, a `PendingSwap` is returned right after sending.
         """
         if not self.is_approved(spender, amountIn):
             approveAmount = 2**256 - 1  # Set the approval amount to max (2^256 - 1)
             if amountIn > 0:
                 approveAmount = amountIn  # Use the specified amount if it's greater than 0
-            txn = self.token_Instance.functions.approve(
-                Web3.to_checksum_address(spender),
-                approveAmount
-            ).build_transaction({
-                'from': self.user_address,
-                'gasPrice': self.w3.eth.gas_price + Web3.to_wei(self.settings.settings["GWEI_OFFSET"], "gwei"),  # Add gas price offset
-                'nonce': self.w3.eth.get_transaction_count(self.user_address),
-                'value': 0
-            })
-            gas = self.w3U.estimateGas(txn)  # Estimate gas cost for the transaction
-            txn.update({'gas': int(gas[0])})  # Update transaction with the estimated gas
-            signed_txn = self.w3.eth.account.sign_transaction(
-                txn,
-                self.priv_key  # Sign the transaction with the user's private key
-            )
-            txn = self.w3.eth.send_raw_transaction(signed_txn.raw_transaction)  # Send the signed transaction
-            txn_receipt = self.w3.eth.wait_for_transaction_receipt(
-                txn, timeout=self.settings.settings["timeout"])  # Wait for transaction receipt
-            if txn_receipt['status'] == 1:  # Check if the transaction was successful
-                return True, txn.hex(), gas
-            else:
-                return False, txn.hex(), gas
+            return self._sendApproval(spender, approveAmount, wait)
         else:
-            return True, "0", "Already Approved"  # Return if already approved
+            result = True, "0", "Already Approved"  # Return if already approved
+            return result if wait else PendingSwap.resolved(result)
@@ -1,8 +1,19 @@
 from web3 import Web3
 from eth_abi import abi
 from .core_abis import BTTSwapper_ABI
+from .TokenMetadataCache import TOKEN_METADATA
 from .core_chains import chains
-import time, json
+from .Multicall import MulticallBatch
+from .AbiCodec import AbiCodec
+from .PendingSwap import PendingSwap
+from .NonceManager import NonceManager
+from .WalletAssets import WalletAssets
+from .RouteCache import ROUTES, RouteCache
+from .GasModel import GasModel
+from .DryRun import DryRun, SwapSimulation
+from .RetryPolicy import RetryPolicy, SwapOutcome
+import json, queue, threading, logging
+from concurrent.futures import ThreadPoolExecutor
 
 
 class InterfaceSwapperContract: #ISC
@@ -12,6 +23,14 @@ class InterfaceSwapperContract: #ISC
     This class provides methods for querying token prices, liquidity, swapping tokens,
     and building transactions for multiple token swap protocols (V2 and V3).
     """
+
+    WALLET_BATCH_SIZE = 28  # Tokens per getWalletTokenDATA call before the size is tuned
+    MAX_WALLET_BATCH_SIZE = 250
+    RETRY_POLICY = RetryPolicy()  # Error classification and backoff of the swap retries
+    SELL_GAS_LIMIT = 500000  # Gas limit of a sell sent behind its approve while the gas model does not know the swap
+    _walletBatchSizes = {}  # (chain id, RPC endpoint) -> tuned tokens per getWalletTokenDATA call
+    _walletBatchLimits = {}  # (chain id, RPC endpoint) -> smallest batch size that hit a limit
+    BATCH_LIMIT_ERRORS = ("gas", "too large", "exceed", "limit", "size", "timeout")  # Errors that mean the batch was too big
     
     def __init__(self, settings, w3, IERC20, w3U):
         """
@@ -23,8 +42,23 @@ class InterfaceSwapperContract: #ISC
         :param w3U: Utility functions for Web3-related conversions.
         """
         self.settings, self.user_address, self.priv_key, self.w3, self.IERC20, self.w3U = settings, settings.settings["address"], settings.settings["private_key"], w3, IERC20, w3U
-        self.chain = chains(self.w3.eth.chain_id)
-        self.BTTSwapper = self.initRouter()
+        self._BTTSwapper = None  # Built on first use
+
+    @property
+    def chain(self):
+        """
+        Chain setup of the connected network, the chain ID is fetched once per provider.
+        """
+        return chains.of(self.w3)
+
+    @property
+    def BTTSwapper(self):
+        """
+        Swapper contract instance, built on first use and rebuilt only after the connection changed.
+        """
+        if self._BTTSwapper is None or self._BTTSwapper.w3 is not self.w3:
+            self._BTTSwapper = self.initRouter()
+        return self._BTTSwapper
 
     def initRouter(self):
         """
@@ -35,6 +69,17 @@ class InterfaceSwapperContract: #ISC
         BTTSwapper = self.w3.eth.contract(
             address=self.chain.BTTSwapper, abi=BTTSwapper_ABI)
         return BTTSwapper
+
+    def batch(self):
+        """
+        Starts a batch of reads that is executed with a single `eth_call` through Multicall3.
+
+        Example:
+            price, liquidity, decimals = BS.batch().getUSDPriceOf(a).getLiquidityUSD(b).decimals(c).execute()
+
+        :return: An empty MulticallBatch bound to this interface.
+        """
+        return MulticallBatch(self)
     
     def getAmountsOutV3(self, pools, path, amountIn):
         """
@@ -45,9 +90,7 @@ class InterfaceSwapperContract: #ISC
         :param amountIn: Input amount of tokens.
         :return: The output token amount for the given input and path.
         """
-        return self.BTTSwapper.functions.getAmountsOutV3(
-            pools, path, amountIn
-            ).call()
+        return self._swapperRead("getAmountsOutV3", [pools, path, amountIn])
     
     def getAmountsOutV2(self, amountIn, path, dexPath):
         """
@@ -58,9 +101,7 @@ class InterfaceSwapperContract: #ISC
         :param dexPath: Decentralized exchanges involved in the swap.
         :return: The output token amount for the given input and path.
         """
-        return self.BTTSwapper.functions.getAmountsOutV2(
-            amountIn, path, dexPath
-            ).call()
+        return self._swapperRead("getAmountsOutV2", [amountIn, path, dexPath])
     
     def getUSDPrice_(self):
         """
@@ -154,11 +195,11 @@ class InterfaceSwapperContract: #ISC
         :param inputAmount: Input ETH amount.
         :return: Output token amount in Wei.
         """
-        return self.BTTSwapper.functions.getAmountsOut(
+        return self._swapperRead("getAmountsOut", [
             self.IERC20.get_token_address(),
             self.chain.WETH,
             inputAmount
-        ).call()
+        ])
 
     def getAmountsOutETHToToken_(self, inputAmount:int):
         """
@@ -167,11 +208,11 @@ class InterfaceSwapperContract: #ISC
         :param inputAmount: Input ETH amount.
         :return: Output token amount in Wei.
         """
-        return self.BTTSwapper.functions.getAmountsOut(
+        return self._swapperRead("getAmountsOut", [
             self.chain.WETH,
             self.IERC20.get_token_address(),
             inputAmount
-        ).call()
+        ])
     
     def getAmountsOutTokenToToken_(self, tokenIn, tokenOut, inputAmount:int):
         """
@@ -182,11 +223,11 @@ class InterfaceSwapperContract: #ISC
         :param inputAmount: Input token amount.
         :return: Output token amount in Wei.
         """
-        return self.BTTSwapper.functions.getAmountsOut(
+        return self._swapperRead("getAmountsOut", [
             Web3.to_checksum_address(tokenIn),
             Web3.to_checksum_address(tokenOut),
             inputAmount
-        ).call()
+        ])
     
     def getLiquidityUSD_(self):
         """
@@ -217,7 +258,7 @@ class InterfaceSwapperContract: #ISC
 
         :return: Swap protocol version number.
         """
-        return self.BTTSwapper.functions.checkVersion(self.IERC20.get_token_address()).call()
+        return self._cachedRoute(self.IERC20.get_token_address(), None, None, "checkVersion", [self.IERC20.get_token_address()])
 
     def getTokenInfos(self):
         """
@@ -252,51 +293,209 @@ class InterfaceSwapperContract: #ISC
             self.chain.WETH
             ).call(), "mwei")
     
-    def getWalletTokenDATA(self, wallet_address:str, tokenList:list):
+    def getWalletTokenDATA(self, wallet_address:str, tokenList:list, columnar: bool = False):
         """
         Fetches wallet token data such as balances, decimals, prices for the provided list of tokens.
-        Breaks the calls into batches of 28 addresses to handle large lists.
-
-        Returns a JSON string with Price, Decimal, Balance, Version, and Address for each token.
+        Breaks the calls into batches to handle large lists. All batches, the ETH price and the ETH
+        balance are sent in one round trip (JSON-RPC batches posted concurrently). The batch size
+        adapts to the limits of the RPC: it grows after clean rounds and shrinks when a batch reverts,
+        the reverted batch is split and sent again.
 
+        :param wallet_address: Wallet to fetch the holdings of.
         :param tokenList: List of token addresses.
-        :returns: JSON string containing the token data.
+        :param columnar: Return a `WalletAssets` with raw wei columns instead of dicts, values are formatted on access.
+        :returns: List of token data dicts (or `WalletAssets`) sorted by USD balance.
         """
-        MAX_BATCH_SIZE = 28
+        wallet_address = Web3.to_checksum_address(wallet_address)
         tokenList = [Web3.to_checksum_address(address) for address in tokenList]
+        batchSize = self._walletBatchSize()
+        tokenBatches = [tokenList[i:i + batchSize] for i in range(0, len(tokenList), batchSize)]
+        codec = AbiCodec.of(BTTSwapper_ABI)
+
+        results = self.w3U.batchRequest(
+            [self._swapperCall("getUSDPrice", [self.chain.WETH]), ("eth_getBalance", [wallet_address, "latest"])] +
+            [self._swapperCall("getWalletTokenDATA", [wallet_address, tokenBatch]) for tokenBatch in tokenBatches],
+            return_errors=True
+        )
+        for result in results[:2]:
+            if isinstance(result, Exception):
+                raise result
+        ethPrice = Web3.from_wei(codec.decode("getUSDPrice", Web3.to_bytes(hexstr=results[0])), "mwei")
+        ethBalance = int(results[1], 16)
+        if columnar:
+            assets = self._walletTokenRows(wallet_address, tokenBatches, ethPrice, results[2:], WalletAssets(ethPrice, self.w3U.get_human_amount))
+            assets.append_native(ethBalance)
+            return assets.sort()
+        tokenDataList = self._walletTokenRows(wallet_address, tokenBatches, ethPrice, results[2:])
+        tokenDataList.append(self._nativData(ethPrice, ethBalance))
+        return sorted(tokenDataList, key=lambda x: float(x["BalanceUSD"]), reverse=True)
+
+    def _swapperCall(self, name, args):
+        """
+        Builds a raw `eth_call` request to the swapper contract for `batchRequest`.
+
+        :param name: Name of the swapper function.
+        :param args: Arguments of the call.
+        :returns: The (method, params) tuple.
+        """
+        return ("eth_call", [{"to": self.chain.BTTSwapper, "data": Web3.to_hex(AbiCodec.of(BTTSwapper_ABI).encode(name, args))}, "latest"])
+
+    def _swapperRead(self, name, args):
+        """
+        Calls a view function of the swapper with the precompiled encoder, skipping the function
+        lookup and argument normalization of the contract object.
+
+        :param name: Name of the swapper function.
+        :param args: Arguments of the call, addresses in checksum format.
+        :returns: The decoded result, like `ContractFunction.call()`.
+        """
+        codec = AbiCodec.of(BTTSwapper_ABI)
+        return codec.decode(name, self.w3.eth.call({"to": self.chain.BTTSwapper, "data": Web3.to_hex(codec.encode(name, args))}))
+
+    def _swapTransaction(self, name, args, value: int = 0):
+        """
+        Builds a swap transaction offline with the precompiled encoder and the current fee fields.
+        The gas is estimated and the nonce allocated when it is sent.
+
+        :param name: Name of the swapper swap function.
+        :param args: Arguments of the swap.
+        :param value: ETH value in wei sent with the swap.
+        :returns: The transaction dict.
+        """
+        return AbiCodec.of(BTTSwapper_ABI).transaction(
+            name, args, self.chain.BTTSwapper, self.user_address, value,
+            chainId=self.chain.chainID, **self.w3U.getFees()
+        )
+
+    def _walletTokenRows(self, wallet_address, tokenBatches, ethPrice, results=None, assets=None):
+        """
+        Prices token batches with `getWalletTokenDATA`, every round in one batched request.
+
+        :param wallet_address: Wallet to fetch the holdings of.
+        :param tokenBatches: Lists of token addresses.
+        :param ethPrice: ETH price in USD.
+        :param results: Raw results of the first round, if it was sent together with other reads.
+        :param assets: `WalletAssets` to add the rows to instead of building dicts (optional).
+        :returns: List of token data dicts, or `assets`.
+        """
+        codec = AbiCodec.of(BTTSwapper_ABI)
         tokenDataList = []
-        ethPrice = self.getETHUSDPrice()
-
-        for i in range(0, len(tokenList), MAX_BATCH_SIZE):
-            tokenBatch = tokenList[i:i + MAX_BATCH_SIZE]
-            tokenAddress, tokenName, tokenSymbol, tokenDecimals, tokensVersion, tokenBalances, tokenUSDPrice, tokenETHPrice = (
-                self.BTTSwapper.functions.getWalletTokenDATA(wallet_address, tokenBatch).call()
-            )
-            for j in range(len(tokenBatch)):
-                hBalance = tokenBalances[j] / 10**tokenDecimals[j]
-                tokenPriceEth = Web3.from_wei(tokenETHPrice[j], "ether")
-                tokenUSD = tokenPriceEth * ethPrice
-                
-                tokenData = {
-                    "Address": tokenAddress[j],
-                    "Name": tokenName[j],
-                    "Symbol": tokenSymbol[j],
-                    "Decimals": int(tokenDecimals[j]),
-                    "UniswapV": tokensVersion[j],
-                    "BalanceWei": tokenBalances[j],
-                    "Balance": hBalance,
-                    "BalanceUSD": float(self.w3U.get_human_amount(float(tokenUSD) * float(hBalance))),
-                    "USDPriceWei": tokenUSDPrice[j],
-                    "ETHPriceWei": tokenETHPrice[j],
-                    "USDPrice":  self.w3U.get_human_amount(float(tokenUSD)),
-                    "ETHPrice": self.w3U.get_human_amount(tokenPriceEth)
-                }
-                tokenDataList.append(tokenData)
+        while tokenBatches:
+            if results is None:
+                results = self.w3U.batchRequest(
+                    [self._swapperCall("getWalletTokenDATA", [wallet_address, tokenBatch]) for tokenBatch in tokenBatches],
+                    return_errors=True
+                )
+            rows, tokenBatches = self._settleWalletBatches(
+                tokenBatches, results, ethPrice, lambda result: codec.decode("getWalletTokenDATA", Web3.to_bytes(hexstr=result)), assets)
+            tokenDataList += rows
+            results = None
+        return tokenDataList if assets is None else assets
+
+    def _settleWalletBatches(self, tokenBatches, results, ethPrice, decode=None, assets=None):
+        """
+        Turns one round of `getWalletTokenDATA` results into rows and tunes the batch size.
+        Failed batches are split in half for the next round, a single token that still
+        fails is skipped.
+
+        :param tokenBatches: The token batches of the round.
+        :param results: Result or exception per batch.
+        :param ethPrice: ETH price in USD.
+        :param decode: Decodes a raw result (optional).
+        :param assets: `WalletAssets` to add the rows to instead of returning dicts (optional).
+        :returns: The rows and the batches to send again.
+        """
+        tokenDataList, retry, failed, tooLarge = [], [], [], False
+        for tokenBatch, result in zip(tokenBatches, results):
+            if isinstance(result, Exception):
+                if len(tokenBatch) == 1:
+                    logging.warning(f"Skipping {tokenBatch[0]}, getWalletTokenDATA fails for it: {result}")
+                    continue
+                failed.append(len(tokenBatch))
+                tooLarge = tooLarge or any(hint in str(result).lower() for hint in self.BATCH_LIMIT_ERRORS)
+                half = len(tokenBatch) // 2
+                retry += [tokenBatch[:half], tokenBatch[half:]]
+            elif assets is not None:
+                result = decode(result) if decode else result
+                assets.extend(result)
+                self._keepTokenMetadata(result)
+            else:
+                tokenDataList += self._tokenDataRows(decode(result) if decode else result, ethPrice)
+        key, batchSize = self._walletBatchKey(), self._walletBatchSize()
+        if failed and (tooLarge or len(failed) == len(tokenBatches)):
+            # Gas or response limit of the RPC, a plain revert of a single bad token only splits its batch
+            self._walletBatchLimits[key] = min(self._walletBatchLimits.get(key, self.MAX_WALLET_BATCH_SIZE + 1), min(failed))
+            self._walletBatchSizes[key] = max(1, min(batchSize, min(failed) // 2))
+        elif any(len(tokenBatch) >= batchSize and not isinstance(result, Exception) for tokenBatch, result in zip(tokenBatches, results)):
+            limit = self._walletBatchLimits.get(key, self.MAX_WALLET_BATCH_SIZE + 1) - 1  # Stay below the smallest size that failed
+            self._walletBatchSizes[key] = max(batchSize, min(limit, batchSize + batchSize // 2))
+        return tokenDataList, retry
+
+    def _walletBatchKey(self):
+        return self.chain.chainID, str(getattr(self.w3.provider, "endpoint_uri", None))
+
+    def _walletBatchSize(self):
+        """
+        Returns the tuned number of tokens per `getWalletTokenDATA` call of the connected RPC.
+        """
+        return self._walletBatchSizes.get(self._walletBatchKey(), self.WALLET_BATCH_SIZE)
+
+    def _tokenDataRows(self, result, ethPrice):
+        """
+        Builds the token data dicts of one decoded `getWalletTokenDATA` batch and keeps the
+        token metadata that comes with it.
+
+        :param result: The decoded `getWalletTokenDATA` result.
+        :param ethPrice: ETH price in USD.
+        :returns: List of token data dicts.
+        """
+        tokenAddress, tokenName, tokenSymbol, tokenDecimals, tokensVersion, tokenBalances, tokenUSDPrice, tokenETHPrice = result
+        tokenDataList = []
+        for j in range(len(tokenAddress)):
+            hBalance = tokenBalances[j] / 10**tokenDecimals[j]
+            tokenPriceEth = Web3.from_wei(tokenETHPrice[j], "ether")
+            tokenUSD = tokenPriceEth * ethPrice
+
+            tokenData = {
+                "Address": tokenAddress[j],
+                "Name": tokenName[j],
+                "Symbol": tokenSymbol[j],
+                "Decimals": int(tokenDecimals[j]),
+                "UniswapV": tokensVersion[j],
+                "BalanceWei": tokenBalances[j],
+                "Balance": hBalance,
+                "BalanceUSD": float(self.w3U.get_human_amount(float(tokenUSD) * float(hBalance))),
+                "USDPriceWei": tokenUSDPrice[j],
+                "ETHPriceWei": tokenETHPrice[j],
+                "USDPrice":  self.w3U.get_human_amount(float(tokenUSD)),
+                "ETHPrice": self.w3U.get_human_amount(tokenPriceEth)
+            }
+            tokenDataList.append(tokenData)
+        self._keepTokenMetadata(result)
+        return tokenDataList
+
+    def _keepTokenMetadata(self, result):
+        """
+        Stores the metadata of a decoded `getWalletTokenDATA` batch, it comes for free here and
+        saves the metadata reads of later balance and swap calls.
+
+        :param result: The decoded `getWalletTokenDATA` result.
+        """
+        tokenAddress, tokenName, tokenSymbol, tokenDecimals = result[:4]
+        TOKEN_METADATA.update(self.chain.chainID, {
+            tokenAddress[j]: {"decimals": tokenDecimals[j], "name": tokenName[j], "symbol": tokenSymbol[j]} for j in range(len(tokenAddress))
+        })
 
-                
-        ethBalance = self.getETHBalanceOf_(wallet_address)
+    def _nativData(self, ethPrice, ethBalance):
+        """
+        Builds the token data dict of the native ETH balance.
+
+        :param ethPrice: ETH price in USD.
+        :param ethBalance: ETH balance in wei.
+        :returns: Token data dict of ETH.
+        """
         eths = Web3.from_wei(ethBalance,"ether")
-        nativData = {
+        return {
                 "Address": "Nativ",
                 "Name": "Ethereum",
                 "Symbol": "ETH",
@@ -309,16 +508,89 @@ class InterfaceSwapperContract: #ISC
                 "ETHPriceWei": 1*(10**18),
                 "USDPrice":  self.w3U.get_human_amount(float(ethPrice)),
                 "ETHPrice": 1
-        }        
-        tokenDataList.append(nativData)
-        return sorted(tokenDataList, key=lambda x: float(x["BalanceUSD"]), reverse=True)
+        }
 
-    
-    def getWalletAssets(self, wallet_address: str, batch_size: int=10000, blocks_to_check: int = 150000):
-        tokenList = self.w3U.getWalletTokens(wallet_address, batch_size, blocks_to_check)
-        tokenHoldings = self.getWalletTokenDATA(wallet_address, tokenList)
+    def getWalletAssets(self, wallet_address: str, batch_size: int=10000, blocks_to_check: int = 150000, incremental: bool = True, columnar: bool = False):
+        """
+        Discovers the tokens a wallet received in the last `blocks_to_check` blocks and values them.
+        A wallet scanned before only costs a log query over the blocks since its checkpoint.
+
+        :param wallet_address: Wallet to scan.
+        :param batch_size: Initial number of blocks per `eth_getLogs` window.
+        :param blocks_to_check: Number of past blocks to scan.
+        :param incremental: Scan only the blocks since the wallet's checkpoint in the wallet index.
+        :param columnar: Return a `WalletAssets` instead of a list of dicts.
+        :returns: List of token data dicts (or `WalletAssets`) sorted by USD balance.
+        """
+        tokenList = self.w3U.getWalletTokens(wallet_address, batch_size, blocks_to_check, incremental=incremental)
+        tokenHoldings = self.getWalletTokenDATA(wallet_address, tokenList, columnar)
         return tokenHoldings
 
+    def iterWalletAssets(self, wallet_address: str, batch_size: int=10000, blocks_to_check: int = 150000, incremental: bool = True, workers: int = 4):
+        """
+        Streaming version of `getWalletAssets`. Yields the ETH row first and then the token data
+        rows of every token batch as soon as it is priced, while the log scan is still running.
+        Rows come unsorted, memory only grows with the number of distinct tokens.
+
+        :param wallet_address: Wallet to scan.
+        :param batch_size: Initial number of blocks per `eth_getLogs` window.
+        :param blocks_to_check: Number of past blocks to scan.
+        :param incremental: Scan only the blocks since the wallet's checkpoint in the wallet index.
+        :param workers: Maximum batches priced at the same time.
+        :returns: Generator of token data dicts.
+        """
+        batchSize = self._walletBatchSize()
+        wallet_address = Web3.to_checksum_address(wallet_address)
+        ethPrice, ethBalance = self.w3U.batchRequest([
+            self._swapperCall("getUSDPrice", [self.chain.WETH]),
+            ("eth_getBalance", [wallet_address, "latest"])
+        ])
+        ethPrice = Web3.from_wei(AbiCodec.of(BTTSwapper_ABI).decode("getUSDPrice", Web3.to_bytes(hexstr=ethPrice)), "mwei")
+        yield self._nativData(ethPrice, int(ethBalance, 16))
+
+        events = queue.Queue()  # ("token", address), ("rows", future), ("end", None) or ("error", exception)
+        stop = threading.Event()
+
+        def scan():
+            try:
+                for token in self.w3U.iterWalletTokens(wallet_address, batch_size, blocks_to_check, incremental=incremental):
+                    if stop.is_set():
+                        return
+                    events.put(("token", token))
+                events.put(("end", None))
+            except Exception as e:
+                events.put(("error", e))
+
+        def price(tokenBatch):
+            return self._walletTokenRows(wallet_address, [tokenBatch], ethPrice)
+
+        with ThreadPoolExecutor(workers + 1) as pool:
+            def submit(tokenBatch):
+                pool.submit(price, tokenBatch).add_done_callback(lambda future: events.put(("rows", future)))
+
+            pool.submit(scan)
+            tokenBatch, pricing, scanning = [], 0, True
+            try:
+                while scanning or pricing:
+                    kind, value = events.get()
+                    if kind == "token":
+                        tokenBatch.append(value)
+                        if len(tokenBatch) == batchSize:
+                            submit(tokenBatch)
+                            tokenBatch, pricing = [], pricing + 1
+                    elif kind == "end":
+                        scanning = False
+                        if tokenBatch:
+                            submit(tokenBatch)
+                            tokenBatch, pricing = [], pricing + 1
+                    elif kind == "rows":
+                        pricing -= 1
+                        yield from value.result()
+                    else:
+                        raise value
+            finally:
+                stop.set()
+
     def getBestPool(self):
         """
         Retrieves the best liquidity pool for the default token.
@@ -359,7 +631,7 @@ class InterfaceSwapperContract: #ISC
         Returns:
             tuple: A tuple representing the path and pool information for swapping ETH to a token in V3.
         """
-        return self.BTTSwapper.functions.getSwapPathV3(self.chain.WETH, self.IERC20.get_token_address()).call()
+        return self._cachedRoute(self.chain.WETH, self.IERC20.get_token_address(), 3, "getSwapPathV3", [self.chain.WETH, self.IERC20.get_token_address()])
     
     def getTokentoETHPathV3(self):
         """
@@ -368,7 +640,7 @@ class InterfaceSwapperContract: #ISC
         Returns:
             tuple: A tuple representing the path and pool information for swapping a token to ETH in V3.
         """
-        return self.BTTSwapper.functions.getSwapPathV3(self.IERC20.get_token_address(),self.chain.WETH).call()
+        return self._cachedRoute(self.IERC20.get_token_address(), self.chain.WETH, 3, "getSwapPathV3", [self.IERC20.get_token_address(), self.chain.WETH])
         
     def getTokentoTokenPathV3(self, tokenIn, tokenOut):
         """
@@ -381,10 +653,7 @@ class InterfaceSwapperContract: #ISC
         Returns:
             tuple: A tuple representing the path and pool information for swapping from one token to another in V3.
         """
-        return self.BTTSwapper.functions.getSwapPathV3(
-                Web3.to_checksum_address(tokenIn),
-                Web3.to_checksum_address(tokenOut)
-            ).call()
+        return self._cachedRoute(tokenIn, tokenOut, 3, "getSwapPathV3", [Web3.to_checksum_address(tokenIn), Web3.to_checksum_address(tokenOut)])
     
     
     def getETHtoTokenPathV2(self):
@@ -394,7 +663,7 @@ class InterfaceSwapperContract: #ISC
         Returns:
             tuple: A tuple representing the path and dex identifiers for swapping ETH to a token in V2.
         """
-        return self.BTTSwapper.functions.getSwapPathV2(self.chain.WETH, self.IERC20.get_token_address()).call()
+        return self._cachedRoute(self.chain.WETH, self.IERC20.get_token_address(), 2, "getSwapPathV2", [self.chain.WETH, self.IERC20.get_token_address()])
     
     def getTokentoETHPathV2(self):
         """
@@ -403,7 +672,7 @@ class InterfaceSwapperContract: #ISC
         Returns:
             tuple: A tuple representing the path and dex identifiers for swapping a token to ETH in V2.
         """
-        return self.BTTSwapper.functions.getSwapPathV2(self.IERC20.get_token_address(),self.chain.WETH).call()
+        return self._cachedRoute(self.IERC20.get_token_address(), self.chain.WETH, 2, "getSwapPathV2", [self.IERC20.get_token_address(), self.chain.WETH])
         
     def getTokentoTokenPathV2(self, tokenIn, tokenOut):
         """
@@ -416,11 +685,50 @@ class InterfaceSwapperContract: #ISC
         Returns:
             tuple: A tuple representing the path and dex identifiers for swapping from one token to another in V2.
         """
-        return self.BTTSwapper.functions.getSwapPathV2(
-                Web3.to_checksum_address(tokenIn),
-                Web3.to_checksum_address(tokenOut)
-            ).call()
+        return self._cachedRoute(tokenIn, tokenOut, 2, "getSwapPathV2", [Web3.to_checksum_address(tokenIn), Web3.to_checksum_address(tokenOut)])
     
+    def _cachedRoute(self, tokenIn, tokenOut, version, name, args):
+        """
+        Returns a swap route (or the protocol version if `tokenOut` is None) from the route cache,
+        reading it with the precompiled encoder on a miss. Nothing is encoded on a hit.
+
+        :param tokenIn: Address of the input token.
+        :param tokenOut: Address of the output token, None for the protocol version.
+        :param version: Protocol version of the route, None for the protocol version.
+        :param name: Name of the swapper function reading the route.
+        :param args: Arguments of the call, addresses in checksum format.
+        :return: The route.
+        """
+        ttl, maxBlocks = self._routeLimits()
+        if not ttl:
+            return self._swapperRead(name, args)
+        key, block = RouteCache.key(self.chain.chainID, tokenIn, tokenOut, version), self._headBlock()
+        route = ROUTES.get(key, ttl, maxBlocks, block)
+        if route is None:
+            route = self._swapperRead(name, args)
+            ROUTES.put(key, route, block)
+        return route
+
+    def _routeLimits(self):
+        keys = self.settings.settings
+        return float(keys.get("RouteCacheTTL") or 0), int(keys.get("RouteCacheBlocks", RouteCache.MAX_BLOCKS))
+
+    def _headBlock(self):
+        """
+        Returns the current block if the per-block read cache follows the heads, else None.
+        """
+        blockCache = getattr(self, "blockCache", None)
+        return blockCache.block if blockCache is not None else None
+
+    def invalidateRoutes(self, token: str = None):
+        """
+        Drops the cached swap routes and protocol versions of a token, or all of them.
+
+        Args:
+            token (str, optional): Token whose routes are dropped. Defaults to all tokens.
+        """
+        ROUTES.invalidate(token, self.chain.chainID if token else None)
+
     def getETHBalance_(self):
         """
         Gets the ETH balance of the user in wei.
@@ -471,40 +779,21 @@ class InterfaceSwapperContract: #ISC
             inputAmount (float): The amount of ETH to swap.
 
         Returns:
-            bool: True if the test swap was successful, False otherwise.
-
-        Raises:
-            SystemExit: If there are insufficient ETH funds for the transaction.
+            bool: True if the test swap was successful, False otherwise. Missing ETH funds
+                are reported as well, they no longer exit the process.
         """
         try:
             v = self.getSwapProtocollVersion()
             inputETH = self.w3U.to_wei(inputAmount, 18)
             if int(v) == 2:
-                try:
-                    if self.TestSwapFromETHtoTokenV2(inputETH):
-                        return True
-                except ValueError as e:
-                    if 'message' in str(e):
-                        if  'insufficient funds for transfer' in str(e):
-                            print("")
-                            print("ERROR:", "insufficient ETH funds for transaction!")
-                            print("Exiting Now")
-                            raise SystemExit
-                        
+                return self.TestSwapFromETHtoTokenV2(inputETH)
             elif int(v) == 3:
-               try:
-                    if self.TestSwapFromETHtoTokenV3(inputETH):
-                         return True
-               except ValueError as e:
-                    if 'message' in str(e):
-                        if  'insufficient funds for transfer' in str(e):
-                            print("")
-                            print("ERROR:", "insufficient ETH funds for transaction!")
-                            print("Exiting Now")
-                            raise SystemExit
-
+                return self.TestSwapFromETHtoTokenV3(inputETH)
         except Exception as e:
-            print(e)
+            if RetryPolicy.classify(e) == RetryPolicy.INSUFFICIENT_FUNDS:
+                print("ERROR:", "insufficient ETH funds for transaction!")
+            else:
+                print(e)
             return False
 
 
@@ -521,16 +810,12 @@ class InterfaceSwapperContract: #ISC
         path, dexIdents  = self.getETHtoTokenPathV2()
         amountOut = self.getAmountsOutV2(inputAmount, path, dexIdents)[-1]
         amountOutMinimum = int(amountOut - (amountOut * int(self.settings.settings["Slippage"])) / 100)
-        txn = self.BTTSwapper.functions.swapETHtoTokenV2(
+        txn = self._swapTransaction("swapETHtoTokenV2", [
                 path,
                 dexIdents,
                 amountOutMinimum
-        ).build_transaction({
-                    'from': self.user_address,
-                    'gasPrice': self.w3.eth.gas_price + Web3.to_wei(int(self.settings.settings["GWEI_OFFSET"]) ,"gwei"),
-                    'nonce': self.w3.eth.get_transaction_count(self.user_address),
-                    'value': int(inputAmount)
-        })
+        ], inputAmount)
+        self.w3U.estimateGas(txn)  # Raises if the swap would fail, e.g. for insufficient funds
         return True
 
 
@@ -547,197 +832,319 @@ class InterfaceSwapperContract: #ISC
         path, _, pools, poolFees = self.getETHtoTokenPathV3()
         amountOut = self.getAmountsOutV3(pools, path, inputAmount)[-1]
         minOutput = int(amountOut - (amountOut * int(self.settings.settings["Slippage"])) / 100)
-        txn = self.BTTSwapper.functions.swapETHtoTokenV3(
+        txn = self._swapTransaction("swapETHtoTokenV3", [
             path,
             pools,
             poolFees,
             minOutput
-        ).build_transaction({
-                'from': self.user_address,
-                'gasPrice': int(self.w3.eth.gas_price + Web3.to_wei(int(self.settings.settings["GWEI_OFFSET"]), "gwei")),
-                'nonce': self.w3.eth.get_transaction_count(self.user_address),
-                'value': int(inputAmount)
-        })
+        ], inputAmount)
+        self.w3U.estimateGas(txn)  # Raises if the swap would fail, e.g. for insufficient funds
         return True
     
 
-    def SwapETHtoToken(self, inputAmount: float, trys: int):
+    def _minOutput(self, amountOut):
+        """
+        Applies the configured slippage to a quoted output amount.
+        """
+        return int(amountOut - (amountOut * int(self.settings.settings["Slippage"])) / 100)
+
+    def _gasShape(self, name, path):
+        """
+        Returns the gas model shape of a swap, its gas limit is learned from the receipts.
+        """
+        return GasModel.key(self.chain.chainID, name, path)
+
+    def _dryRunSwap(self, name, swapArgs, quote, value, dryRun):
+        """
+        Simulates a swap instead of sending it. The quote is read at the simulated block and
+        state, then the exact swap calldata with the slippage applied is run with `eth_call`
+        and `eth_estimateGas` in one batched request. No nonce is used and nothing is signed.
+
+        Args:
+            name (str): Name of the swapper swap function.
+            swapArgs (callable): Returns the swap arguments for a minimum output.
+            quote (tuple): Name and arguments of the `getAmountsOut*` call.
+            value (int): ETH value in wei sent with the swap.
+            dryRun (DryRun): Block and state overrides to simulate against.
+
+        Returns:
+            SwapSimulation: Success, quoted and minimum output, gas estimate and revert reason.
+        """
+        codec = AbiCodec.of(BTTSwapper_ABI)
+        state = dryRun.stateOverride(self.user_address, self.chain.BTTSwapper)
+        quoted, = self.w3U.batchRequest([("eth_call", dryRun.params(self._swapperCall(*quote)[1][0], state))], return_errors=True)
+        if isinstance(quoted, Exception):
+            return SwapSimulation(False, 0, 0, None, DryRun.revertReason(quoted))
+        amountOut = codec.decode(quote[0], Web3.to_bytes(hexstr=quoted))[-1]
+        minOut = self._minOutput(amountOut)
+        call = codec.transaction(name, swapArgs(minOut), self.chain.BTTSwapper, self.user_address)
+        call["value"] = Web3.to_hex(int(value))  # Raw JSON-RPC request
+        result, estimate = self.w3U.batchRequest([
+            ("eth_call", dryRun.params(call, state)),
+            ("eth_estimateGas", dryRun.params(call, state))
+        ], return_errors=True)
+        if isinstance(result, Exception):
+            return SwapSimulation(False, amountOut, minOut, None, DryRun.revertReason(result))
+        return SwapSimulation(True, amountOut, minOut, None if isinstance(estimate, Exception) else int(estimate, 16), None)
+
+    def _onSwapError(self, error, errorClass):
+        """
+        Called by the retry policy after a failed swap attempt. Only a revert drops the cached
+        route of the token, a stale route is its usual cause; other retries reuse the route.
+        """
+        logging.warning(f"Swap attempt failed ({errorClass}): {error}")
+        if errorClass == RetryPolicy.REVERT:
+            self.invalidateRoutes(self.IERC20.get_token_address())  # The retry reads a fresh route
+
+    @staticmethod
+    def _swapOutcome(outcome, wait, dryRun):
+        """
+        Returns the result of a retried swap in the form the caller asked for: a failed outcome
+        becomes a `SwapSimulation` for dry runs and a finished `PendingSwap` if `wait` is False.
+        """
+        if not isinstance(outcome, SwapOutcome) or outcome.error is None:
+            return outcome
+        if dryRun is not None:
+            return SwapSimulation(False, 0, 0, None, str(outcome.error))
+        return outcome if wait else PendingSwap.resolved(outcome)
+
+    def _fastSwap(self, name, swapArgs, quote, value, wait: bool = True):
+        """
+        Prepares a swap with one batched request and sends it. The quote, the fee fields, the gas
+        estimate and, if the nonce is not known locally, the transaction count are requested
+        together. The gas is estimated with a minimum output of 0, which runs the same swap as
+        the final transaction, unless the gas model knows the swap shape. The transaction is
+        then encoded and signed locally.
+
+        Args:
+            name (str): Name of the swapper swap function.
+            swapArgs (callable): Returns the swap arguments for a minimum output.
+            quote (tuple): Name and arguments of the `getAmountsOut*` call.
+            value (int): ETH value in wei sent with the swap.
+            wait (bool, optional): Wait for the receipt. Defaults to True.
+
+        Returns:
+            tuple: A tuple containing a boolean (success status), transaction hex, and gas estimate,
+                or a `PendingSwap` resolving to it if `wait` is False.
+        """
+        codec = AbiCodec.of(BTTSwapper_ABI)
+        nonces = NonceManager.of(self.w3, self.user_address, self.chain.chainID)
+        shape = self._gasShape(name, swapArgs(0)[0])
+        limit, feeRequest, seed = self.w3U.learnedGas(shape), self.w3U.feeRequest(), not nonces.synced
+        calls = [self._swapperCall(*quote)]
+        if not limit:
+            probe = codec.transaction(name, swapArgs(0), self.chain.BTTSwapper, self.user_address)
+            probe['value'] = Web3.to_hex(int(value))  # Raw JSON-RPC request
+            calls.append(("eth_estimateGas", [probe]))
+        if feeRequest:
+            calls.append(feeRequest)  # Only once per block with the fee engine
+        if seed:
+            calls.append(("eth_getTransactionCount", [self.user_address, "pending"]))
+        results = iter(self.w3U.batchRequest(calls))
+        amountOut = codec.decode(quote[0], Web3.to_bytes(hexstr=next(results)))[-1]
+        estimate = None if limit else int(next(results), 16)
+        fees = self.w3U.feeFields(next(results) if feeRequest else None)
+        if seed:
+            nonces.seed(int(next(results), 16))
+        price = fees.get("maxFeePerGas") or fees["gasPrice"]
+        gas = self.w3U.checkGasCost(limit, price, overhead=False) if limit else self.w3U.checkGasCost(estimate, price)
+        if not gas[2]:
+            result = False, "0", gas
+            return result if wait else PendingSwap.resolved(result)
+        txn = codec.transaction(
+            name, swapArgs(self._minOutput(amountOut)), self.chain.BTTSwapper, self.user_address, value,
+            gas=gas[0], chainId=self.chain.chainID, **fees
+        )
+        return self.w3U.sendAndTrack(txn, gas, wait, shape)
+
+    def SwapETHtoToken(self, inputAmount: float, trys: int, wait: bool = True, dryRun: DryRun = None):
         """
         Executes the swap from ETH to a specified token using the correct Uniswap protocol version.
 
         Args:
             inputAmount (float): The amount of ETH to swap.
-            trys (int): The number of retry attempts if the transaction fails.
+            trys (int): The maximum number of attempts, errors are retried as `RETRY_POLICY` decides.
+            wait (bool, optional): Wait for the receipt. If False, a `PendingSwap` is returned right after sending. Defaults to True.
+            dryRun (DryRun, optional): Simulate the swap against the given block and state instead of sending it, a `SwapSimulation` is returned. Defaults to None.
 
         Returns:
-            tuple: A tuple containing a boolean (success status), transaction hex, and gas estimate.
+            SwapOutcome: The (success status, transaction hex, gas estimate) tuple with the error class
+                and attempts, or a `PendingSwap` resolving to the tuple if `wait` is False.
         """
-        while trys:
-            try:
-                v = self.getSwapProtocollVersion()
-                inputETH = self.w3U.to_wei(inputAmount, 18)
-                if int(v) == 2:
-                    return self.SwapFromETHtoTokenV2(inputETH)
-                elif int(v) == 3:
-                    return self.SwapFromETHtoTokenV3(inputETH)
-            except Exception as e:
-                print(e)
-                trys -= 1
-                time.sleep(1)
-                if trys == 0:
-                    return False, "0", e
+        inputETH = self.w3U.to_wei(inputAmount, 18)
+
+        def attempt():
+            if int(self.getSwapProtocollVersion()) == 2:
+                return self.SwapFromETHtoTokenV2(inputETH, wait=wait, dryRun=dryRun)
+            return self.SwapFromETHtoTokenV3(inputETH, wait=wait, dryRun=dryRun)
 
-    def SwapFromETHtoTokenV2(self, inputAmount: int):
+        return self._swapOutcome(self.RETRY_POLICY.run(attempt, trys, self._onSwapError), wait, dryRun)
+
+    def SwapFromETHtoTokenV2(self, inputAmount: int, wait: bool = True, dryRun: DryRun = None):
         """
         Swaps ETH for a specified token using Uniswap V2.
 
         Args:
             inputAmount (int): The amount of ETH (in wei) to swap.
+            wait (bool, optional): Wait for the receipt. If False, a `PendingSwap` is returned right after sending. Defaults to True.
+            dryRun (DryRun, optional): Simulate the swap against the given block and state instead of sending it, a `SwapSimulation` is returned. Defaults to None.
 
         Returns:
-            tuple: A tuple containing a boolean (success status), transaction hex, and gas estimate.
+            tuple: A tuple containing a boolean (success status), transaction hex, and gas estimate,
+                or a `PendingSwap` resolving to it if `wait` is False.
         """
         path, dexIdents  = self.getETHtoTokenPathV2()
+        swap = ("swapETHtoTokenV2", lambda minOut: [path, dexIdents, minOut], ("getAmountsOutV2", [inputAmount, path, dexIdents]), inputAmount)
+        if dryRun is not None:
+            return self._dryRunSwap(*swap, dryRun)
+        if self.settings.settings.get("FastPrepare"):
+            return self._fastSwap(*swap, wait)
         amountOut = self.getAmountsOutV2(inputAmount, path, dexIdents)[-1]
         amountOutMinimum = int(amountOut - (amountOut * int(self.settings.settings["Slippage"])) / 100)
-        txn = self.BTTSwapper.functions.swapETHtoTokenV2(
+        txn = self._swapTransaction("swapETHtoTokenV2", [
             path,
             dexIdents,
             amountOutMinimum
-        ).build_transaction({
-            'from': self.user_address,
-             'gasPrice': self.w3.eth.gas_price + Web3.to_wei(int(self.settings.settings["GWEI_OFFSET"]) ,"gwei"),
-             'nonce': self.w3.eth.get_transaction_count(self.user_address),
-             'value': int(inputAmount)
-        })
-        gas = self.w3U.estimateGas(txn)
-        txn.update({'gas': gas[0]})
-        signed_txn = self.w3.eth.account.sign_transaction(
-            txn,
-            self.priv_key
-        )
-        txn = self.w3.eth.send_raw_transaction(signed_txn.raw_transaction)
-        txn_receipt = self.w3.eth.wait_for_transaction_receipt(
-            txn, timeout=self.settings.settings["timeout"])
-        if txn_receipt["status"] == 1:
-            return True, txn.hex(), gas
-        else:
-            return False, txn.hex(), gas
+        ], inputAmount)
+        return self.w3U.signAndSend(txn, wait, self._gasShape("swapETHtoTokenV2", path))
                 
 
 
 
-    def SwapFromETHtoTokenV3(self, inputAmount: int):
+    def SwapFromETHtoTokenV3(self, inputAmount: int, wait: bool = True, dryRun: DryRun = None):
         """
         Swaps ETH for a specified token using Uniswap V3.
 
         Args:
             inputAmount (int): The amount of ETH (in wei) to swap.
+            wait (bool, optional): Wait for the receipt. If False, a `PendingSwap` is returned right after sending. Defaults to True.
+            dryRun (DryRun, optional): Simulate the swap against the given block and state instead of sending it, a `SwapSimulation` is returned. Defaults to None.
 
         Returns:
-            tuple: A tuple containing a boolean (success status), transaction hex, and gas estimate.
+            tuple: A tuple containing a boolean (success status), transaction hex, and gas estimate,
+                or a `PendingSwap` resolving to it if `wait` is False.
         """
         path, dexIdents, pools, poolFees = self.getETHtoTokenPathV3()
+        swap = ("swapETHtoTokenV3", lambda minOut: [path, pools, poolFees, minOut], ("getAmountsOutV3", [pools, path, inputAmount]), inputAmount)
+        if dryRun is not None:
+            return self._dryRunSwap(*swap, dryRun)
+        if self.settings.settings.get("FastPrepare"):
+            return self._fastSwap(*swap, wait)
         amountOut = self.getAmountsOutV3(pools, path, inputAmount)[-1]
         minOutput = int(amountOut - (amountOut * int(self.settings.settings["Slippage"])) / 100)
-        txn = self.BTTSwapper.functions.swapETHtoTokenV3(
+        txn = self._swapTransaction("swapETHtoTokenV3", [
             path,
             pools,
             poolFees,
             minOutput
-        ).build_transaction({
-            'from': self.user_address,
-            'gasPrice': int(self.w3.eth.gas_price + Web3.to_wei(int(self.settings.settings["GWEI_OFFSET"]), "gwei")),
-            'nonce': self.w3.eth.get_transaction_count(self.user_address),
-            'value': int(inputAmount)
-        })
-        gas = self.w3U.estimateGas(txn)
-        txn.update({'gas': gas[0]})
-        signed_txn = self.w3.eth.account.sign_transaction(
-            txn,
-            self.priv_key
-        )
-        txn = self.w3.eth.send_raw_transaction(signed_txn.raw_transaction)
-        txn_receipt = self.w3.eth.wait_for_transaction_receipt(
-            txn, timeout=self.settings.settings["timeout"])
-        if txn_receipt["status"] == 1:
-            return True, txn.hex(), gas
-        else:
-            return False, txn.hex(), gas
+        ], inputAmount)
+        return self.w3U.signAndSend(txn, wait, self._gasShape("swapETHtoTokenV3", path))
 
 
 
 
-    def SwapTokentoETH(self, inputAmount: float, trys: int = 1):
+    def SwapTokentoETH(self, inputAmount: float, trys: int = 1, wait: bool = True, dryRun: DryRun = None):
         """
         Executes the swap from a specified token to ETH using the correct Uniswap protocol version.
 
         Args:
             inputAmount (float): The amount of the token to swap.
-            trys (int, optional): The number of retry attempts if the transaction fails. Defaults to 1.
+            trys (int, optional): The maximum number of attempts, errors are retried as `RETRY_POLICY` decides. Defaults to 1.
+            wait (bool, optional): Wait for the receipt. If False, a `PendingSwap` is returned right after sending. Defaults to True.
+            dryRun (DryRun, optional): Simulate the swap against the given block and state instead of sending it, a `SwapSimulation` is returned. Defaults to None.
 
         Returns:
-            tuple: A tuple containing a boolean (success status), transaction hex, and gas estimate.
+            SwapOutcome: The (success status, transaction hex, gas estimate) tuple with the error class
+                and attempts, or a `PendingSwap` resolving to the tuple if `wait` is False.
         """
-        while trys:
-            try:
-                v = self.getSwapProtocollVersion()
-                inputToken = self.w3U.to_wei(inputAmount, self.IERC20.get_token_decimals())
-                if int(v) == 2:
-                    return self.SwapFromTokentoETHV2(inputToken)
-                elif int(v) == 3:
-                    return self.SwapFromTokentoETHV3(inputToken)
-            except Exception as e:
-                #print(e)
-                trys -= 1
-                time.sleep(1)
-                if trys == 0:
-                    return False, "0", e
+        def attempt():
+            inputToken = self.w3U.to_wei(inputAmount, self.IERC20.get_token_decimals())
+            if int(self.getSwapProtocollVersion()) == 2:
+                return self.SwapFromTokentoETHV2(inputToken, wait=wait, dryRun=dryRun)
+            return self.SwapFromTokentoETHV3(inputToken, wait=wait, dryRun=dryRun)
+
+        return self._swapOutcome(self.RETRY_POLICY.run(attempt, trys, self._onSwapError), wait, dryRun)
         
 
 
-    def SwapFromTokentoETHV3(self, inputAmount: int,):
+    def sellToken(self, inputAmount: float, wait: bool = True):
+        """
+        Sells an amount of the current token for ETH, approving the swapper first if needed.
+
+        A swapper known to be max-approved is answered from the allowance cache and the sell is
+        a plain `SwapTokentoETH`. Otherwise the max approve and the swap are sent right after
+        each other with consecutive nonces, without waiting for the approve's receipt, so both
+        can be mined in the same block. The swap can not be estimated before the approve is
+        mined, it is sent with the learned gas limit of its shape or `SELL_GAS_LIMIT`.
+
+        Args:
+            inputAmount (float): The amount of the token to sell.
+            wait (bool, optional): Wait for the receipt of the swap. If False, a `PendingSwap` is returned right after sending. Defaults to True.
+
+        Returns:
+            tuple: A tuple containing a boolean (success status), transaction hex, and gas estimate,
+                or a `PendingSwap` resolving to it if `wait` is False.
+        """
+        inputToken = self.w3U.to_wei(inputAmount, self.IERC20.get_token_decimals())
+        if self.IERC20.is_approved(self.chain.BTTSwapper, inputToken):
+            return self.SwapTokentoETH(inputAmount, wait=wait)
+        if int(self.getSwapProtocollVersion()) == 2:
+            path, dexIdents = self.getTokentoETHPathV2()
+            amountOut = self.getAmountsOutV2(inputToken, path, dexIdents)[-1]
+            name, args = "swapTokentoETHV2", [path, dexIdents, inputToken, self._minOutput(amountOut)]
+        else:
+            path, _, pools, poolFees = self.getTokentoETHPathV3()
+            amountOut = self.getAmountsOutV3(pools, path, inputToken)[-1]
+            name, args = "swapTokenToETHV3", [path, pools, poolFees, inputToken, self._minOutput(amountOut)]
+        approval = self.IERC20._sendApproval(self.chain.BTTSwapper, 2**256 - 1, wait=False)
+        if approval.done() and not approval.result()[0]:
+            return approval.result() if wait else approval  # The approve was not sent, e.g. above MaxTXFeeETH
+        txn = self._swapTransaction(name, args)
+        shape = self._gasShape(name, path)
+        gas = self.w3U.checkGasCost(self.w3U.learnedGas(shape) or self.SELL_GAS_LIMIT, txn.get("maxFeePerGas") or txn["gasPrice"], overhead=False)
+        if not gas[2]:
+            result = False, "0", gas
+            return result if wait else PendingSwap.resolved(result)
+        txn["gas"] = gas[0]
+        swap = self.w3U.sendAndTrack(txn, gas, False, shape)  # Next nonce, mined right after the approve
+        if not wait:
+            return swap
+        self.w3U.receiptPoller.wait(approval, self.settings.settings["timeout"])
+        return self.w3U.receiptPoller.wait(swap, self.settings.settings["timeout"])
+
+    def SwapFromTokentoETHV3(self, inputAmount: int, wait: bool = True, dryRun: DryRun = None):
         """
     Swaps a specified token for ETH using Uniswap V3.
 
     Args:
         inputAmount (int): The amount of the token (in wei) to swap.
+        wait (bool, optional): Wait for the receipt. If False, a `PendingSwap` is returned right after sending. Defaults to True.
+        dryRun (DryRun, optional): Simulate the swap against the given block and state instead of sending it, a `SwapSimulation` is returned. Defaults to None.
 
     Returns:
-        tuple: A tuple containing a boolean (success status), transaction hex, and gas estimate.
+        tuple: A tuple containing a boolean (success status), transaction hex, and gas estimate,
+            or a `PendingSwap` resolving to it if `wait` is False.
     """
         path, _, pools, poolFees = self.getTokentoETHPathV3()
+        swap = ("swapTokenToETHV3", lambda minOut: [path, pools, poolFees, inputAmount, minOut], ("getAmountsOutV3", [pools, path, inputAmount]), 0)
+        if dryRun is not None:
+            return self._dryRunSwap(*swap, dryRun)
+        if self.settings.settings.get("FastPrepare"):
+            return self._fastSwap(*swap, wait)
         amountOut = self.getAmountsOutV3(pools, path, inputAmount)[-1]
         amountOutMinimum = int(amountOut - (amountOut * int(self.settings.settings["Slippage"])) / 100)
-        txn = self.BTTSwapper.functions.swapTokenToETHV3(
+        txn = self._swapTransaction("swapTokenToETHV3", [
             path,
             pools,
             poolFees,
             inputAmount,
             amountOutMinimum
-        ).build_transaction({
-            'from': self.user_address,
-            'gasPrice': self.w3.eth.gas_price + Web3.to_wei(int(self.settings.settings["GWEI_OFFSET"]),"gwei"),
-            'nonce': self.w3.eth.get_transaction_count(self.user_address),
-            'value': 0
-        })
-        gas = self.w3U.estimateGas(txn)
-        txn.update({'gas': gas[0]})
-        signed_txn = self.w3.eth.account.sign_transaction(
-            txn,
-            self.priv_key
-        )
-        txn = self.w3.eth.send_raw_transaction(signed_txn.raw_transaction)
-        txn_receipt = self.w3.eth.wait_for_transaction_receipt(
-            txn, timeout=self.settings.settings["timeout"])
-        if txn_receipt["status"] == 1:
-            return True, txn.hex(), gas
-        else:
-            return False, txn.hex(), gas
+        ], 0)
+        return self.w3U.signAndSend(txn, wait, self._gasShape("swapTokenToETHV3", path))
 
 
 
-    def SwapFromTokentoTokenV3(self, tokenIn, tokenOut, inputAmount: int):
+    def SwapFromTokentoTokenV3(self, tokenIn, tokenOut, inputAmount: int, wait: bool = True, dryRun: DryRun = None):
         """
         Swaps one token for another using Uniswap V3.
 
@@ -745,83 +1152,65 @@ class InterfaceSwapperContract: #ISC
             tokenIn (str): Address of the input token.
             tokenOut (str): Address of the output token.
             inputAmount (int): The amount of the input token (in wei) to swap.
+            wait (bool, optional): Wait for the receipt. If False, a `PendingSwap` is returned right after sending. Defaults to True.
+            dryRun (DryRun, optional): Simulate the swap against the given block and state instead of sending it, a `SwapSimulation` is returned. Defaults to None.
 
         Returns:
-            tuple: A tuple containing a boolean (success status), transaction hex, and gas estimate.
+            tuple: A tuple containing a boolean (success status), transaction hex, and gas estimate,
+                or a `PendingSwap` resolving to it if `wait` is False.
         """
         path, dexIdents, pools, poolFees = self.getTokentoTokenPathV3(tokenIn, tokenOut)
+        swap = ("swapTokentoTokenV3", lambda minOut: [path, pools, poolFees, inputAmount, minOut], ("getAmountsOutV3", [pools, path, inputAmount]), 0)
+        if dryRun is not None:
+            return self._dryRunSwap(*swap, dryRun)
+        if self.settings.settings.get("FastPrepare"):
+            return self._fastSwap(*swap, wait)
         amountOut = self.getAmountsOutV3(pools, path, inputAmount)[-1]
         amountOutMinimum = int(amountOut - (amountOut * int(self.settings.settings["Slippage"])) / 100)
-        txn = self.BTTSwapper.functions.swapTokentoTokenV3(
+        txn = self._swapTransaction("swapTokentoTokenV3", [
             path,
             pools,
             poolFees,
             inputAmount,
             amountOutMinimum
-        ).build_transaction({
-            'from': self.user_address,
-            'gasPrice': self.w3.eth.gas_price + Web3.to_wei(int(self.settings.settings["GWEI_OFFSET"]),"gwei"),
-            'nonce': self.w3.eth.get_transaction_count(self.user_address),
-            'value': 0
-        })
-        gas = self.w3U.estimateGas(txn)
-        txn.update({'gas': gas[0]})
-        signed_txn = self.w3.eth.account.sign_transaction(
-            txn,
-            self.priv_key
-        )
-        txn = self.w3.eth.send_raw_transaction(signed_txn.raw_transaction)
-        txn_receipt = self.w3.eth.wait_for_transaction_receipt(
-            txn, timeout=self.settings.settings["timeout"])
-        if txn_receipt["status"] == 1:
-            return True, txn.hex(), gas
-        else:
-            return False, txn.hex(), gas
+        ], 0)
+        return self.w3U.signAndSend(txn, wait, self._gasShape("swapTokentoTokenV3", path))
 
     
 
 
-    def SwapFromTokentoETHV2(self, inputAmount: int, trys: int = 1):
+    def SwapFromTokentoETHV2(self, inputAmount: int, trys: int = 1, wait: bool = True, dryRun: DryRun = None):
         """
         Swaps a specified token for ETH using Uniswap V2.
 
         Args:
             inputAmount (int): The amount of the token (in wei) to swap.
             trys (int, optional): The number of retry attempts if the transaction fails. Defaults to 1.
+            wait (bool, optional): Wait for the receipt. If False, a `PendingSwap` is returned right after sending. Defaults to True.
+            dryRun (DryRun, optional): Simulate the swap against the given block and state instead of sending it, a `SwapSimulation` is returned. Defaults to None.
 
         Returns:
-            tuple: A tuple containing a boolean (success status), transaction hex, and gas estimate.
+            tuple: A tuple containing a boolean (success status), transaction hex, and gas estimate,
+                or a `PendingSwap` resolving to it if `wait` is False.
         """
         path, dexIdents = self.getTokentoETHPathV2()
+        swap = ("swapTokentoETHV2", lambda minOut: [path, dexIdents, inputAmount, minOut], ("getAmountsOutV2", [inputAmount, path, dexIdents]), 0)
+        if dryRun is not None:
+            return self._dryRunSwap(*swap, dryRun)
+        if self.settings.settings.get("FastPrepare"):
+            return self._fastSwap(*swap, wait)
         amountOut = self.getAmountsOutV2(inputAmount, path, dexIdents)[-1]
         amountOutMinimum = int(amountOut - (amountOut * int(self.settings.settings["Slippage"])) / 100)
-        txn = self.BTTSwapper.functions.swapTokentoETHV2(
+        txn = self._swapTransaction("swapTokentoETHV2", [
             path,
             dexIdents,
             inputAmount,
             amountOutMinimum
-        ).build_transaction({
-            'from': self.user_address,
-            'gasPrice': self.w3.eth.gas_price + Web3.to_wei(int(self.settings.settings["GWEI_OFFSET"]),"gwei"),
-            'nonce': self.w3.eth.get_transaction_count(self.user_address),
-            'value': 0
-        })
-        gas = self.w3U.estimateGas(txn)
-        txn.update({'gas': gas[0]})
-        signed_txn = self.w3.eth.account.sign_transaction(
-            txn,
-            self.priv_key
-        )
-        txn = self.w3.eth.send_raw_transaction(signed_txn.raw_transaction)
-        txn_receipt = self.w3.eth.wait_for_transaction_receipt(
-            txn, timeout=self.settings.settings["timeout"])
-        if txn_receipt["status"] == 1:
-            return True, txn.hex(), gas
-        else:
-            return False, txn.hex(), gas
+        ], 0)
+        return self.w3U.signAndSend(txn, wait, self._gasShape("swapTokentoETHV2", path))
 
 
-    def SwapFromTokentoTokenV2(self, tokenIn, tokenOut, inputAmount: int, trys: int = 1):
+    def SwapFromTokentoTokenV2(self, tokenIn, tokenOut, inputAmount: int, trys: int = 1, wait: bool = True, dryRun: DryRun = None):
         """
         Swaps one token for another using Uniswap V2.
     
@@ -830,34 +1219,25 @@ class InterfaceSwapperContract: #ISC
             tokenOut (str): Address of the output token.
             inputAmount (int): The amount of the input token (in wei) to swap.
             trys (int, optional): The number of retry attempts if the transaction fails. Defaults to 1.
+            wait (bool, optional): Wait for the receipt. If False, a `PendingSwap` is returned right after sending. Defaults to True.
+            dryRun (DryRun, optional): Simulate the swap against the given block and state instead of sending it, a `SwapSimulation` is returned. Defaults to None.
     
         Returns:
-            tuple: A tuple containing a boolean (success status), transaction hex, and gas estimate.
+            tuple: A tuple containing a boolean (success status), transaction hex, and gas estimate,
+                or a `PendingSwap` resolving to it if `wait` is False.
         """
         path, dexIdents = self.getTokentoTokenPathV2(tokenIn, tokenOut)
+        swap = ("swapTokentoTokenV2", lambda minOut: [path, dexIdents, inputAmount, minOut], ("getAmountsOutV2", [inputAmount, path, dexIdents]), 0)
+        if dryRun is not None:
+            return self._dryRunSwap(*swap, dryRun)
+        if self.settings.settings.get("FastPrepare"):
+            return self._fastSwap(*swap, wait)
         amountOut = self.getAmountsOutV2(inputAmount, path, dexIdents)[-1]
         amountOutMinimum = int(amountOut - (amountOut * int(self.settings.settings["Slippage"])) / 100)
-        txn = self.BTTSwapper.functions.swapTokentoTokenV2(
+        txn = self._swapTransaction("swapTokentoTokenV2", [
             path,
             dexIdents,
             inputAmount,
             amountOutMinimum
-        ).build_transaction({
-                'from': self.user_address,
-                'gasPrice': self.w3.eth.gas_price + Web3.to_wei(int(self.settings.settings["GWEI_OFFSET"]),"gwei"),
-                'nonce': self.w3.eth.get_transaction_count(self.user_address),
-                'value': 0
-        })
-        gas = self.w3U.estimateGas(txn)
-        txn.update({'gas': gas[0]})
-        signed_txn = self.w3.eth.account.sign_transaction(
-            txn,
-            self.priv_key
-        )
-        txn = self.w3.eth.send_raw_transaction(signed_txn.raw_transaction)
-        txn_receipt = self.w3.eth.wait_for_transaction_receipt(
-            txn, timeout=self.settings.settings["timeout"])
-        if txn_receipt["status"] == 1:
-            return True, txn.hex(), gas
-        else:
-            return False, txn.hex(), gas
+        ], 0)
+        return self.w3U.signAndSend(txn, wait, self._gasShape("swapTokentoTokenV2", path))
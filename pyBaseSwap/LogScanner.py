@@ -0,0 +1,120 @@
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from web3 import Web3
+
+
+class LogScanner:
+    """
+    Concurrent, adaptive `eth_getLogs` scanner for long block ranges.
+
+    The range is cut into windows that are fetched in parallel, at most `concurrency` at a time.
+    A window the RPC rejects as too large (too many results, range limit, timeout) is split
+    in half and both halves are fetched again, and the window size shrinks. A window that comes
+    back empty within `fast` seconds doubles the window size up to `max_window`. Other errors
+    are retried with a backoff and raised once the retries are used up, a range is never dropped.
+
+    Example:
+        scanner = LogScanner(w3)
+        logs = scanner.scan({"topics": [transfer_topic, None, wallet_topic]}, start_block, latest_block)
+
+    Attributes:
+        TOO_LARGE_ERRORS (tuple): Error fragments of the nodes that mean the window was too large.
+        window (int): Current window size in blocks, adapted while scanning.
+    """
+
+    TOO_LARGE_ERRORS = (
+        "query returned more than",
+        "block range",
+        "range is too large",
+        "range too large",
+        "too many",
+        "limit exceeded",
+        "response size",
+        "exceed",
+        "timeout",
+        "timed out",
+    )
+
+    def __init__(self, w3, window: int = 10000, concurrency: int = 8, max_window: int = 500000, fast: float = 1.0, retries: int = 3):
+        """
+        Initializes the scanner.
+        - `w3`: Web3 instance.
+        - `window`: Initial window size in blocks (default 10,000).
+        - `concurrency`: Maximum `eth_getLogs` requests in flight (default 8).
+        - `max_window`: Upper bound of the window size (default 500,000).
+        - `fast`: Seconds under which an empty response lets the window grow (default 1).
+        - `retries`: Retries of a window after other errors before the scan fails (default 3).
+        """
+        self.w3 = w3
+        self.window, self.max_window = int(window), int(max_window)
+        self.concurrency, self.fast, self.retries = int(concurrency), float(fast), int(retries)
+
+    @classmethod
+    def is_too_large(cls, error) -> bool:
+        """
+        Returns True if an RPC error means the requested window was too large.
+        """
+        message = str(error).lower()
+        return any(fragment in message for fragment in cls.TOO_LARGE_ERRORS)
+
+    def _fetch(self, filter_params: dict, start: int, end: int, delay: float = 0):
+        if delay:
+            time.sleep(delay)
+        began = time.monotonic()
+        logs = self.w3.eth.get_logs({**filter_params, 'fromBlock': Web3.to_hex(start), 'toBlock': Web3.to_hex(end)})
+        return logs, time.monotonic() - began
+
+    def iterLogs(self, filter_params: dict, from_block: int, to_block: int):
+        """
+        Scans a block range and yields the logs of every window as soon as it is fetched.
+        Windows complete out of order.
+        - `filter_params`: The `eth_getLogs` filter without the block range (`topics`, `address`).
+        - `from_block`: First block of the range.
+        - `to_block`: Last block of the range (inclusive).
+
+        Yields (start, end, logs) per completed window.
+        """
+        retry = deque()  # (start, end, attempt) of windows to fetch again, before new ones
+        cursor = int(from_block)
+        running = {}
+        with ThreadPoolExecutor(self.concurrency) as pool:
+            while True:
+                while len(running) < self.concurrency and (retry or cursor <= to_block):
+                    if retry:
+                        start, end, attempt = retry.popleft()
+                    else:
+                        start, end, attempt = cursor, min(cursor + self.window - 1, to_block), 0
+                        cursor = end + 1
+                    delay = 0.5 * 2 ** (attempt - 1) if attempt else 0
+                    running[pool.submit(self._fetch, filter_params, start, end, delay)] = (start, end, attempt)
+                if not running:
+                    return
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    start, end, attempt = running.pop(future)
+                    try:
+                        logs, elapsed = future.result()
+                    except Exception as e:
+                        if end > start and self.is_too_large(e):
+                            middle = (start + end) // 2
+                            retry.extendleft([(middle + 1, end, 0), (start, middle, 0)])
+                            self.window = max(1, min(self.window, end - start + 1) // 2)
+                        elif attempt < self.retries:
+                            retry.append((start, end, attempt + 1))
+                        else:
+                            raise
+                        continue
+                    if not logs and elapsed < self.fast:
+                        self.window = min(self.window * 2, self.max_window)
+                    yield start, end, logs
+
+    def scan(self, filter_params: dict, from_block: int, to_block: int) -> list:
+        """
+        Scans a block range and returns all logs ordered by block and log index.
+        - `filter_params`: The `eth_getLogs` filter without the block range (`topics`, `address`).
+        - `from_block`: First block of the range.
+        - `to_block`: Last block of the range (inclusive).
+        """
+        logs = [log for _, _, window in self.iterLogs(filter_params, from_block, to_block) for log in window]
+        return sorted(logs, key=lambda log: (log['blockNumber'], log['logIndex']))
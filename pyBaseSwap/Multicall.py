@@ -0,0 +1,411 @@
+import asyncio
+from web3 import Web3
+from .AbiCodec import AbiCodec
+from .core_abis import BTTSwapper_ABI, IERC20_ABI, Multicall3_ABI
+
+
+class Multicall:
+    """
+    Packs many contract reads into `Multicall3.aggregate3` calls, so a whole set of
+    reads costs one `eth_call` (or one per `max_calls` reads).
+
+    Calls are tuples `(target, contract_abi, function_name, args, post)` where `post` is an
+    optional function applied to the decoded value. Failed sub calls return None.
+    """
+
+    def __init__(self, w3, chain, max_calls: int = 500):
+        """
+        Initializes the Multicall helper.
+
+        Args:
+            w3 (Web3): Web3 instance used for the aggregated `eth_call`.
+            chain (chains): Chain setup providing the Multicall3 address.
+            max_calls (int, optional): Maximum sub calls per `eth_call`. Defaults to 500.
+        """
+        self.w3, self.chain, self.max_calls = w3, chain, max_calls
+        self.codec = AbiCodec.of(Multicall3_ABI)
+
+    def encodeChunks(self, calls: list) -> list:
+        """
+        Encodes the calls into one `aggregate3` transaction per chunk of `max_calls`.
+
+        Args:
+            calls (list): Call tuples `(target, contract_abi, function_name, args, post)`.
+
+        Returns:
+            list: Tuples of (transaction dict, chunk of calls).
+        """
+        chunks = []
+        for i in range(0, len(calls), self.max_calls):
+            chunk = calls[i:i + self.max_calls]
+            data = self.codec.encode("aggregate3", [[
+                (Web3.to_checksum_address(target), True, AbiCodec.of(contract_abi).encode(name, args))
+                for target, contract_abi, name, args, _ in chunk
+            ]])
+            chunks.append(({"to": self.chain.Multicall3, "data": Web3.to_hex(data)}, chunk))
+        return chunks
+
+    def decodeChunk(self, chunk: list, raw: bytes) -> list:
+        """
+        Decodes the `aggregate3` return data of one chunk.
+
+        Args:
+            chunk (list): The calls of the chunk, in order.
+            raw (bytes): Return data of the aggregated `eth_call`.
+
+        Returns:
+            list: Decoded values (None for failed sub calls).
+        """
+        results = []
+        for (target, contract_abi, name, args, post), (success, returnData) in zip(chunk, self.codec.decode("aggregate3", raw)):
+            if not success or not returnData:
+                results.append(None)
+                continue
+            value = AbiCodec.of(contract_abi).decode(name, returnData)
+            results.append(post(value) if post else value)
+        return results
+
+    def aggregate(self, calls: list, block_identifier="latest") -> list:
+        """
+        Executes the calls with one `eth_call` per chunk.
+
+        Args:
+            calls (list): Call tuples `(target, contract_abi, function_name, args, post)`.
+            block_identifier (optional): Block to read at. Defaults to "latest".
+
+        Returns:
+            list: Decoded values in call order (None for failed sub calls).
+        """
+        results = []
+        for txn, chunk in self.encodeChunks(calls):
+            results.extend(self.decodeChunk(chunk, self.w3.eth.call(txn, block_identifier)))
+        return results
+
+
+class AsyncMulticall(Multicall):
+    """
+    `Multicall` for `AsyncWeb3`, all chunks are requested concurrently.
+    """
+
+    async def aggregate(self, calls: list, block_identifier="latest") -> list:
+        """
+        Executes the calls with one concurrent `eth_call` per chunk.
+
+        Returns:
+            list: Decoded values in call order (None for failed sub calls).
+        """
+        chunks = self.encodeChunks(calls)
+        raws = await asyncio.gather(*[self.w3.eth.call(txn, block_identifier) for txn, _ in chunks])
+        results = []
+        for (_, chunk), raw in zip(chunks, raws):
+            results.extend(self.decodeChunk(chunk, raw))
+        return results
+
+
+class MulticallBatch:
+    """
+    Chainable batch of reads on the swapper and ERC-20 contracts, executed with a single
+    `eth_call` through Multicall3.
+
+    The method names match the ones of `InterfaceSwapperContract` and `IERC20`, token
+    arguments default to the current token of the client.
+
+    Example:
+        price, liquidity, decimals = BS.batch().getUSDPriceOf(a).getLiquidityUSD(b).decimals(c).execute()
+    """
+
+    multicall_class = Multicall
+
+    def __init__(self, ISC):
+        """
+        Initializes an empty batch.
+
+        Args:
+            ISC: The swapper contract interface (usually the `BaseSwap` instance) the batch reads through.
+        """
+        self.ISC = ISC
+        self.calls = []
+
+    def __len__(self):
+        return len(self.calls)
+
+    def add(self, target: str, contract_abi: list, name: str, args: list = (), post=None):
+        """
+        Adds any read to the batch.
+
+        Args:
+            target (str): Contract address.
+            contract_abi (list): ABI of the contract, e.g. from `core_abis`.
+            name (str): Function name.
+            args (list, optional): Function arguments.
+            post (callable, optional): Conversion applied to the decoded value.
+
+        Returns:
+            MulticallBatch: The batch itself, for chaining.
+        """
+        self.calls.append((target, contract_abi, name, list(args), post))
+        return self
+
+    def execute(self, block_identifier="latest") -> list:
+        """
+        Executes all reads of the batch.
+
+        Args:
+            block_identifier (optional): Block to read at. Defaults to "latest".
+
+        Returns:
+            list: The results in the order the reads were added (None for failed reads).
+        """
+        return self.multicall_class(self.ISC.w3, self.ISC.chain).aggregate(self.calls, block_identifier)
+
+    def _token(self, token):
+        if token is None:
+            return self.ISC.IERC20.get_token_address()
+        return Web3.to_checksum_address(token)
+
+    def _swapper(self, name, args, post=None):
+        return self.add(self.ISC.chain.BTTSwapper, BTTSwapper_ABI, name, args, post)
+
+    def _erc20(self, token, name, args=(), post=None):
+        return self.add(self._token(token), IERC20_ABI, name, args, post)
+
+    @staticmethod
+    def _mwei(value):
+        return Web3.from_wei(value, "mwei")
+
+    @staticmethod
+    def _ether(value):
+        return Web3.from_wei(value, "ether")
+
+    # Swapper contract reads
+
+    def getUSDPrice_(self, tokenAddress=None):
+        """
+        Adds the USD price (raw Wei format) of a token, defaults to the current token.
+        """
+        return self._swapper("getUSDPrice", [self._token(tokenAddress)])
+
+    def getUSDPrice(self, tokenAddress=None):
+        """
+        Adds the USD price of a token, defaults to the current token.
+        """
+        return self._swapper("getUSDPrice", [self._token(tokenAddress)], self._mwei)
+
+    def getUSDPriceOf_(self, tokenAddress):
+        """
+        Adds the USD price (raw Wei format) of a specified token.
+        """
+        return self.getUSDPrice_(tokenAddress)
+
+    def getUSDPriceOf(self, tokenAddress):
+        """
+        Adds the USD price of a specified token.
+        """
+        return self.getUSDPrice(tokenAddress)
+
+    def getTokenETHPrice_(self, tokenAddress):
+        """
+        Adds the ETH price (raw Wei format) of a specified token.
+        """
+        return self._swapper("getETHPrice", [self._token(tokenAddress)])
+
+    def getTokenETHPrice(self, tokenAddress):
+        """
+        Adds the ETH price (ether format) of a specified token.
+        """
+        return self._swapper("getETHPrice", [self._token(tokenAddress)], self._ether)
+
+    def getNativPrice_(self):
+        """
+        Adds the USD price of WETH (raw Wei format).
+        """
+        return self._swapper("getUSDPrice", [self.ISC.chain.WETH])
+
+    def getNativPrice(self):
+        """
+        Adds the USD price of WETH.
+        """
+        return self._swapper("getUSDPrice", [self.ISC.chain.WETH], self._mwei)
+
+    def getETHUSDPrice(self):
+        """
+        Adds the USD price of ETH.
+        """
+        return self.getNativPrice()
+
+    def getLiquidityUSD_(self, tokenAddress=None):
+        """
+        Adds the USD liquidity (raw Wei format) of a token, defaults to the current token.
+        """
+        return self._swapper("getLiquidity", [self._token(tokenAddress)])
+
+    def getLiquidityUSD(self, tokenAddress=None):
+        """
+        Adds the USD liquidity of a token, defaults to the current token.
+        """
+        return self._swapper("getLiquidity", [self._token(tokenAddress)], lambda value: self.ISC.w3U.from_wei(value, 6))
+
+    def getSwapProtocollVersion(self, tokenAddress=None):
+        """
+        Adds the swap protocol version of a token, defaults to the current token.
+        """
+        return self._swapper("checkVersion", [self._token(tokenAddress)])
+
+    def getBestPool(self):
+        """
+        Adds the best pool of the current token.
+        """
+        return self._swapper("getBestPool", [self._token(None)])
+
+    def getBestPoolFor(self, token_address):
+        """
+        Adds the best pool of a specified token.
+        """
+        return self._swapper("getBestPool", [self._token(token_address)])
+
+    def getAmountsOutV2(self, amountIn, path, dexPath):
+        """
+        Adds a V2 quote for a path and dex identifiers.
+        """
+        return self._swapper("getAmountsOutV2", [amountIn, path, dexPath])
+
+    def getAmountsOutV3(self, pools, path, amountIn):
+        """
+        Adds a V3 quote for pools and a path.
+        """
+        return self._swapper("getAmountsOutV3", [pools, path, amountIn])
+
+    def getAmountsOutTokenToToken_(self, tokenIn, tokenOut, inputAmount: int):
+        """
+        Adds a quote between two tokens.
+        """
+        return self._swapper("getAmountsOut", [self._token(tokenIn), self._token(tokenOut), inputAmount])
+
+    def getAmountsOutETHToToken_(self, inputAmount: int, tokenAddress=None):
+        """
+        Adds a quote from ETH to a token, defaults to the current token.
+        """
+        return self._swapper("getAmountsOut", [self.ISC.chain.WETH, self._token(tokenAddress), inputAmount])
+
+    def getAmountsOutTokenToETH_(self, inputAmount: int, tokenAddress=None):
+        """
+        Adds a quote from a token to ETH, defaults to the current token.
+        """
+        return self._swapper("getAmountsOut", [self._token(tokenAddress), self.ISC.chain.WETH, inputAmount])
+
+    def getTokentoTokenPathV2(self, tokenIn, tokenOut):
+        """
+        Adds the V2 path between two tokens.
+        """
+        return self._swapper("getSwapPathV2", [self._token(tokenIn), self._token(tokenOut)])
+
+    def getTokentoTokenPathV3(self, tokenIn, tokenOut):
+        """
+        Adds the V3 path between two tokens.
+        """
+        return self._swapper("getSwapPathV3", [self._token(tokenIn), self._token(tokenOut)])
+
+    def getETHtoTokenPathV2(self, tokenAddress=None):
+        """
+        Adds the V2 path from ETH to a token, defaults to the current token.
+        """
+        return self._swapper("getSwapPathV2", [self.ISC.chain.WETH, self._token(tokenAddress)])
+
+    def getETHtoTokenPathV3(self, tokenAddress=None):
+        """
+        Adds the V3 path from ETH to a token, defaults to the current token.
+        """
+        return self._swapper("getSwapPathV3", [self.ISC.chain.WETH, self._token(tokenAddress)])
+
+    def getTokentoETHPathV2(self, tokenAddress=None):
+        """
+        Adds the V2 path from a token to ETH, defaults to the current token.
+        """
+        return self._swapper("getSwapPathV2", [self._token(tokenAddress), self.ISC.chain.WETH])
+
+    def getTokentoETHPathV3(self, tokenAddress=None):
+        """
+        Adds the V3 path from a token to ETH, defaults to the current token.
+        """
+        return self._swapper("getSwapPathV3", [self._token(tokenAddress), self.ISC.chain.WETH])
+
+    def getWalletTokenDATA_(self, wallet_address, tokenList):
+        """
+        Adds the raw `getWalletTokenDATA` result of a wallet for a list of tokens.
+        """
+        return self._swapper("getWalletTokenDATA", [Web3.to_checksum_address(wallet_address), [self._token(t) for t in tokenList]])
+
+    # ERC-20 reads
+
+    def decimals(self, token=None):
+        """
+        Adds the decimals of a token, defaults to the current token.
+        """
+        return self._erc20(token, "decimals")
+
+    def name(self, token=None):
+        """
+        Adds the name of a token, defaults to the current token.
+        """
+        return self._erc20(token, "name")
+
+    def symbol(self, token=None):
+        """
+        Adds the symbol of a token, defaults to the current token.
+        """
+        return self._erc20(token, "symbol")
+
+    def totalSupply(self, token=None):
+        """
+        Adds the total supply of a token, defaults to the current token.
+        """
+        return self._erc20(token, "totalSupply")
+
+    def balanceOf(self, token, address):
+        """
+        Adds the token balance (in Wei) of an address.
+        """
+        return self._erc20(token, "balanceOf", [Web3.to_checksum_address(address)])
+
+    def allowance(self, token, owner, spender):
+        """
+        Adds the token allowance (in Wei) of an owner for a spender.
+        """
+        return self._erc20(token, "allowance", [Web3.to_checksum_address(owner), Web3.to_checksum_address(spender)])
+
+    # Native reads
+
+    def getETHBalanceOf_(self, address):
+        """
+        Adds the ETH balance (in Wei) of an address.
+        """
+        return self.add(self.ISC.chain.Multicall3, Multicall3_ABI, "getEthBalance", [Web3.to_checksum_address(address)])
+
+    def getETHBalanceOf(self, address):
+        """
+        Adds the ETH balance (in ether) of an address.
+        """
+        return self.add(self.ISC.chain.Multicall3, Multicall3_ABI, "getEthBalance", [Web3.to_checksum_address(address)], self._ether)
+
+    def getBlockNumber(self):
+        """
+        Adds the block number the batch is executed at.
+        """
+        return self.add(self.ISC.chain.Multicall3, Multicall3_ABI, "getBlockNumber")
+
+
+class AsyncMulticallBatch(MulticallBatch):
+    """
+    `MulticallBatch` for `AsyncBaseSwap`, `execute` is a coroutine.
+    """
+
+    multicall_class = AsyncMulticall
+
+    async def execute(self, block_identifier="latest") -> list:
+        """
+        Executes all reads of the batch.
+
+        Returns:
+            list: The results in the order the reads were added (None for failed reads).
+        """
+        return await self.multicall_class(self.ISC.w3, self.ISC.chain).aggregate(self.calls, block_identifier)
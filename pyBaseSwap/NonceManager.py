@@ -0,0 +1,198 @@
+import heapq
+import threading
+from web3 import Web3
+
+
+class NonceManager:
+    """
+    Hands out the nonces of one account locally, so several transactions of a wallet can be
+    signed and sent without waiting for the previous receipt.
+
+    There is one manager per `(chain_id, address)` in the process, shared by every client and
+    token handle trading with that wallet. The first allocation reads the `pending` transaction
+    count, after that nonces are counted up locally. A nonce that was never sent is handed out
+    again before a fresh one, so a failed send leaves no gap. Nonce errors from the node (e.g.
+    a transaction sent from another wallet app) drop the local state and the next allocation
+    resyncs with the chain. A node answering that it already knows the transaction holds the
+    signed transaction in its mempool, its nonce stays in use and the send is not repeated.
+
+    Attributes:
+        NONCE_ERRORS (tuple): Error fragments of the nodes that mean the local nonce is out of sync.
+        KNOWN_ERRORS (tuple): Error fragments of the nodes that mean the same transaction was already sent.
+        address (str): The account address.
+        w3: Web3 instance used to resync.
+    """
+
+    NONCE_ERRORS = (
+        "nonce too low",
+        "nonce too high",
+        "invalid nonce",
+        "replacement transaction underpriced",
+    )
+    KNOWN_ERRORS = (
+        "already known",
+        "known transaction:",  # Not "unknown transaction type"
+    )
+
+    _managers = {}  # (chain_id, address) -> NonceManager
+    _managers_lock = threading.Lock()
+
+    def __init__(self, w3, address: str):
+        """
+        Initializes an unsynced manager, no RPC request is made here.
+        - `w3`: Web3 instance used to read the transaction count.
+        - `address`: Account the nonces are allocated for.
+        """
+        self.w3 = w3
+        self.address = Web3.to_checksum_address(address)
+        self._lock = threading.Lock()
+        self._next = None  # Next fresh nonce, None until synced with the chain
+        self._gaps = []  # Allocated nonces that were never sent, reused first (min-heap)
+
+    @classmethod
+    def of(cls, w3, address: str, chain_id: int):
+        """
+        Returns the shared manager of an account, creating it on first use.
+        - `w3`: Web3 instance of the caller, used for later resyncs.
+        - `address`: Account address.
+        - `chain_id`: Chain ID the nonces belong to.
+        """
+        key = int(chain_id), Web3.to_checksum_address(address)
+        with cls._managers_lock:
+            manager = cls._managers.get(key)
+            if manager is None:
+                manager = cls._managers[key] = cls(w3, address)
+            manager.w3 = w3  # Follow reloads of the client
+            return manager
+
+    @classmethod
+    def is_nonce_error(cls, error) -> bool:
+        """
+        Returns True if an RPC error means the local nonce is out of sync with the node.
+        """
+        message = str(error).lower()
+        return any(fragment in message for fragment in cls.NONCE_ERRORS)
+
+    @classmethod
+    def is_known_error(cls, error) -> bool:
+        """
+        Returns True if an RPC error means the node already has the sent transaction, it may be mined.
+        """
+        message = str(error).lower()
+        return any(fragment in message for fragment in cls.KNOWN_ERRORS)
+
+    def _reset(self, count: int):
+        self._next = int(count)
+        self._gaps = []
+
+    def _take(self) -> int:
+        if self._gaps:
+            return heapq.heappop(self._gaps)
+        nonce = self._next
+        self._next += 1
+        return nonce
+
+    @property
+    def synced(self) -> bool:
+        """
+        True if nonces can be allocated without reading the transaction count.
+        """
+        return self._next is not None
+
+    def seed(self, count: int):
+        """
+        Syncs an unsynced manager with a `pending` transaction count the caller already read,
+        e.g. batched together with other requests.
+        - `count`: The `pending` transaction count of the account.
+        """
+        with self._lock:
+            if self._next is None:
+                self._reset(count)
+
+    def allocate(self) -> int:
+        """
+        Returns the next nonce of the account, syncing with the `pending` count on first use.
+        """
+        with self._lock:
+            if self._next is None:
+                self._reset(self.w3.eth.get_transaction_count(self.address, "pending"))
+            return self._take()
+
+    def sync(self):
+        """
+        Resyncs with the `pending` transaction count of the node right away.
+        """
+        with self._lock:
+            self._reset(self.w3.eth.get_transaction_count(self.address, "pending"))
+
+    def invalidate(self):
+        """
+        Drops the local state, the next allocation resyncs with the chain. Used when a sent
+        transaction did not confirm in time and may have been dropped.
+        """
+        with self._lock:
+            self._next = None
+            self._gaps = []
+
+    def release(self, nonce: int, error=None) -> bool:
+        """
+        Gives back a nonce whose transaction was not sent.
+        - `nonce`: The allocated nonce.
+        - `error`: The exception of the failed send (optional).
+
+        Returns True if the error was a nonce error and the manager will resync, so the send
+        can be retried with a new nonce.
+        """
+        with self._lock:
+            if error is not None and self.is_nonce_error(error):
+                self._next = None
+                self._gaps = []
+                return True
+            if self._next is None:
+                return False
+            if nonce == self._next - 1:
+                self._next = nonce
+                while self._next - 1 in self._gaps:  # Shrink the range over unsent nonces below
+                    self._gaps.remove(self._next - 1)
+                    self._next -= 1
+                heapq.heapify(self._gaps)
+            elif nonce < self._next and nonce not in self._gaps:
+                heapq.heappush(self._gaps, nonce)
+            return False
+
+
+class AsyncNonceManager(NonceManager):
+    """
+    Async counterpart of `NonceManager` for `AsyncWeb3`: only the resync awaits the RPC.
+    """
+
+    _managers = {}  # (chain_id, address) -> AsyncNonceManager
+
+    async def allocate(self) -> int:
+        """
+        Returns the next nonce of the account, syncing with the `pending` count on first use.
+        """
+        while True:
+            with self._lock:
+                if self._next is not None:
+                    return self._take()
+            count = await self.w3.eth.get_transaction_count(self.address, "pending")
+            with self._lock:
+                if self._next is None:
+                    self._reset(count)
+
+    async def sync(self):
+        """
+        Resyncs with the `pending` transaction count of the node right away.
+        """
+        count = await self.w3.eth.get_transaction_count(self.address, "pending")
+        with self._lock:
+            self._reset(count)
+
+    async def prefetch(self):
+        """
+        Reads the `pending` count if the manager is not synced yet, so the next allocation
+        needs no request. Meant to run concurrently with the other reads of a transaction.
+        """
+        if self._next is None:
+            self.seed(await self.w3.eth.get_transaction_count(self.address, "pending"))
@@ -0,0 +1,213 @@
+import asyncio
+import logging
+import threading
+import time
+from concurrent.futures import Future, TimeoutError as FutureTimeoutError
+from web3 import Web3
+from web3.datastructures import AttributeDict
+from web3.exceptions import TimeExhausted
+from web3._utils.method_formatters import receipt_formatter
+from .TxAccelerator import TxAccelerator
+from .RetryPolicy import UnconfirmedTransaction
+
+
+class PendingSwap(Future):
+    """
+    Handle of a sent transaction whose receipt is not known yet.
+
+    Returned by the swap and approve methods with `wait=False` right after the transaction
+    was sent. It resolves to the same `(status, txHash, gas)` tuple the blocking call returns,
+    or raises `TimeExhausted` if no receipt arrives within the `timeout` setting.
+
+    Example:
+        pending = [h.SwapETHtoToken(0.01, 1, wait=False) for h in handles]
+        results = [p.result(timeout=60) for p in pending]  # or `await p` inside a coroutine
+
+    Attributes:
+        tx_hash (str): The transaction hash, "0" if nothing was sent.
+        gas (tuple): The gas estimate of the transaction.
+        receipt (AttributeDict): The receipt, once the transaction was mined.
+    """
+
+    def __init__(self, tx_hash: str = "0", gas=None):
+        super().__init__()
+        self.tx_hash = tx_hash
+        self.gas = gas
+        self.receipt = None
+
+    @classmethod
+    def resolved(cls, result: tuple):
+        """
+        Returns an already finished handle, for swaps that failed before anything was sent.
+        - `result`: The `(status, txHash, gas)` tuple.
+        """
+        pending = cls(result[1], result[2])
+        pending.set_result(result)
+        return pending
+
+    def __await__(self):
+        return asyncio.wrap_future(self).__await__()
+
+    def __repr__(self):
+        state = "done" if self.done() else "pending"
+        return f"PendingSwap({self.tx_hash}, {state})"
+
+
+class ReceiptPoller:
+    """
+    Background thread that tracks the receipts of all pending transactions of one client.
+
+    Each round polls every outstanding hash with one batched `eth_getTransactionReceipt`
+    request, resolves the mined ones and fails the ones past their deadline. The thread
+    only runs while transactions are outstanding.
+
+    With `Accelerate` in the settings the head block is read in the same batch, and
+    transactions pending for that many blocks are replaced with the same nonce and bumped
+    fees by the `TxAccelerator`. All hashes of a nonce resolve the same handle, with the
+    hash and gas of the one that was mined.
+
+    Attributes:
+        interval (float): Seconds between two polling rounds.
+        max_batch_size (int): Maximum receipts requested per batch.
+        accelerator (TxAccelerator): Decides the same-nonce replacements.
+    """
+
+    interval = 0.5
+    max_batch_size = 100
+
+    def __init__(self, w3U):
+        """
+        Initializes the poller, the thread is started with the first tracked transaction.
+        - `w3U`: Utilities of the client, used for the batched requests.
+        """
+        self.w3U = w3U
+        self.accelerator = TxAccelerator(w3U)
+        self._lock = threading.Lock()
+        self._pending = {}  # tx hash -> (PendingSwap, deadline, NonceManager, gas)
+        self._thread = None
+
+    def __len__(self):
+        return len(self._pending)
+
+    def track(self, pending: PendingSwap, timeout: float, nonces=None, txn: dict = None):
+        """
+        Starts tracking a sent transaction.
+        - `pending`: The handle to resolve.
+        - `timeout`: Seconds until the handle fails with `TimeExhausted`.
+        - `nonces`: NonceManager of the sender, resynced if the transaction times out (optional).
+        - `txn`: The sent transaction, replaced with bumped fees while it is stuck if `Accelerate` is set (optional).
+        """
+        if txn is not None and self.accelerator.blocks:
+            self.accelerator.watch(pending, txn)
+        with self._lock:
+            self._pending[pending.tx_hash] = (pending, time.monotonic() + float(timeout), nonces, pending.gas)
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="ReceiptPoller", daemon=True)
+                self._thread.start()
+
+    def _run(self):
+        try:
+            while True:
+                time.sleep(self.interval)
+                with self._lock:
+                    if not self._pending:
+                        self._thread = None
+                        return
+                    hashes = list(self._pending)
+                try:
+                    self._poll(hashes)
+                except Exception as e:
+                    logging.warning(f"Receipt polling round failed, retrying: {e}")  # Keep the thread alive
+        finally:
+            with self._lock:
+                if self._thread is threading.current_thread():
+                    self._thread = None  # The next track() starts a new poller
+
+    def _poll(self, hashes):
+        head = None
+        for start in range(0, len(hashes), self.max_batch_size):
+            chunk = hashes[start:start + self.max_batch_size]
+            calls = [("eth_getTransactionReceipt", [Web3.to_hex(hexstr=tx_hash)]) for tx_hash in chunk]
+            if start == 0 and len(self.accelerator):
+                calls.append(("eth_blockNumber", []))  # Head block for the accelerator, in the same batch
+            try:
+                receipts = self.w3U.batchRequest(calls)
+            except Exception as e:
+                logging.warning(f"Polling receipts failed, retrying: {e}")
+                receipts = [None] * len(calls)
+            if len(calls) > len(chunk):
+                head = receipts.pop()
+            self._settle(chunk, receipts)
+        if head is not None:
+            self._accelerate(int(head, 16) if isinstance(head, str) else int(head))
+
+    def wait(self, pending: PendingSwap, timeout: float):
+        """
+        Blocks until a tracked handle resolves. The poller fails it with `TimeExhausted` at its
+        deadline, should the poller not get to it the wait gives up one round later the same way.
+        - `pending`: The handle.
+        - `timeout`: The `timeout` setting the handle was tracked with.
+        """
+        try:
+            return pending.result(timeout=float(timeout) + 2 * self.interval)
+        except FutureTimeoutError:
+            raise TimeExhausted(f"Transaction {pending.tx_hash} is not in the chain after the timeout") from None
+
+    def _drop(self, pending):
+        # All hashes of one nonce resolve the same handle, called with the lock held
+        for tx_hash in [tx_hash for tx_hash, entry in self._pending.items() if entry[0] is pending]:
+            del self._pending[tx_hash]
+
+    def _settle(self, hashes, receipts):
+        now, mined, expired = time.monotonic(), [], []
+        with self._lock:
+            for tx_hash, receipt in zip(hashes, receipts):
+                entry = self._pending.get(tx_hash)
+                if entry is None:
+                    continue  # Another hash of the nonce settled the handle
+                pending, deadline, nonces, gas = entry
+                if receipt is not None:
+                    self._drop(pending)
+                    mined.append((pending, tx_hash, gas, receipt))
+                elif now > deadline:
+                    self._drop(pending)
+                    expired.append((pending, nonces))
+        # Resolve outside the lock, done callbacks may send and track further transactions
+        for pending, tx_hash, gas, receipt in mined:
+            self.accelerator.forget(pending)
+            pending.tx_hash, pending.gas = tx_hash, gas  # A replacement may have been mined
+            try:
+                pending.receipt = AttributeDict.recursive(receipt_formatter(receipt))
+            except Exception as e:
+                pending.set_exception(UnconfirmedTransaction(tx_hash, e))  # Already untracked, fail the handle instead of leaving it open
+                continue
+            pending.set_result((pending.receipt["status"] == 1, pending.tx_hash, pending.gas))
+        for pending, nonces in expired:
+            self.accelerator.forget(pending)
+            if nonces is not None:
+                nonces.invalidate()  # The transaction may have been dropped, resync before the next send
+            pending.set_exception(TimeExhausted(f"Transaction {pending.tx_hash} is not in the chain after the timeout"))
+
+    def _accelerate(self, head: int):
+        due = self.accelerator.due(head)
+        if not due:
+            return
+        try:
+            fees = self.w3U.getFees()
+        except Exception as e:
+            logging.warning(f"Reading fees for replacements failed: {e}")
+            fees = None
+        for pending in due:
+            replacement = self.accelerator.replace(pending, fees)
+            if replacement is None:
+                continue
+            txn, gas = replacement
+            try:
+                tx_hash = self.w3U.w3.eth.send_raw_transaction(self.w3U.signer.sign(txn).raw_transaction).hex()
+            except Exception as e:
+                logging.warning(f"Replacing {pending.tx_hash} failed: {e}")  # e.g. already mined, the next round settles it
+                continue
+            with self._lock:
+                entry = next((entry for entry in self._pending.values() if entry[0] is pending), None)
+                if entry is not None:
+                    self._pending[tx_hash] = (pending, entry[1], entry[2], gas)
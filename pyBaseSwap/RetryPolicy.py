@@ -0,0 +1,204 @@
+import asyncio
+import time
+import aiohttp
+import requests
+from web3.exceptions import ContractLogicError, TimeExhausted
+
+
+class UnconfirmedTransaction(Exception):
+    """
+    A signed transaction was handed to the node, but whether it was accepted or mined is not
+    known, e.g. the connection broke while sending or while waiting for the receipt. It may
+    still be mined, so it is never retried: a retry could swap twice.
+
+    Attributes:
+        tx_hash (str): Hash of the signed transaction.
+        cause (Exception): The error that left the outcome unknown.
+    """
+
+    def __init__(self, tx_hash: str, cause: Exception):
+        super().__init__(f"Transaction {tx_hash} may have been sent, its outcome is unknown: {cause}")
+        self.tx_hash = tx_hash
+        self.cause = cause
+
+
+class SwapOutcome(tuple):
+    """
+    The `(status, txHash, gas)` tuple of a swap, with how it ended.
+
+    It unpacks like the plain result tuple, `status, txHash, gas = outcome` keeps working.
+    A swap that failed with an exception has the exception in the `gas` slot.
+
+    Attributes:
+        errorClass (str): The `RetryPolicy` class of the last error, None if no attempt raised.
+        attempts (int): Attempts made, retries included.
+    """
+
+    def __new__(cls, status: bool, txHash: str, gas, errorClass: str = None, attempts: int = 1):
+        outcome = super().__new__(cls, (status, txHash, gas))
+        outcome.errorClass = errorClass
+        outcome.attempts = attempts
+        return outcome
+
+    @property
+    def status(self) -> bool:
+        return self[0]
+
+    @property
+    def txHash(self) -> str:
+        return self[1]
+
+    @property
+    def gas(self):
+        return self[2]
+
+    @property
+    def error(self):
+        """
+        The exception of the last attempt, None if the swap did not raise.
+        """
+        return self[2] if isinstance(self[2], Exception) else None
+
+    def __repr__(self):
+        return f"SwapOutcome({self[0]}, {self[1]!r}, {self[2]!r}, errorClass={self.errorClass!r}, attempts={self.attempts})"
+
+
+class RetryPolicy:
+    """
+    Classifies swap errors and decides if and when a swap is tried again.
+
+    Every error falls in one class, each class has its own backoff: a nonce out of sync is
+    retried at once (the nonce manager has resynced by then), an RPC timeout after a few
+    milliseconds, an underpriced transaction after the fees had time to move, a revert after
+    the route of the token was dropped, since a stale route is the usual cause. Insufficient
+    funds and transactions sent but not mined in time, already known to the node, or whose
+    send failed after the node may have taken them (`UnconfirmedTransaction`), are not
+    retried, trying again could not succeed or could swap twice. Only reverts drop cached route data, every other retry
+    reuses the cached version, path and decimals.
+
+    Example:
+        outcome = RetryPolicy().run(lambda: swap(), trys=3)
+        if not outcome.status and outcome.errorClass == RetryPolicy.INSUFFICIENT_FUNDS: ...
+
+    Attributes:
+        PATTERNS (tuple): (class, error phrases) pairs, checked in order on the lowercased message.
+        TIMEOUT_PHRASES (tuple): Phrases of transient RPC errors that come without a typed exception.
+        TIMEOUT_STATUS (tuple): HTTP status codes of transient RPC errors.
+        BACKOFF (dict): Class -> (first delay in s, growth factor, max delay in s), None if not retried.
+        backoff (dict): The backoff of this policy, `BACKOFF` with the overrides applied.
+    """
+
+    NONCE = "nonce"
+    UNDERPRICED = "underpriced"
+    TIMEOUT = "timeout"
+    REVERT = "revert"
+    INSUFFICIENT_FUNDS = "insufficient_funds"
+    NOT_MINED = "not_mined"
+    UNKNOWN = "unknown"
+
+    PATTERNS = (
+        (NOT_MINED, ("already known", "known transaction:")),  # The node already has the transaction
+        (INSUFFICIENT_FUNDS, ("insufficient funds",)),
+        (UNDERPRICED, ("underpriced", "fee too low", "less than block base fee", "fee cap less than")),
+        (NONCE, ("nonce too low", "nonce too high", "invalid nonce")),
+        (REVERT, ("execution reverted", "transaction reverted")),
+    )
+    TIMEOUT_PHRASES = ("timed out", "timeout", "too many requests", "service unavailable", "bad gateway", "temporarily unavailable")
+    TIMEOUT_STATUS = (408, 429, 502, 503, 504)
+    BACKOFF = {
+        NONCE: (0.0, 1, 0.0),
+        UNDERPRICED: (0.5, 2, 2.0),
+        TIMEOUT: (0.05, 2, 1.0),
+        REVERT: (0.25, 2, 1.0),
+        INSUFFICIENT_FUNDS: None,
+        NOT_MINED: None,
+        UNKNOWN: (1.0, 1, 1.0),
+    }
+
+    def __init__(self, backoff: dict = None):
+        """
+        Initializes the policy.
+        - `backoff`: Class -> (first delay, growth factor, max delay) or None, overriding `BACKOFF` (optional).
+        """
+        self.backoff = {**self.BACKOFF, **(backoff or {})}
+
+    @classmethod
+    def classify(cls, error) -> str:
+        """
+        Returns the class of an error raised while preparing or sending a swap. Node errors are
+        matched by phrase, transient RPC errors by exception type and HTTP status.
+        - `error`: The exception.
+        """
+        if isinstance(error, (TimeExhausted, UnconfirmedTransaction)):
+            return cls.NOT_MINED
+        message = str(error).lower()
+        for errorClass, phrases in cls.PATTERNS:
+            if any(phrase in message for phrase in phrases):
+                return errorClass
+        if isinstance(error, ContractLogicError):
+            return cls.REVERT
+        if isinstance(error, requests.exceptions.HTTPError) and error.response is not None:
+            return cls.TIMEOUT if error.response.status_code in cls.TIMEOUT_STATUS else cls.UNKNOWN
+        if isinstance(error, aiohttp.ClientResponseError):
+            return cls.TIMEOUT if error.status in cls.TIMEOUT_STATUS else cls.UNKNOWN
+        if isinstance(error, (TimeoutError, ConnectionError, requests.exceptions.RequestException, aiohttp.ClientError)):
+            return cls.TIMEOUT
+        if any(phrase in message for phrase in cls.TIMEOUT_PHRASES):
+            return cls.TIMEOUT
+        return cls.UNKNOWN
+
+    def delay(self, errorClass: str, attempt: int):
+        """
+        Returns the seconds to wait before the next attempt, None if the class is not retried.
+        - `errorClass`: Class of the error from `classify`.
+        - `attempt`: Number of the attempt that failed, starting at 1.
+        """
+        backoff = self.backoff.get(errorClass, self.backoff[self.UNKNOWN])
+        if backoff is None:
+            return None
+        first, factor, maximum = backoff
+        return min(first * factor ** (attempt - 1), maximum)
+
+    def _outcome(self, result, attempts: int):
+        return SwapOutcome(*result, attempts=attempts) if type(result) is tuple else result
+
+    def run(self, attempt, trys: int, onError=None):
+        """
+        Calls `attempt` until it returns or the error is not retried, at most `trys` times.
+        - `attempt`: Callable without arguments doing one swap attempt.
+        - `trys`: Maximum number of attempts.
+        - `onError`: Called with the exception and its class after every failed attempt (optional).
+
+        Returns the result of `attempt`, a plain result tuple as `SwapOutcome`, or a failed
+        `SwapOutcome` holding the last exception.
+        """
+        trys = max(1, int(trys))
+        for n in range(1, trys + 1):
+            try:
+                return self._outcome(attempt(), n)
+            except Exception as e:
+                errorClass = self.classify(e)
+                if onError is not None:
+                    onError(e, errorClass)
+                delay = self.delay(errorClass, n)
+                if delay is None or n == trys:
+                    return SwapOutcome(False, "0", e, errorClass, n)
+                time.sleep(delay)
+
+    async def runAsync(self, attempt, trys: int, onError=None):
+        """
+        Awaits `attempt()` until it returns or the error is not retried, at most `trys` times.
+        Same as `run` for coroutine functions.
+        """
+        trys = max(1, int(trys))
+        for n in range(1, trys + 1):
+            try:
+                return self._outcome(await attempt(), n)
+            except Exception as e:
+                errorClass = self.classify(e)
+                if onError is not None:
+                    onError(e, errorClass)
+                delay = self.delay(errorClass, n)
+                if delay is None or n == trys:
+                    return SwapOutcome(False, "0", e, errorClass, n)
+                await asyncio.sleep(delay)
@@ -0,0 +1,91 @@
+import threading
+import time
+from web3 import Web3
+
+
+class RouteCache:
+    """
+    Process-wide cache of swap routes and protocol versions.
+
+    Entries are keyed by `(chain_id, tokenIn, tokenOut, version)`: the `getSwapPathV2/V3`
+    results under version 2 or 3, and `checkVersion` of a token under `(chain_id, token, None, None)`.
+    Routes of a pair change rarely, so a swap only needs to read its quote. An entry is used
+    while it is younger than the `ttl` and, if the caller knows the current block, was read
+    less than `max_blocks` blocks ago. Failed swaps drop the routes of their tokens, so a
+    retry reads a fresh route.
+
+    Attributes:
+        TTL (float): Default maximum age of an entry in seconds.
+        MAX_BLOCKS (int): Default maximum age of an entry in blocks.
+    """
+
+    TTL = 60.0
+    MAX_BLOCKS = 30
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._entries = {}  # (chain_id, tokenIn, tokenOut, version) -> (route, monotonic time, block)
+        self.hits = self.misses = 0
+
+    @staticmethod
+    def key(chain_id, tokenIn, tokenOut=None, version=None):
+        """
+        Returns the cache key of a route, or of a token's protocol version if `tokenOut` is None.
+        """
+        return (int(chain_id), Web3.to_checksum_address(tokenIn),
+                Web3.to_checksum_address(tokenOut) if tokenOut else None, int(version) if version else None)
+
+    def get(self, key, ttl: float = None, max_blocks: int = None, block: int = None):
+        """
+        Returns a cached route, or None if it is unknown or too old.
+        - `key`: The cache key.
+        - `ttl`: Maximum age in seconds (default `TTL`).
+        - `max_blocks`: Maximum age in blocks, only checked if `block` is given (default `MAX_BLOCKS`).
+        - `block`: The current block number (optional).
+        """
+        ttl = self.TTL if ttl is None else ttl
+        max_blocks = self.MAX_BLOCKS if max_blocks is None else max_blocks
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                route, stored, storedBlock = entry
+                if time.monotonic() - stored <= ttl and (block is None or storedBlock is None or block - storedBlock <= max_blocks):
+                    self.hits += 1
+                    return route
+                del self._entries[key]
+            self.misses += 1
+            return None
+
+    def put(self, key, route, block: int = None):
+        """
+        Stores a route.
+        - `key`: The cache key.
+        - `route`: The route (or version) read from the swapper.
+        - `block`: The block the route was read in (optional).
+        """
+        with self._lock:
+            self._entries[key] = (route, time.monotonic(), block)
+
+    def invalidate(self, token: str = None, chain_id=None):
+        """
+        Drops cached routes, all of them or the ones touching one token.
+        - `token`: Drop only the routes from or to this token and its protocol version (optional).
+        - `chain_id`: Drop only the routes of this chain (optional).
+        """
+        token = Web3.to_checksum_address(token) if token else None
+        with self._lock:
+            for key in list(self._entries):
+                if chain_id is not None and key[0] != int(chain_id):
+                    continue
+                if token is None or token in key[1:3]:
+                    del self._entries[key]
+
+    def stats(self) -> dict:
+        """
+        Returns the hit and miss counters and the number of cached routes.
+        """
+        with self._lock:
+            return {"hits": self.hits, "misses": self.misses, "entries": len(self._entries)}
+
+
+ROUTES = RouteCache()  # Shared by every client in the process
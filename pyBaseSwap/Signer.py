@@ -0,0 +1,69 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from eth_account import Account
+
+
+class Signer:
+    """
+    Signs transactions with one private key that is parsed only once.
+
+    There is one signer per key in the process, shared by every client, token handle and
+    transaction builder using that key. Signing is local, `signBatch` signs many transactions
+    at once, in parallel threads for bulk operations.
+
+    Example:
+        signer = Signer.of(private_key)
+        raw = [signed.raw_transaction for signed in signer.signBatch(txns, workers=4)]
+
+    Attributes:
+        account (LocalAccount): The parsed account.
+        address (str): The account address (checksum).
+    """
+
+    _signers = {}  # private key -> Signer
+    _signers_lock = threading.Lock()
+
+    def __init__(self, private_key: str):
+        """
+        Parses the private key.
+        - `private_key`: Hex private key, with or without `0x`.
+        """
+        self.account = Account.from_key(private_key)
+        self.address = self.account.address
+
+    @classmethod
+    def of(cls, private_key: str):
+        """
+        Returns the shared signer of a private key, parsing the key on first use.
+        - `private_key`: Hex private key, with or without `0x`.
+        """
+        with cls._signers_lock:
+            signer = cls._signers.get(private_key)
+            if signer is None:
+                signer = cls._signers[private_key] = cls(private_key)
+            return signer
+
+    def sign(self, txn: dict):
+        """
+        Signs a complete transaction (nonce, gas and fee fields set).
+        - `txn`: The transaction dict.
+
+        Returns the `SignedTransaction`.
+        """
+        return self.account.sign_transaction(txn)
+
+    def signBatch(self, txns: list, workers: int = 1) -> list:
+        """
+        Signs several complete transactions, in order.
+        - `txns`: The transaction dicts.
+        - `workers`: Threads signing in parallel (default 1, sequential).
+
+        Returns the `SignedTransaction` of every transaction.
+        """
+        if workers <= 1 or len(txns) < 2:
+            return [self.account.sign_transaction(txn) for txn in txns]
+        with ThreadPoolExecutor(min(workers, len(txns))) as pool:
+            return list(pool.map(self.account.sign_transaction, txns))
+
+    def __repr__(self):
+        return f"Signer({self.address})"
@@ -1,8 +1,14 @@
 from .W3Utils import W3Utils
 from .core_settings import CoreSettings
+from .TokenHandle import TokenHandle
 from .core_chains import chains
+from .TokenMetadataCache import TOKEN_METADATA
+from .WalletIndex import WALLET_INDEX
 from .IERC20 import IERC20
 from .ISwapperContract import InterfaceSwapperContract  
+from .BatchProvider import BatchHTTPProvider
+from .BlockCache import BlockCache
+from .Signer import Signer
 from web3 import Web3
 import  json
 
@@ -15,6 +21,7 @@ class BaseSwap(InterfaceSwapperContract, W3Utils, IERC20):
         settings (CoreSettings): Settings for the swapper, loaded from a configuration file.
         w3 (Web3): The Web3 connection to the blockchain.
         w3U (W3Utils): Utility class for Web3 interactions.
+        blockCache (BlockCache): Per-block read cache of the connection, None unless the `BlockCache` setting is set.
         IERC20 (IERC20): Contract interface for the ERC-20 token being swapped.
         IAC (InterfaceSwapperContract): Interface for interacting with the swapper contract.
 
@@ -33,16 +40,15 @@ class BaseSwap(InterfaceSwapperContract, W3Utils, IERC20):
             saveSettings (bool, optional): Whether to save changes to the settings file. Defaults to False.
         """
         self.settings = CoreSettings(settings_file_path,  saveSettings)
+        if self.settings.settings.get("MetadataCache"):
+            TOKEN_METADATA.open(self.settings.settings["MetadataCache"])
+        if self.settings.settings.get("WalletIndex"):
+            WALLET_INDEX.open(self.settings.settings["WalletIndex"])
         self.w3 = self.connect()
         W3Utils.__init__(self, self.settings, self.w3)
-        if Web3.is_address(token):
-            self.token = Web3.to_checksum_address(token)
-            pass
-        else:
-            print("No Token Addresss Provided fallback to USDC")
-            self.token = chains(self.w3.eth.chain_id).BTT
-            
-        IERC20.__init__(self, self.settings, self.w3, Web3.to_checksum_address(self.token), self)
+        # Without a token the chain's default token (USDC) is resolved on first use
+        token = Web3.to_checksum_address(token) if Web3.is_address(token) else None
+        IERC20.__init__(self, self.settings, self.w3, token, self)
         InterfaceSwapperContract.__init__(self, self.settings, self.w3, self, self)
 
     def reload(self):
@@ -50,7 +56,7 @@ class BaseSwap(InterfaceSwapperContract, W3Utils, IERC20):
         Reload the Web3 connection, utilities, and contract interfaces after a settings change.
         """
         self.w3 = self.connect()
-        IERC20.__init__(self, self.settings, self.w3, Web3.to_checksum_address(self.token), self)
+        IERC20.__init__(self, self.settings, self.w3, self._token, self)
         InterfaceSwapperContract.__init__(self, self.settings, self.w3, self, self)
         W3Utils.__init__(self, self.settings, self.w3)
 
@@ -62,10 +68,14 @@ class BaseSwap(InterfaceSwapperContract, W3Utils, IERC20):
             Web3: The Web3 instance connected to the specified RPC endpoint.
         """
         keys = self.settings.settings
+        cache = {"cache_allowed_requests": True, "cacheable_requests": {"eth_chainId"}}  # web3 validates eth_call/estimateGas against the chain id, ask for it only once
         if keys["RPC"][:2].lower() == "ws":
-            w3 = Web3(Web3.LegacyWebSocketProvider(keys["RPC"],websocket_timeout=keys["timeout"]))
+            w3 = Web3(Web3.LegacyWebSocketProvider(keys["RPC"],websocket_timeout=keys["timeout"], **cache))
+        elif keys.get("BatchRPC"):
+            w3 = Web3(BatchHTTPProvider(keys["RPC"], request_kwargs={'timeout': int(keys["timeout"])}, **cache))
         else:
-            w3 = Web3(Web3.HTTPProvider(keys["RPC"], request_kwargs={'timeout': int(keys["timeout"])}))
+            w3 = Web3(Web3.HTTPProvider(keys["RPC"], request_kwargs={'timeout': int(keys["timeout"])}, **cache))
+        self.blockCache = BlockCache.attach(w3, keys["BlockCache"]) if keys.get("BlockCache") else None  # Opt-in, serves repeated reads within a block
         return w3
     
     def check_settings(self) -> str:
@@ -90,24 +100,36 @@ class BaseSwap(InterfaceSwapperContract, W3Utils, IERC20):
     def loadWalletFromMnomic(self, mnemoic):
         """
         Load a wallet from a mnemonic phrase and update the address and private key in the settings.
+        The connection is kept, only the wallet of the client changes.
 
         Args:
             mnemoic (str): The mnemonic phrase to derive the wallet from.
         """
         mne_address, private_key = self.w3U.getMnemonicToPrivKey(mnemoic)
         self.editSettings("address", mne_address, skipReload=True)
-        self.editSettings("private_key", private_key)
+        self.editSettings("private_key", private_key, skipReload=True)
+        self._useWallet()
 
     def loadWalletFromPrivKey(self, private_key):
         """
         Load a wallet from a private key and update the address in the settings.
+        The connection is kept, only the wallet of the client changes.
 
         Args:
             private_key (str): The private key for the wallet.
         """
         address = self.w3U.getAddresFromPrivKey(private_key)
         self.editSettings("address", address, skipReload=True)
-        self.editSettings("private_key", private_key)
+        self.editSettings("private_key", private_key, skipReload=True)
+        self._useWallet()
+
+    def _useWallet(self):
+        """
+        Switch the client to the wallet in the settings without reloading the connection.
+        The key is parsed once into the shared `Signer`, token handles follow the client.
+        """
+        self.user_address, self.priv_key = self.settings.settings["address"], self.settings.settings["private_key"]
+        Signer.of(self.priv_key)  # Parse the key now, not on the first transaction
 
     def changeRPC(self, newRPC):
         """
@@ -142,18 +164,25 @@ class BaseSwap(InterfaceSwapperContract, W3Utils, IERC20):
         
     def changeToken(self, token:str):
         """
-        Change the token being swapped and reload the token and contract interfaces.
+        Change the token being swapped. Only the address is swapped, the chain and the swapper
+        contract are reused, so no RPC request is made.
 
         Args:
-            token (str): The new token address (in checksum format).
+            token (str): The new token address.
         """
         self.token = Web3.to_checksum_address(token)
-        IERC20.__init__(self, self.settings, self.w3, token, self)
-        InterfaceSwapperContract.__init__(self, self.settings, self.w3, self, self)
     
 
+    def tokenHandle(self, token:str):
+        """
+        Create an immutable handle bound to one token. The handle shares the connection, settings,
+        caches and wallet state with this client but never changes `self.token`, so different
+        tokens can be traded in parallel from one client.
 
+        Args:
+            token (str): The token address.
 
-
-
-
+        Returns:
+            TokenHandle: The handle for the token.
+        """
+        return TokenHandle(self, token)
@@ -0,0 +1,141 @@
+from web3 import Web3
+from .IERC20 import IERC20
+from .ISwapperContract import InterfaceSwapperContract
+from .AsyncIERC20 import AsyncIERC20
+from .AsyncISwapperContract import AsyncInterfaceSwapperContract
+
+
+class _BoundToken:
+    """
+    Shared part of the token handles: everything except the token address is read from the
+    client, so handles follow reloads and share the connection, caches and wallet state.
+    """
+
+    def __init__(self, client, token: str):
+        """
+        Binds a handle to one token.
+
+        Args:
+            client: The BaseSwap/AsyncBaseSwap instance to share the connection and state with.
+            token (str): The token address the handle is bound to.
+        """
+        self._client = client
+        self._token = Web3.to_checksum_address(token)
+        self._token_Instance = None  # ERC-20 contract instance, built on first use
+
+    def __getattr__(self, name):
+        # Everything not bound to the token (utilities, balances, shared state) comes from the client
+        if name == "_client":
+            raise AttributeError(name)
+        return getattr(self._client, name)
+
+    def __repr__(self):
+        return f"{type(self).__name__}({self._token})"
+
+    @property
+    def token(self):
+        """
+        The token address of the handle (read-only).
+        """
+        return self._token
+
+    @property
+    def w3(self):
+        """
+        Web3 connection of the client.
+        """
+        return self._client.w3
+
+    @property
+    def settings(self):
+        """
+        Settings of the client.
+        """
+        return self._client.settings
+
+    @property
+    def user_address(self):
+        """
+        Wallet address of the client.
+        """
+        return self._client.user_address
+
+    @property
+    def priv_key(self):
+        """
+        Private key of the client.
+        """
+        return self._client.priv_key
+
+    @property
+    def chain(self):
+        """
+        Chain setup of the client.
+        """
+        return self._client.chain
+
+    @property
+    def w3U(self):
+        """
+        Utilities of the client (the client itself).
+        """
+        return self._client
+
+    @property
+    def IERC20(self):
+        """
+        The ERC-20 interface of the handle (the handle itself).
+        """
+        return self
+
+    @property
+    def BTTSwapper(self):
+        """
+        Swapper contract instance of the client.
+        """
+        return self._client.BTTSwapper
+
+    def changeToken(self, token: str):
+        """
+        Token handles are immutable, create another handle instead.
+        """
+        raise TypeError("A token handle is bound to one token, use tokenHandle(token) for another token")
+
+
+class TokenHandle(_BoundToken, InterfaceSwapperContract, IERC20):
+    """
+    Immutable view of a `BaseSwap` client bound to one token.
+
+    It exposes the IERC20 and swapper methods (prices, balances, approvals, swaps) for its token
+    without touching the client's `token`, so several threads can trade different tokens on one
+    warm client. Connection, settings, caches and wallet state are shared with the client.
+
+    Example:
+        tyler = BS.tokenHandle("0x65e570b560027F493f2b1907e8e8e3B9546053bD")
+        tyler.getUSDPrice()
+        tyler.SwapETHtoToken(0.01, 1)
+    """
+
+    @property
+    def token_Instance(self):
+        """
+        ERC-20 contract instance of the handle's token, built on first use.
+        """
+        if self._token_Instance is None or self._token_Instance.w3 is not self.w3:
+            self._token_Instance = self.init_token_instance()
+        return self._token_Instance
+
+
+class AsyncTokenHandle(_BoundToken, AsyncInterfaceSwapperContract, AsyncIERC20):
+    """
+    Immutable view of an `AsyncBaseSwap` client bound to one token, the async counterpart of `TokenHandle`.
+    """
+
+    @property
+    def token_Instance(self):
+        """
+        ERC-20 contract instance of the handle's token, built on first use.
+        """
+        if self._token_Instance is None or self._token_Instance.w3 is not self.w3:
+            self._token_Instance = self.init_token_instance()
+        return self._token_Instance
@@ -0,0 +1,168 @@
+import json
+import logging
+import sqlite3
+import threading
+from web3 import Web3
+from .Multicall import Multicall
+from .core_abis import IERC20_ABI
+
+
+class TokenMetadataCache:
+    """
+    Process-wide cache for the immutable ERC-20 metadata (decimals, name, symbol).
+
+    Entries are keyed by `(chain_id, token)`, so every client and every token handle in the
+    process shares them. The cache can be backed by a JSON file or a SQLite database
+    (`.db`, `.sqlite`, `.sqlite3`), then known tokens cost no RPC request even after a restart.
+
+    Attributes:
+        FIELDS (tuple): The cached metadata fields.
+        path (str): Path of the on-disk store, or None for memory only.
+    """
+
+    FIELDS = ("decimals", "name", "symbol")
+
+    def __init__(self, path: str = None):
+        """
+        Initializes the cache and loads the on-disk store if a path is given.
+        - `path`: JSON or SQLite file backing the cache (optional).
+        """
+        self._lock = threading.Lock()
+        self._entries = {}  # (chain_id, token) -> {"decimals": ..., "name": ..., "symbol": ...}
+        self._db = None
+        self.path = None
+        if path:
+            self.open(path)
+
+    @staticmethod
+    def key(chain_id, token):
+        """
+        Returns the cache key of a token.
+        """
+        return int(chain_id), Web3.to_checksum_address(token)
+
+    def open(self, path: str):
+        """
+        Attaches an on-disk store and loads its entries into memory.
+        - `path`: JSON file, or SQLite file if it ends with `.db`, `.sqlite` or `.sqlite3`.
+        """
+        if path == self.path:
+            return
+        with self._lock:
+            self.path = path
+            if self._db is not None:
+                self._db.close()
+                self._db = None
+            if path.lower().endswith((".db", ".sqlite", ".sqlite3")):
+                self._db = sqlite3.connect(path, check_same_thread=False)
+                self._db.execute(
+                    "CREATE TABLE IF NOT EXISTS token_metadata ("
+                    "chain_id INTEGER, token TEXT, decimals INTEGER, name TEXT, symbol TEXT, "
+                    "PRIMARY KEY (chain_id, token))"
+                )
+                for chain_id, token, decimals, name, symbol in self._db.execute("SELECT * FROM token_metadata"):
+                    self._merge((chain_id, token), {"decimals": decimals, "name": name, "symbol": symbol})
+            else:
+                try:
+                    with open(path, "r") as f:
+                        stored = json.load(f)
+                    for chain_id, tokens in stored.items():
+                        for token, fields in tokens.items():
+                            self._merge((int(chain_id), token), fields)
+                except FileNotFoundError:
+                    pass
+                except Exception as e:
+                    logging.error(f"Failed to load token metadata cache {path}: {e}")
+
+    def _merge(self, key, fields):
+        entry = self._entries.setdefault(key, {})
+        for field in self.FIELDS:
+            if fields.get(field) is not None:
+                entry[field] = fields[field]
+        return entry
+
+    def get(self, chain_id, token, field: str):
+        """
+        Returns a cached metadata field, or None if it is unknown.
+        - `chain_id`: Chain ID of the token.
+        - `token`: Token address.
+        - `field`: One of `decimals`, `name`, `symbol`.
+        """
+        entry = self._entries.get(self.key(chain_id, token))
+        if entry is None:
+            return None
+        return entry.get(field)
+
+    def set(self, chain_id, token, **fields):
+        """
+        Stores metadata fields of a token and writes them to the on-disk store.
+        - `chain_id`: Chain ID of the token.
+        - `token`: Token address.
+        - `fields`: Any of `decimals`, `name`, `symbol`.
+        """
+        self.update(chain_id, {token: fields})
+
+    def update(self, chain_id, metadata: dict):
+        """
+        Stores the metadata of many tokens at once.
+        - `chain_id`: Chain ID of the tokens.
+        - `metadata`: Token address -> dict of fields.
+        """
+        with self._lock:
+            changed = []
+            for token, fields in metadata.items():
+                key = self.key(chain_id, token)
+                before = dict(self._entries.get(key, {}))
+                entry = self._merge(key, fields)
+                if entry != before:
+                    changed.append((key, entry))
+            if changed and self.path:
+                self._save(changed)
+
+    def _save(self, changed):
+        try:
+            if self._db is not None:
+                self._db.executemany(
+                    "INSERT OR REPLACE INTO token_metadata VALUES (?, ?, ?, ?, ?)",
+                    [(chain_id, token, e.get("decimals"), e.get("name"), e.get("symbol")) for (chain_id, token), e in changed]
+                )
+                self._db.commit()
+            else:
+                stored = {}
+                for (chain_id, token), entry in self._entries.items():
+                    stored.setdefault(str(chain_id), {})[token] = entry
+                with open(self.path, "w") as f:
+                    json.dump(stored, f, indent=4)
+        except Exception as e:
+            logging.error(f"Failed to save token metadata cache {self.path}: {e}")
+
+    def missing(self, chain_id, tokens: list, fields: tuple = FIELDS) -> list:
+        """
+        Returns the tokens of which at least one of the given fields is not cached.
+        """
+        return [token for token in tokens if any(self.get(chain_id, token, field) is None for field in fields)]
+
+    def prefetch(self, w3, chain, tokens: list, fields: tuple = FIELDS):
+        """
+        Fetches the metadata of all uncached tokens with Multicall3, one `eth_call` per 500 reads.
+        - `w3`: Web3 instance.
+        - `chain`: Chain setup of the connected network.
+        - `tokens`: Token addresses.
+        - `fields`: Fields to fetch (default all).
+        """
+        tokens = self.missing(chain.chainID, [Web3.to_checksum_address(t) for t in tokens], fields)
+        if not tokens:
+            return
+        calls = [(token, IERC20_ABI, field, [], None) for token in tokens for field in fields]
+        results = iter(Multicall(w3, chain).aggregate(calls))
+        self.update(chain.chainID, {token: {field: next(results) for field in fields} for token in tokens})
+
+    def clear(self):
+        """
+        Drops all in-memory entries (the on-disk store is kept).
+        """
+        with self._lock:
+            self._entries.clear()
+
+
+TOKEN_METADATA = TokenMetadataCache()  # Shared by every client in the process
@@ -0,0 +1,122 @@
+import math
+import threading
+
+
+class TxAccelerator:
+    """
+    Replaces stuck transactions with the same nonce and bumped fees.
+
+    A watched transaction still unmined `Accelerate` blocks (settings) after it was first seen
+    pending is due: its replacement keeps the nonce, gas limit and calldata and raises the fee
+    fields by at least `bump` (nodes reject replacements below +10%), or to the current fees if
+    they rose further. A replacement whose cost would exceed `MaxTXFeeETH` is not sent, the
+    transaction then keeps waiting with its last fees. Whichever of the sent transactions is
+    mined first resolves the swap, the others are dropped by the nodes with it.
+
+    The accelerator only decides what to send, the receipt poller (or the async wait) sends
+    the replacements and tracks every hash of a nonce.
+
+    Example:
+        accelerator.watch(key, txn)
+        for key in accelerator.due(head):
+            replacement = accelerator.replace(key, w3U.getFees())
+
+    Attributes:
+        BUMP (float): Default minimum fee increase of a replacement.
+        MAX_BUMPS (int): Default maximum replacements per transaction.
+    """
+
+    BUMP = 0.125
+    MAX_BUMPS = 5
+
+    def __init__(self, w3U, bump: float = BUMP, maxBumps: int = MAX_BUMPS):
+        """
+        Initializes the accelerator, no RPC request is made here.
+        - `w3U`: Utilities of the client, for the settings and the `MaxTXFeeETH` check.
+        - `bump`: Minimum fee increase of a replacement, e.g. 0.125 for 12.5% (default `BUMP`).
+        - `maxBumps`: Maximum replacements per transaction (default `MAX_BUMPS`).
+        """
+        self.w3U = w3U
+        self.bump = float(bump)
+        self.maxBumps = int(maxBumps)
+        self._lock = threading.Lock()
+        self._watched = {}  # key -> {"txn", "block", "bumps"}
+
+    def __len__(self):
+        return len(self._watched)
+
+    @property
+    def blocks(self) -> int:
+        """
+        Blocks a transaction may stay pending before it is replaced, 0 if acceleration is disabled.
+        """
+        return int(self.w3U.settings.settings.get("Accelerate") or 0)
+
+    def watch(self, key, txn: dict):
+        """
+        Starts watching a sent transaction.
+        - `key`: Handle of the transaction, e.g. its `PendingSwap`.
+        - `txn`: The sent transaction, nonce, gas and fee fields set.
+        """
+        with self._lock:
+            self._watched[key] = {"txn": dict(txn), "block": None, "bumps": 0}
+
+    def forget(self, key):
+        """
+        Stops watching a transaction, e.g. once one of its hashes was mined.
+        """
+        with self._lock:
+            self._watched.pop(key, None)
+
+    def due(self, head: int) -> list:
+        """
+        Returns the keys of the transactions to replace now. A transaction is first seen at
+        `head`, it is due `blocks` blocks later and then again `blocks` blocks after every
+        replacement.
+        - `head`: Current block number.
+        """
+        blocks, due = self.blocks, []
+        if not blocks:
+            return due
+        with self._lock:
+            for key, entry in self._watched.items():
+                if entry["block"] is None:
+                    entry["block"] = head
+                elif head - entry["block"] >= blocks and entry["bumps"] < self.maxBumps:
+                    entry["block"] = head
+                    due.append(key)
+        return due
+
+    def _bumped(self, fee: int) -> int:
+        return max(int(fee) + 1, math.ceil(int(fee) * (1 + self.bump)))
+
+    def replace(self, key, fees: dict = None):
+        """
+        Returns the replacement of a due transaction and its gas tuple, None if it would exceed
+        `MaxTXFeeETH` or the transaction is no longer watched.
+        - `key`: Handle of the transaction.
+        - `fees`: Current fee fields from `getFees`, the replacement pays at least these (optional).
+        """
+        fees = fees or {}
+        with self._lock:
+            entry = self._watched.get(key)
+            if entry is None:
+                return None
+            txn = dict(entry["txn"])
+        if "maxFeePerGas" in txn:
+            tip = max(self._bumped(txn["maxPriorityFeePerGas"]), int(fees.get("maxPriorityFeePerGas", 0)))
+            price = max(self._bumped(txn["maxFeePerGas"]), int(fees.get("maxFeePerGas", 0)), tip)
+            txn.update({"maxFeePerGas": price, "maxPriorityFeePerGas": tip})
+        else:
+            price = max(self._bumped(txn["gasPrice"]), int(fees.get("gasPrice", 0)))
+            txn["gasPrice"] = price
+        gas = self.w3U.checkGasCost(txn["gas"], price, overhead=False)
+        if not gas[2]:
+            self.forget(key)  # Above MaxTXFeeETH, keep waiting with the last sent fees
+            return None
+        with self._lock:
+            if key not in self._watched:
+                return None
+            entry["txn"] = txn
+            entry["bumps"] += 1
+        return txn, gas
@@ -1,5 +1,14 @@
 from decimal import Decimal, ROUND_DOWN
+from concurrent.futures import ThreadPoolExecutor
 from web3 import Web3 
+from .NonceManager import NonceManager
+from .Signer import Signer
+from .FeeEngine import FeeEngine
+from .GasModel import GAS_MODEL
+from .PendingSwap import PendingSwap, ReceiptPoller
+from .LogScanner import LogScanner
+from .WalletIndex import WALLET_INDEX
+from .RetryPolicy import RetryPolicy, UnconfirmedTransaction
 
 
 
@@ -69,7 +78,14 @@ class W3Utils:
         str
             The Ethereum address corresponding to the private key.
         """
-        return self.w3.eth.account.from_key(str(private_key)).address
+        return Signer.of(str(private_key)).address
+
+    @property
+    def signer(self):
+        """
+        The `Signer` of the private key in the settings, the key is parsed once per process.
+        """
+        return Signer.of(self.settings.settings["private_key"])
 
     def estimateGas(self, txn):
         """
@@ -89,12 +105,340 @@ class W3Utils:
             - bool: Whether the gas cost is within the maximum allowed transaction fee.
         """
         gas = self.w3.eth.estimate_gas(txn)
-        gas_wei = gas + (gas / 10)  # Adding 10% overhead to gas
-        gas_cost = self.custom_round(Web3.from_wei(gas * (self.w3.eth.gas_price + (int(self.settings.settings['GWEI_OFFSET']) * (10**9))), "ether"))
+        return self.checkGasCost(gas, txn.get("maxFeePerGas") or txn.get("gasPrice") or self.getGasPrice())
+
+    def checkGasCost(self, gas: int, gas_price: int, overhead: bool = True):
+        """
+        Adds the gas overhead and checks the cost against `MaxTXFeeETH`.
+
+        Parameters:
+        -----------
+        gas : int
+            The estimated gas of the transaction.
+        gas_price : int
+            The gas price the transaction is sent with (GWEI offset included).
+        overhead : bool, optional
+            Add 10% to the gas limit, by default True. Learned limits already include their margin.
+
+        Returns:
+        --------
+        tuple
+            The `(gas limit, gas cost in Ether, within limit)` tuple of `estimateGas`.
+        """
+        gas_wei = gas + (gas / 10) if overhead else gas  # Adding 10% overhead to gas
+        gas_cost = self.custom_round(Web3.from_wei(gas * gas_price, "ether"))
         if float(gas_cost) > float(self.settings.settings["MaxTXFeeETH"]):
             return gas_wei, gas_cost, False
         return int(gas_wei), gas_cost, True
 
+    def batchRequest(self, calls: list, return_errors: bool = False, max_batch_size: int = 100) -> list:
+        """
+        Sends several raw JSON-RPC requests (e.g. `eth_getBalance`, `eth_gasPrice`, `eth_call`)
+        as one JSON-RPC batch, so they share a single HTTP POST. Longer lists are split into
+        batches of `max_batch_size` that are posted concurrently.
+
+        Parameters:
+        -----------
+        calls : list
+            Tuples of (method, params), e.g. `[("eth_gasPrice", []), ("eth_getBalance", [address, "latest"])]`.
+        return_errors : bool, optional
+            Return a `ValueError` in place of each failed request instead of raising, by default False.
+        max_batch_size : int, optional
+            Maximum requests per POST, by default 100.
+
+        Returns:
+        --------
+        list
+            The raw `result` of each request, in call order.
+
+        Raises:
+        -------
+        ValueError
+            If one of the requests returns an error and `return_errors` is False.
+        """
+        provider = self.w3.provider
+
+        def send(chunk):
+            try:
+                responses = provider.make_batch_request(chunk)
+            except (AttributeError, NotImplementedError):
+                # Provider without batch support, fall back to one request per call
+                responses = [provider.make_request(method, params) for method, params in chunk]
+            if isinstance(responses, dict):
+                raise ValueError(responses.get("error", responses))
+            return responses
+
+        chunks = [calls[i:i + max_batch_size] for i in range(0, len(calls), max_batch_size)]
+        if len(chunks) > 1:
+            with ThreadPoolExecutor(min(len(chunks), 8)) as pool:
+                responses = [response for chunk in pool.map(send, chunks) for response in chunk]
+        else:
+            responses = send(calls) if calls else []
+        results = []
+        for response in responses:
+            if response.get("error"):
+                if not return_errors:
+                    raise ValueError(response["error"])
+                results.append(ValueError(response["error"]))
+            else:
+                results.append(response.get("result"))
+        return results
+
+    def getGasPrice(self):
+        """
+        Returns the current gas price including the configured GWEI offset.
+
+        Returns:
+        --------
+        int
+            The gas price in wei.
+        """
+        return int(self.w3.eth.gas_price + Web3.to_wei(int(self.settings.settings["GWEI_OFFSET"]), "gwei"))
+
+    @property
+    def feeEngine(self):
+        """
+        The shared `FeeEngine` of the client's chain, None unless `FeeEngine` is enabled in the settings.
+        """
+        if not self.settings.settings.get("FeeEngine"):
+            return None
+        return FeeEngine.of(self.chain.chainID, self.settings.settings["PriorityFeePercentile"])
+
+    def feeRequest(self):
+        """
+        Returns the raw request the fee fields of a transaction need, as (method, params), or
+        None if the fee engine can compute them locally in the current block.
+
+        Returns:
+        --------
+        tuple or None
+            `eth_gasPrice` without the fee engine, `eth_feeHistory` once per block with it.
+        """
+        engine = self.feeEngine
+        if engine is None:
+            return "eth_gasPrice", []
+        blockCache = getattr(self, "blockCache", None)
+        return engine.request() if engine.stale(blockCache.block if blockCache else None) else None
+
+    def feeFields(self, result=None) -> dict:
+        """
+        Returns the fee fields of a transaction from the raw result of `feeRequest`.
+
+        Parameters:
+        -----------
+        result : str or dict, optional
+            The raw result of the request returned by `feeRequest`, None if there was none.
+
+        Returns:
+        --------
+        dict
+            `gasPrice` including the GWEI offset, or `maxFeePerGas` and `maxPriorityFeePerGas`
+            of a type-2 transaction with the offset added to the priority fee.
+        """
+        offset = Web3.to_wei(int(self.settings.settings["GWEI_OFFSET"]), "gwei")
+        engine = self.feeEngine
+        if engine is None:
+            return {"gasPrice": int(result, 16) + offset}
+        if result is not None:
+            engine.update(result)
+        return engine.fees(offset)
+
+    def getFees(self) -> dict:
+        """
+        Returns the fee fields of a transaction sent now. With the fee engine this is a type-2
+        transaction whose fees are read at most once per block.
+
+        Returns:
+        --------
+        dict
+            The fee fields, see `feeFields`.
+        """
+        request = self.feeRequest()
+        return self.feeFields(self.w3.manager.request_blocking(*request) if request else None)
+
+    def sendTransaction(self, txn, retries: int = 1):
+        """
+        Allocates the next local nonce of the sender, signs the transaction with the key from the
+        settings and sends it, without waiting for the receipt. Several transactions of one wallet
+        can be in flight this way, also from several threads or token handles at once.
+
+        Parameters:
+        -----------
+        txn : dict
+            The built transaction including `gas`, the nonce is set here.
+        retries : int, optional
+            How often the send is retried with a resynced nonce after a nonce error, by default 1.
+
+        Returns:
+        --------
+        HexBytes
+            The transaction hash.
+        """
+        nonces = NonceManager.of(self.w3, txn["from"], txn["chainId"])
+        while True:
+            txn["nonce"] = nonces.allocate()
+            signed_txn = None
+            try:
+                signed_txn = self.signer.sign(txn)
+                return self.w3.eth.send_raw_transaction(signed_txn.raw_transaction)
+            except Exception as e:
+                if signed_txn is not None and NonceManager.is_known_error(e):
+                    # The node already holds this signed transaction, its nonce stays in use
+                    raise UnconfirmedTransaction(signed_txn.hash.hex(), e) from e
+                if signed_txn is not None and RetryPolicy.classify(e) == RetryPolicy.TIMEOUT:
+                    # The node may have taken the transaction, resync instead of reusing the nonce
+                    nonces.invalidate()
+                    raise UnconfirmedTransaction(signed_txn.hash.hex(), e) from e
+                if not nonces.release(txn["nonce"], e) or retries <= 0:
+                    raise
+                retries -= 1
+
+    def sendTransactions(self, txns: list, workers: int = 4) -> list:
+        """
+        Sends many complete transactions of the settings wallet at once: consecutive nonces are
+        allocated locally, the transactions are signed in parallel and all raw transactions go
+        out in one JSON-RPC batch. Nonces of failed sends are handed out again.
+
+        Parameters:
+        -----------
+        txns : list
+            The built transactions including `gas`, the nonces are set here.
+        workers : int, optional
+            Threads signing in parallel, by default 4.
+
+        Returns:
+        --------
+        list
+            The transaction hash (hex, without `0x`) of every transaction, or the exception of a failed send
+            (`UnconfirmedTransaction` if the node already had the transaction).
+        """
+        if not txns:
+            return []
+        nonces = NonceManager.of(self.w3, txns[0]["from"], txns[0]["chainId"])
+        for txn in txns:
+            txn["nonce"] = nonces.allocate()
+        try:
+            signed = self.signer.signBatch(txns, workers)
+        except Exception:
+            for txn in reversed(txns):
+                nonces.release(txn["nonce"])
+            raise
+        results = self.batchRequest([("eth_sendRawTransaction", [Web3.to_hex(s.raw_transaction)]) for s in signed], return_errors=True)
+        for i in reversed(range(len(txns))):
+            if isinstance(results[i], Exception) and NonceManager.is_known_error(results[i]):
+                results[i] = UnconfirmedTransaction(signed[i].hash.hex(), results[i])  # Already in the mempool, the nonce stays in use
+            elif isinstance(results[i], Exception):
+                nonces.release(txns[i]["nonce"], results[i])
+        return [result if isinstance(result, Exception) else result[2:] for result in results]
+
+    @property
+    def receiptPoller(self):
+        """
+        The background poller tracking the receipts of all transactions sent by this client.
+        """
+        if getattr(self, "_receiptPoller", None) is None:
+            self._receiptPoller = ReceiptPoller(self)
+        return self._receiptPoller
+
+    def learnedGas(self, shape):
+        """
+        Returns the learned gas limit of a transaction shape, None if the shape is unknown or
+        the gas model is disabled in the settings.
+
+        Parameters:
+        -----------
+        shape : tuple or None
+            The shape from `GasModel.key`.
+
+        Returns:
+        --------
+        int or None
+            The gas limit including the `GasModel` margin of the settings.
+        """
+        margin = self.settings.settings.get("GasModel")
+        if not margin or shape is None:
+            return None
+        return GAS_MODEL.limit(shape, float(margin))
+
+    def learnGas(self, shape, receipt):
+        """
+        Records the gas used by a mined transaction of a shape, a failed transaction drops the shape.
+
+        Parameters:
+        -----------
+        shape : tuple or None
+            The shape from `GasModel.key`.
+        receipt : dict
+            The receipt of the transaction.
+        """
+        if shape is None or not self.settings.settings.get("GasModel"):
+            return
+        if receipt["status"] == 1:
+            GAS_MODEL.record(shape, receipt["gasUsed"])
+        else:
+            GAS_MODEL.forget(shape)  # May have run out of gas, estimate the next one
+
+    def signAndSend(self, txn, wait: bool = True, shape=None):
+        """
+        Estimates gas for a built transaction, sends it with the next local nonce and waits for the receipt.
+        A transaction whose gas cost exceeds `MaxTXFeeETH` is not sent. Known shapes use their
+        learned gas limit instead of `eth_estimateGas`.
+
+        Parameters:
+        -----------
+        txn : dict
+            The built transaction dictionary, e.g. from `AbiCodec.transaction`.
+        wait : bool, optional
+            Wait for the receipt, by default True. If False, a `PendingSwap` is returned right
+            after the transaction was sent.
+        shape : tuple, optional
+            The shape from `GasModel.key`, its receipt is recorded in the gas model.
+
+        Returns:
+        --------
+        tuple or PendingSwap
+            A tuple containing a boolean (success status), transaction hex, and gas estimate,
+            or the pending handle resolving to it.
+        """
+        limit = self.learnedGas(shape)
+        if limit:
+            gas = self.checkGasCost(limit, txn.get("maxFeePerGas") or txn.get("gasPrice") or self.getGasPrice(), overhead=False)
+        else:
+            gas = self.estimateGas(txn)
+        if not gas[2]:
+            result = False, "0", gas
+            return result if wait else PendingSwap.resolved(result)
+        txn.update({'gas': gas[0]})
+        return self.sendAndTrack(txn, gas, wait, shape)
+
+    def sendAndTrack(self, txn, gas, wait: bool = True, shape=None):
+        """
+        Sends a transaction whose gas limit is already set with the next local nonce and tracks its receipt.
+        With `Accelerate` in the settings a stuck transaction is replaced with the same nonce and bumped fees.
+
+        Parameters:
+        -----------
+        txn : dict
+            The complete transaction except the nonce.
+        gas : tuple
+            The gas estimate tuple returned with the result.
+        wait : bool, optional
+            Wait for the receipt, by default True.
+        shape : tuple, optional
+            The shape from `GasModel.key`, its receipt is recorded in the gas model.
+
+        Returns:
+        --------
+        tuple or PendingSwap
+            A tuple containing a boolean (success status), transaction hex, and gas estimate,
+            or the pending handle resolving to it.
+        """
+        pending = PendingSwap(self.sendTransaction(txn).hex(), gas)
+        if shape is not None:
+            pending.add_done_callback(lambda done: done.exception() or self.learnGas(shape, done.receipt))
+        self.receiptPoller.track(pending, self.settings.settings["timeout"], NonceManager.of(self.w3, txn["from"], txn["chainId"]), txn)
+        return self.receiptPoller.wait(pending, self.settings.settings["timeout"]) if wait else pending
+
     def custom_round(self, num):
         """
         Rounds a given decimal number according to specified rules based on its size.
@@ -204,58 +548,129 @@ class W3Utils:
         return decimal_number
 
 
-    def getWalletTokens(self, wallet_address: str, batch_size: int=10000, blocks_to_check: int = 150000 ):
+    def getWalletTokens(self, wallet_address: str, batch_size: int=10000, blocks_to_check: int = 150000, concurrency: int = 8, incremental: bool = True):
         """
         Fetches a list of unique token addresses that have been transferred to a specified wallet address 
         within a defined range of Ethereum blocks.
         Args:
             wallet_address (str): The Ethereum address of the wallet to check for token transfers.
-            batch_size (int, optional): The number of blocks to process in each batch when querying logs. Defaults to 10,000.
+            batch_size (int, optional): The initial number of blocks per `eth_getLogs` window, adapted while scanning. Defaults to 10,000.
             blocks_to_check (int, optional): The number of past blocks to check for transfers, starting from the latest block. Defaults to 150,000.
+            concurrency (int, optional): Maximum number of `eth_getLogs` requests in flight. Defaults to 8.
+            incremental (bool, optional): Scan only the blocks not covered by the wallet's checkpoint in the
+                wallet index. If False, the whole range is scanned again. Defaults to True.
             
         Returns:
-            set: A set of token contract addresses that have transferred tokens to the specified wallet.
+            list: A list of token contract addresses that have transferred tokens to the specified wallet.
             
         Methodology:
             1. Retrieves the latest block number from the Ethereum blockchain.
             2. Computes the starting block based on the number of `blocks_to_check`.
             3. Creates a filter for Transfer events, looking specifically for logs where the wallet_address is the recipient.
-            4. Iterates over the blocks in batches, fetching logs and extracting token addresses from the logs.
-            5. Returns a set of unique token contract addresses associated with transfers to the wallet.
+            4. Looks up the wallet's checkpoint in the wallet index, only the blocks it does not cover are scanned.
+            5. Scans these ranges with a `LogScanner`, fetching windows in parallel and extracting token addresses from the logs.
+            6. Records the scan in the wallet index and returns the tokens with a transfer to the wallet in the range.
             
         Notes:
             - This method only checks for ERC-20 token transfer events (using the "Transfer" event signature).
-            - Logs are retrieved in batches to avoid timeouts for large ranges.
-            - If an error occurs during log retrieval, it will return an empty list for that batch of logs.
+            - Windows the RPC rejects as too large are split and fetched again, windows that come back
+              quickly and empty let the window grow.
+            - Failing windows are retried, if they keep failing the error is raised instead of dropping the range.
+            - The wallet index lives in memory, set `WalletIndex` in the settings to keep it in a SQLite file.
+            - This is `getWalletsTokens` for a single wallet.
         """
+        wallet_address = Web3.to_checksum_address(wallet_address)
+        return self.getWalletsTokens([wallet_address], batch_size, blocks_to_check, concurrency, incremental=incremental)[wallet_address]
+
+    def iterWalletTokens(self, wallet_address: str, batch_size: int=10000, blocks_to_check: int = 150000, concurrency: int = 8, incremental: bool = True):
+        """
+        Streaming version of `getWalletTokens`. Yields every token address once, as soon as the
+        window it was found in is fetched, without keeping the logs. Tokens already in the wallet
+        index for the range come first. The checkpoint is recorded once the scan is complete.
+
+        Args:
+            wallet_address (str): The Ethereum address of the wallet to check for token transfers.
+            batch_size (int, optional): The initial number of blocks per `eth_getLogs` window. Defaults to 10,000.
+            blocks_to_check (int, optional): The number of past blocks to check for transfers, starting from the latest block. Defaults to 150,000.
+            concurrency (int, optional): Maximum number of `eth_getLogs` requests in flight. Defaults to 8.
+            incremental (bool, optional): Scan only the blocks not covered by the wallet's checkpoint. Defaults to True.
+
+        Yields:
+            str: Token contract addresses transferred to the wallet.
+        """
+        wallet_address = Web3.to_checksum_address(wallet_address)
         latest_block = self.w3.eth.block_number
         start_block = max(0, latest_block - blocks_to_check)
         transfer_event_signature = self.w3.keccak(text="Transfer(address,address,uint256)")
-        wallet_address_padded = '0x' + wallet_address[2:].rjust(64, '0')
-
-        def fetch_token_transfer_logs(start_block, end_block):
-            try:
-                filter_params = {
-                    'fromBlock': Web3.to_hex(start_block),
-                    'toBlock': Web3.to_hex(end_block),
-                    'topics': [transfer_event_signature, None, wallet_address_padded]
-                }
-                return self.w3.eth.get_logs(filter_params)
-            except Exception as e:
-                print(f"Error fetching logs: {e}")
-                return []
-
-        token_addresses = []
-        while start_block <= latest_block:
-            end_block = min(start_block + batch_size - 1, latest_block)
-            logs = fetch_token_transfer_logs(start_block, end_block)
-            for log in logs:
-                token_address = log['address']
-                token_addresses.append(token_address)
-            start_block = end_block + 1
+        wallet_address_padded = '0x' + wallet_address[2:].lower().rjust(64, '0')
+        chain_id = self.w3.eth.chain_id
+
+        seen = set()
+        if incremental:
+            ranges = WALLET_INDEX.missing(chain_id, wallet_address, start_block, latest_block)
+            for token in WALLET_INDEX.tokens(chain_id, wallet_address, start_block):
+                seen.add(token)
+                yield token
+        else:
+            ranges = [(start_block, latest_block)]
+
+        scanner = LogScanner(self.w3, window=batch_size, concurrency=concurrency)
+        filter_params = {'topics': [transfer_event_signature, None, wallet_address_padded]}
+        token_blocks = {}  # Token address -> last block a transfer to the wallet arrived in
+        for from_block, to_block in ranges:
+            for _, _, logs in scanner.iterLogs(filter_params, from_block, to_block):
+                for log in logs:
+                    token_blocks[log['address']] = max(token_blocks.get(log['address'], 0), log['blockNumber'])
+                    if log['address'] not in seen:
+                        seen.add(log['address'])
+                        yield log['address']
+        WALLET_INDEX.record(chain_id, wallet_address, start_block, latest_block, token_blocks)
+
+    def getWalletsTokens(self, wallets: list, batch_size: int=10000, blocks_to_check: int = 150000, concurrency: int = 8, chunk_size: int = 100, incremental: bool = True):
+        """
+        Fetches the tokens transferred to many wallets with shared `eth_getLogs` queries.
 
-        # Display the token addresses
-        return list(set(token_addresses))
+        The padded wallet addresses go into the OR list of the recipient topic, `chunk_size` wallets
+        per query, and the logs are sorted back to the wallets by their recipient topic. The cost
+        therefore grows with the block range, not with the number of wallets. Wallets are grouped by
+        the ranges their checkpoints in the wallet index still miss, so fresh and refreshed wallets
+        are scanned separately.
 
+        Args:
+            wallets (list): The wallet addresses to check for token transfers.
+            batch_size (int, optional): The initial number of blocks per `eth_getLogs` window. Defaults to 10,000.
+            blocks_to_check (int, optional): The number of past blocks to check for transfers, starting from the latest block. Defaults to 150,000.
+            concurrency (int, optional): Maximum number of `eth_getLogs` requests in flight. Defaults to 8.
+            chunk_size (int, optional): Maximum wallets per query, keep it within the topic limit of the RPC. Defaults to 100.
+            incremental (bool, optional): Scan only the blocks not covered by the wallets' checkpoints. Defaults to True.
 
-        
+        Returns:
+            dict: Wallet address (checksum) -> list of token contract addresses transferred to it.
+        """
+        latest_block = self.w3.eth.block_number
+        start_block = max(0, latest_block - blocks_to_check)
+        transfer_event_signature = self.w3.keccak(text="Transfer(address,address,uint256)")
+        chain_id = self.w3.eth.chain_id
+
+        groups = {}  # Ranges still to scan -> wallets
+        for wallet_address in dict.fromkeys(Web3.to_checksum_address(wallet) for wallet in wallets):
+            ranges = WALLET_INDEX.missing(chain_id, wallet_address, start_block, latest_block) if incremental else [(start_block, latest_block)]
+            groups.setdefault(tuple(ranges), []).append(wallet_address)
+
+        scanner = LogScanner(self.w3, window=batch_size, concurrency=concurrency)
+        result = {}
+        for ranges, group in groups.items():
+            for i in range(0, len(group), chunk_size):
+                chunk = group[i:i + chunk_size]
+                padded = {'0x' + wallet_address[2:].lower().rjust(64, '0'): wallet_address for wallet_address in chunk}
+                filter_params = {'topics': [transfer_event_signature, None, list(padded)]}
+                token_blocks = {wallet_address: {} for wallet_address in chunk}  # Wallet -> token -> last block a transfer arrived in
+                for from_block, to_block in ranges:
+                    for _, _, logs in scanner.iterLogs(filter_params, from_block, to_block):
+                        for log in logs:
+                            found = token_blocks[padded[Web3.to_hex(log['topics'][2])]]
+                            found[log['address']] = max(found.get(log['address'], 0), log['blockNumber'])
+                for wallet_address in chunk:
+                    WALLET_INDEX.record(chain_id, wallet_address, start_block, latest_block, token_blocks[wallet_address])
+                    result[wallet_address] = WALLET_INDEX.tokens(chain_id, wallet_address, start_block)
+        return result
@@ -0,0 +1,242 @@
+import csv
+from decimal import Decimal
+
+
+class WalletAsset:
+    """
+    Read-only view of one row of a `WalletAssets` result.
+
+    Supports the keys of the token data dicts (`asset["BalanceUSD"]`), the human readable
+    values are computed from the wei columns when they are read.
+    """
+
+    __slots__ = ("assets", "index")
+
+    KEYS = ("Address", "Name", "Symbol", "Decimals", "UniswapV", "BalanceWei", "Balance", "BalanceUSD",
+            "USDPriceWei", "ETHPriceWei", "USDPrice", "ETHPrice")
+
+    def __init__(self, assets, index: int):
+        self.assets = assets
+        self.index = index
+
+    @property
+    def Address(self):
+        return self.assets.address[self.index]
+
+    @property
+    def Name(self):
+        return self.assets.name[self.index]
+
+    @property
+    def Symbol(self):
+        return self.assets.symbol[self.index]
+
+    @property
+    def Decimals(self):
+        return self.assets.decimals[self.index]
+
+    @property
+    def UniswapV(self):
+        return self.assets.version[self.index]
+
+    @property
+    def BalanceWei(self):
+        return self.assets.balance_wei[self.index]
+
+    @property
+    def USDPriceWei(self):
+        return self.assets.usd_price_wei[self.index]
+
+    @property
+    def ETHPriceWei(self):
+        return self.assets.eth_price_wei[self.index]
+
+    @property
+    def Balance(self):
+        return Decimal(self.BalanceWei) / 10**self.Decimals
+
+    @property
+    def BalanceUSD(self):
+        return float(self.assets.formatter(float(self.Balance * self.ETHPriceWei * self.assets.eth_price) / 10**18))
+
+    @property
+    def USDPrice(self):
+        return self.assets.formatter(float(Decimal(self.ETHPriceWei) / 10**18 * self.assets.eth_price))
+
+    @property
+    def ETHPrice(self):
+        return self.assets.formatter(Decimal(self.ETHPriceWei) / 10**18)
+
+    def __getitem__(self, key):
+        if key not in self.KEYS:
+            raise KeyError(key)
+        return getattr(self, key)
+
+    def get(self, key, default=None):
+        return getattr(self, key) if key in self.KEYS else default
+
+    def to_dict(self) -> dict:
+        """
+        Returns the row as a token data dict.
+        """
+        return {key: getattr(self, key) for key in self.KEYS}
+
+    def __repr__(self):
+        return f"WalletAsset({self.Symbol}, {self.Address}, {self.BalanceWei})"
+
+
+class WalletAssets:
+    """
+    Columnar wallet valuation, the compact alternative to a list of token data dicts.
+
+    Every field is one column of raw values (addresses, names, wei integers), nothing is
+    formatted while the wallet is priced. `Balance`, `BalanceUSD`, `USDPrice` and `ETHPrice`
+    are computed only when a row or an export reads them. Iterating yields `WalletAsset`
+    rows that can be read like the token data dicts.
+
+    Example:
+        assets = BS.getWalletAssets(wallet, columnar=True)
+        print(assets.total_usd(), assets[0]["Symbol"])
+        assets.to_csv("wallet.csv")
+
+    Attributes:
+        eth_price (Decimal): ETH price in USD the rows are valued with.
+        formatter: Formats a number for display (`W3Utils.get_human_amount`).
+        address, name, symbol, decimals, version, balance_wei, usd_price_wei, eth_price_wei: The columns.
+    """
+
+    NATIVE = "Nativ"
+
+    def __init__(self, eth_price, formatter=str):
+        """
+        Initializes an empty result.
+        - `eth_price`: ETH price in USD.
+        - `formatter`: Formats a number for display (default `str`).
+        """
+        self.eth_price = Decimal(eth_price)
+        self.formatter = formatter
+        self.address, self.name, self.symbol = [], [], []
+        self.decimals, self.version = [], []  # Plain lists, a token can report decimals above 255
+        self.balance_wei, self.usd_price_wei, self.eth_price_wei = [], [], []
+
+    def __len__(self):
+        return len(self.address)
+
+    def __getitem__(self, index: int) -> WalletAsset:
+        if isinstance(index, slice):
+            return [WalletAsset(self, i) for i in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError(index)
+        return WalletAsset(self, index)
+
+    def __iter__(self):
+        return (WalletAsset(self, i) for i in range(len(self)))
+
+    def __repr__(self):
+        return f"WalletAssets({len(self)} rows)"
+
+    def append(self, address, name, symbol, decimals, version, balance_wei, usd_price_wei, eth_price_wei):
+        """
+        Adds one row.
+        """
+        self.address.append(address)
+        self.name.append(name)
+        self.symbol.append(symbol)
+        self.decimals.append(int(decimals))
+        self.version.append(int(version))
+        self.balance_wei.append(int(balance_wei))
+        self.usd_price_wei.append(int(usd_price_wei))
+        self.eth_price_wei.append(int(eth_price_wei))
+
+    def extend(self, result):
+        """
+        Adds the rows of one decoded `getWalletTokenDATA` result.
+        - `result`: The tuple of token, name, symbol, decimals, version, balance, USD price and ETH price lists.
+        """
+        tokenAddress, tokenName, tokenSymbol, tokenDecimals, tokensVersion, tokenBalances, tokenUSDPrice, tokenETHPrice = result
+        self.address += tokenAddress
+        self.name += tokenName
+        self.symbol += tokenSymbol
+        self.decimals += tokenDecimals
+        self.version += tokensVersion
+        self.balance_wei += tokenBalances
+        self.usd_price_wei += tokenUSDPrice
+        self.eth_price_wei += tokenETHPrice
+
+    def append_native(self, balance_wei: int):
+        """
+        Adds the native ETH balance as a row.
+        - `balance_wei`: ETH balance in wei.
+        """
+        self.append(self.NATIVE, "Ethereum", "ETH", 18, 3, balance_wei, int(self.eth_price.scaleb(6)), 10**18)
+
+    def value_wei(self, index: int) -> int:
+        """
+        Returns the value of a row in ETH wei, exact integer math.
+        """
+        return self.balance_wei[index] * self.eth_price_wei[index] // 10**self.decimals[index]
+
+    def total_usd(self) -> float:
+        """
+        Returns the summed USD value of all rows.
+        """
+        total = sum(self.value_wei(i) for i in range(len(self)))
+        return float(Decimal(total) / 10**18 * self.eth_price)
+
+    def sort(self, reverse: bool = True):
+        """
+        Orders the rows by value, highest first unless `reverse` is False. Compares integers only.
+        """
+        order = sorted(range(len(self)), key=self.value_wei, reverse=reverse)
+        for column in ("address", "name", "symbol", "decimals", "version", "balance_wei", "usd_price_wei", "eth_price_wei"):
+            values = getattr(self, column)
+            setattr(self, column, [values[i] for i in order])
+        return self
+
+    def to_dicts(self) -> list:
+        """
+        Returns the rows as a list of token data dicts.
+        """
+        return [row.to_dict() for row in self]
+
+    def to_csv(self, path_or_file):
+        """
+        Writes the rows to CSV, one column per token data key.
+        - `path_or_file`: File path or an open text file.
+        """
+        if isinstance(path_or_file, str):
+            with open(path_or_file, "w", newline="") as file:
+                return self.to_csv(file)
+        writer = csv.writer(path_or_file)
+        writer.writerow(WalletAsset.KEYS)
+        for row in self:
+            writer.writerow([row[key] for key in WalletAsset.KEYS])
+
+    def to_parquet(self, path: str):
+        """
+        Writes the rows to a Parquet file with the columns of `to_csv`, requires `pyarrow`. Wei
+        columns are stored as decimal strings since they do not fit 64-bit integers.
+        - `path`: File path.
+        """
+        try:
+            import pyarrow
+            import pyarrow.parquet
+        except ImportError as e:
+            raise ImportError("to_parquet requires pyarrow, install it with `pip install pyarrow`") from e
+        table = pyarrow.table({
+            "Address": self.address,
+            "Name": self.name,
+            "Symbol": self.symbol,
+            "Decimals": self.decimals,
+            "UniswapV": self.version,
+            "BalanceWei": [str(value) for value in self.balance_wei],
+            "Balance": [float(row.Balance) for row in self],
+            "BalanceUSD": [row.BalanceUSD for row in self],
+            "USDPriceWei": [str(value) for value in self.usd_price_wei],
+            "ETHPriceWei": [str(value) for value in self.eth_price_wei],
+            "USDPrice": [float(row.USDPrice) for row in self],
+            "ETHPrice": [float(row.ETHPrice) for row in self],
+        })
+        pyarrow.parquet.write_table(table, path)
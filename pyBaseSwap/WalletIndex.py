@@ -0,0 +1,147 @@
+import sqlite3
+import threading
+from web3 import Web3
+
+
+class WalletIndex:
+    """
+    Process-wide index of the tokens each wallet received, with a checkpoint of the scanned blocks.
+
+    For every `(chain_id, wallet)` the index keeps the scanned block range and the last block a
+    Transfer of each token arrived in. A wallet that was scanned before only needs the blocks
+    since its checkpoint (plus older blocks if a deeper scan is asked for), so refreshing a
+    wallet is one small log query. The index can be backed by a SQLite file to survive restarts.
+
+    Attributes:
+        REORG_BLOCKS (int): Blocks below the checkpoint that are scanned again to cover reorgs.
+        path (str): Path of the SQLite file, or None for memory only.
+    """
+
+    REORG_BLOCKS = 10
+
+    def __init__(self, path: str = None):
+        """
+        Initializes the index and loads the SQLite file if a path is given.
+        - `path`: SQLite file backing the index (optional).
+        """
+        self._lock = threading.Lock()
+        self._checkpoints = {}  # (chain_id, wallet) -> [from_block, to_block]
+        self._tokens = {}  # (chain_id, wallet) -> {token: last_block}
+        self._db = None
+        self.path = None
+        if path:
+            self.open(path)
+
+    @staticmethod
+    def key(chain_id, wallet):
+        """
+        Returns the index key of a wallet.
+        """
+        return int(chain_id), Web3.to_checksum_address(wallet)
+
+    def open(self, path: str):
+        """
+        Attaches a SQLite file and loads its entries into memory.
+        - `path`: SQLite file, created if it does not exist.
+        """
+        if path == self.path:
+            return
+        with self._lock:
+            if self._db is not None:
+                self._db.close()
+            self.path = path
+            self._db = sqlite3.connect(path, check_same_thread=False)
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS wallet_checkpoints ("
+                "chain_id INTEGER, wallet TEXT, from_block INTEGER, to_block INTEGER, "
+                "PRIMARY KEY (chain_id, wallet))"
+            )
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS wallet_tokens ("
+                "chain_id INTEGER, wallet TEXT, token TEXT, last_block INTEGER, "
+                "PRIMARY KEY (chain_id, wallet, token))"
+            )
+            for chain_id, wallet, from_block, to_block in self._db.execute("SELECT * FROM wallet_checkpoints"):
+                self._checkpoints[(chain_id, wallet)] = [from_block, to_block]
+            for chain_id, wallet, token, last_block in self._db.execute("SELECT * FROM wallet_tokens"):
+                self._tokens.setdefault((chain_id, wallet), {})[token] = last_block
+
+    def checkpoint(self, chain_id, wallet):
+        """
+        Returns the scanned `(from_block, to_block)` range of a wallet, or None if it was never scanned.
+        """
+        checkpoint = self._checkpoints.get(self.key(chain_id, wallet))
+        return tuple(checkpoint) if checkpoint else None
+
+    def missing(self, chain_id, wallet, from_block: int, to_block: int) -> list:
+        """
+        Returns the block ranges that still have to be scanned to cover `from_block`..`to_block`.
+        - `chain_id`: Chain ID of the wallet.
+        - `wallet`: Wallet address.
+        - `from_block`: First block that has to be covered.
+        - `to_block`: Last block that has to be covered (inclusive).
+        """
+        checkpoint = self.checkpoint(chain_id, wallet)
+        if checkpoint is None or checkpoint[1] < from_block or checkpoint[0] > to_block:
+            return [(from_block, to_block)]
+        ranges = []
+        if from_block < checkpoint[0]:
+            ranges.append((from_block, checkpoint[0] - 1))
+        start = max(checkpoint[1] - self.REORG_BLOCKS + 1, checkpoint[0], from_block)
+        if start <= to_block:
+            ranges.append((start, to_block))
+        return ranges
+
+    def record(self, chain_id, wallet, from_block: int, to_block: int, tokens: dict):
+        """
+        Stores a finished scan of a wallet.
+        - `chain_id`: Chain ID of the wallet.
+        - `wallet`: Wallet address.
+        - `from_block`: First block covered by the scan and the existing checkpoint.
+        - `to_block`: Last block covered (inclusive).
+        - `tokens`: Token address -> last block a Transfer to the wallet was seen in.
+        """
+        key = self.key(chain_id, wallet)
+        with self._lock:
+            checkpoint = self._checkpoints.get(key)
+            if checkpoint is not None and checkpoint[1] >= from_block - 1 and checkpoint[0] <= to_block + 1:
+                checkpoint = [min(checkpoint[0], from_block), max(checkpoint[1], to_block)]
+            else:
+                checkpoint = [from_block, to_block]  # Not adjacent to the old range, start a new one
+            self._checkpoints[key] = checkpoint
+            known = self._tokens.setdefault(key, {})
+            changed = {}
+            for token, last_block in tokens.items():
+                token = Web3.to_checksum_address(token)
+                if last_block > known.get(token, -1):
+                    known[token] = changed[token] = last_block
+            if self._db is not None:
+                self._db.execute("INSERT OR REPLACE INTO wallet_checkpoints VALUES (?, ?, ?, ?)", (*key, *checkpoint))
+                self._db.executemany(
+                    "INSERT OR REPLACE INTO wallet_tokens VALUES (?, ?, ?, ?)",
+                    [(*key, token, last_block) for token, last_block in changed.items()]
+                )
+                self._db.commit()
+
+    def tokens(self, chain_id, wallet, since_block: int = 0) -> list:
+        """
+        Returns the tokens the wallet received a Transfer of at or after `since_block`.
+        """
+        known = self._tokens.get(self.key(chain_id, wallet), {})
+        return [token for token, last_block in known.items() if last_block >= since_block]
+
+    def forget(self, chain_id, wallet):
+        """
+        Drops the checkpoint and tokens of a wallet, the next scan starts from scratch.
+        """
+        key = self.key(chain_id, wallet)
+        with self._lock:
+            self._checkpoints.pop(key, None)
+            self._tokens.pop(key, None)
+            if self._db is not None:
+                self._db.execute("DELETE FROM wallet_checkpoints WHERE chain_id = ? AND wallet = ?", key)
+                self._db.execute("DELETE FROM wallet_tokens WHERE chain_id = ? AND wallet = ?", key)
+                self._db.commit()
+
+
+WALLET_INDEX = WalletIndex()  # Shared by every client in the process
@@ -1,4 +1,11 @@
 # Define the package version
 __version__ = '0.0.1'
 
-from .SwapperModul import BaseSwap
\ No newline at end of file
+from .SwapperModul import BaseSwap
+from .AsyncSwapperModul import AsyncBaseSwap
+from .PendingSwap import PendingSwap
+from .WalletAssets import WalletAssets
+from .Signer import Signer
+from .DryRun import DryRun, SwapSimulation
+from .RetryPolicy import RetryPolicy, SwapOutcome, UnconfirmedTransaction
+from .TxAccelerator import TxAccelerator
@@ -1,3 +1,7 @@
+import weakref
+
+_provider_chains = weakref.WeakKeyDictionary()  # provider -> chains, so the chain id is fetched once per connection
+
 
 class chains:
     def __init__(self, chainID):
@@ -7,6 +11,7 @@ class chains:
         """
         self.BTTSwapper = None
         self.ZERO = "0x0000000000000000000000000000000000000000"  # This is constant across all chains
+        self.Multicall3 = "0xcA11bde05977b3631167028862bE2a173976CA11"  # Multicall3 is deployed at the same address on all chains
         self.WETH = None
         self.BTT = None
 
@@ -25,3 +30,13 @@ class chains:
         else:
             raise SystemExit(f"ChainID {chainID} currently not Supported!")
 
+    @classmethod
+    def of(cls, w3):
+        """
+        Returns the chain setup of a Web3 connection. The chain id is requested only once per provider.
+        - `w3`: Web3 instance of the connection.
+        """
+        chain = _provider_chains.get(w3.provider)
+        if chain is None:
+            chain = _provider_chains[w3.provider] = cls(w3.eth.chain_id)
+        return chain
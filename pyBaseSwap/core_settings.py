@@ -11,7 +11,18 @@ class CoreSettings:
         "GWEI_OFFSET": 0,  # Offset to estimate gas cost and adjust it if necessary
         "MaxTXFeeETH": 0.0001,  # Maximum transaction fee in ETH to avoid excessive gas costs
         "Slippage": 3,  # Maximum allowed slippage percentage for swap transactions
-        "timeout": 60  # Timeout in seconds for web3 requests
+        "timeout": 60,  # Timeout in seconds for web3 requests
+        "BatchRPC": False,  # Coalesce concurrent HTTP requests into JSON-RPC batches
+        "MetadataCache": "",  # JSON or SQLite file to persist token decimals/name/symbol, empty for memory only
+        "WalletIndex": "",  # SQLite file to persist scanned wallet tokens and checkpoints, empty for memory only
+        "BlockCache": 0,  # Seconds between block number polls of the per-block read cache, 0 disables the cache
+        "RouteCacheTTL": 0,  # Seconds a swap route or protocol version is reused (e.g. 60), 0 disables the route cache
+        "RouteCacheBlocks": 30,  # Maximum age of a cached route in blocks, checked while the block cache follows the heads
+        "FastPrepare": False,  # Prepare swaps with one batched request (quote, gas price, gas estimate, nonce) and sign locally
+        "FeeEngine": False,  # Send type-2 (EIP-1559) transactions with fees predicted from eth_feeHistory, read once per block
+        "PriorityFeePercentile": 50,  # Percentile of the recent priority fees paid by the fee engine
+        "GasModel": 0,  # Safety margin of gas limits learned from receipts (e.g. 0.2 for 20%), 0 estimates every transaction
+        "Accelerate": 0  # Blocks a transaction may stay pending before it is replaced with bumped fees (same nonce, within MaxTXFeeETH), 0 disables
     }
 
     def __init__(self, settings_file_path: str = "Settings.json", saveSetting: bool = False):
@@ -0,0 +1,49 @@
+import pytest
+from eth_abi import abi
+from web3 import Web3
+
+from pyBaseSwap.AbiCodec import AbiCodec
+from pyBaseSwap.core_abis import BTTSwapper_ABI, IERC20_ABI, Multicall3_ABI
+
+WETH = "0x4200000000000000000000000000000000000006"
+TOKEN = Web3.to_checksum_address("0x" + "ab" * 20)
+POOL = Web3.to_checksum_address("0x" + "cd" * 20)
+WALLET = Web3.to_checksum_address("0x" + "11" * 20)
+
+
+@pytest.mark.parametrize("contract_abi, name, args", [
+    (BTTSwapper_ABI, "swapETHtoTokenV3", [[WETH, TOKEN], [POOL], [500], 10**18]),
+    (BTTSwapper_ABI, "getWalletTokenDATA", [WALLET, [TOKEN, WETH]]),
+    (BTTSwapper_ABI, "getAmountsOut", [WETH, TOKEN, 123456789]),
+    (IERC20_ABI, "approve", [POOL, 2**256 - 1]),
+    (IERC20_ABI, "symbol", []),
+    (Multicall3_ABI, "aggregate3", [[(TOKEN, True, b"\x95\xd8\x9b\x41"), (POOL, False, b"")]]),
+])
+def test_encode_matches_the_web3_contract(contract_abi, name, args):
+    contract = Web3().eth.contract(abi=contract_abi)
+    assert Web3.to_hex(AbiCodec.of(contract_abi).encode(name, args)) == contract.encode_abi(name, args)
+
+
+def test_decode_checksums_addresses_and_keeps_several_outputs():
+    output_types = AbiCodec.of(BTTSwapper_ABI).functions["getSwapPathV3"][2]
+    raw = abi.encode(output_types, [[WETH.lower(), TOKEN.lower()], [1, 2], [POOL.lower()], [3000]])
+    assert AbiCodec.of(BTTSwapper_ABI).decode("getSwapPathV3", raw) == [[WETH, TOKEN], [1, 2], [POOL], [3000]]
+
+
+def test_decode_unwraps_a_single_output():
+    assert AbiCodec.of(BTTSwapper_ABI).decode("checkVersion", abi.encode(["uint8"], [3])) == 3
+    assert AbiCodec.of(IERC20_ABI).decode("symbol", abi.encode(["string"], ["USDC"])) == "USDC"
+
+
+def test_tuple_types_are_expanded():
+    assert AbiCodec.of(Multicall3_ABI).functions["aggregate3"][1:] == (["(address,bool,bytes)[]"], ["(bool,bytes)[]"])
+
+
+def test_transaction_is_built_offline():
+    txn = AbiCodec.of(IERC20_ABI).transaction("approve", [POOL, 1], TOKEN, WALLET, chainId=8453)
+    assert txn == {"from": WALLET, "to": TOKEN, "value": 0, "data": Web3().eth.contract(abi=IERC20_ABI).encode_abi("approve", [POOL, 1]), "chainId": 8453}
+
+
+def test_one_codec_per_abi():
+    assert AbiCodec.of(IERC20_ABI) is AbiCodec.of(IERC20_ABI)
+    assert AbiCodec.of(IERC20_ABI).selector("approve") == bytes.fromhex("095ea7b3")
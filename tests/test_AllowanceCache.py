@@ -0,0 +1,66 @@
+from hexbytes import HexBytes
+from web3 import Web3
+
+from pyBaseSwap.AllowanceCache import AllowanceCache
+
+TOKEN = Web3.to_checksum_address("0x" + "ab" * 20)
+OWNER = Web3.to_checksum_address("0x" + "11" * 20)
+SPENDER = Web3.to_checksum_address("0x" + "22" * 20)
+MAX = 2**256 - 1
+
+
+def topic(address):
+    return "0x" + "00" * 12 + address[2:].lower()
+
+
+def approval(value, spender=SPENDER, raw=True):
+    """
+    Returns an `Approval` log as `eth_getLogs` returns it (hex strings), or as web3 decodes it (bytes).
+    """
+    topics = [AllowanceCache.APPROVAL_TOPIC, topic(OWNER), topic(spender)]
+    data = "0x" + value.to_bytes(32, "big").hex()
+    if raw:
+        return {"address": TOKEN.lower(), "topics": topics, "data": data}
+    return {"address": TOKEN, "topics": [HexBytes(t) for t in topics], "data": HexBytes(data)}
+
+
+def test_unlimited_approval_is_cached():
+    allowances = AllowanceCache()
+    allowances.applyLogs(8453, [approval(MAX)])
+    assert allowances.approved(AllowanceCache.key(8453, TOKEN, OWNER, SPENDER))
+
+
+def test_decoded_logs_are_applied_like_raw_logs():
+    allowances = AllowanceCache()
+    allowances.applyLogs(8453, [approval(MAX, raw=False)])
+    assert allowances.approved(AllowanceCache.key(8453, TOKEN, OWNER, SPENDER))
+
+
+def test_later_logs_revoke_or_lower_the_approval():
+    allowances = AllowanceCache()
+    allowances.applyLogs(8453, [approval(MAX), approval(0)])
+    assert not allowances.approved(AllowanceCache.key(8453, TOKEN, OWNER, SPENDER))
+    allowances.applyLogs(8453, [approval(MAX), approval(10**18)])
+    assert not allowances.approved(AllowanceCache.key(8453, TOKEN, OWNER, SPENDER))
+
+
+def test_finite_approval_is_not_cached():
+    allowances = AllowanceCache()
+    allowances.applyLogs(8453, [approval(AllowanceCache.UNLIMITED - 1)])
+    assert allowances.stats()["approvals"] == 0
+
+
+def test_other_events_are_skipped():
+    allowances = AllowanceCache()
+    transfer = approval(MAX)
+    transfer["topics"] = [Web3.to_hex(Web3.keccak(text="Transfer(address,address,uint256)"))] + transfer["topics"][1:]
+    anonymous = approval(MAX)
+    anonymous["topics"] = anonymous["topics"][:2]
+    allowances.applyLogs(8453, [transfer, anonymous])
+    assert allowances.stats()["approvals"] == 0
+
+
+def test_approvals_are_kept_per_chain():
+    allowances = AllowanceCache()
+    allowances.applyLogs(1, [approval(MAX)])
+    assert not allowances.approved(AllowanceCache.key(8453, TOKEN, OWNER, SPENDER))
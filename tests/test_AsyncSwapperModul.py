@@ -0,0 +1,84 @@
+import asyncio
+import logging
+from decimal import Decimal
+
+import pytest
+from eth_abi import abi
+from hexbytes import HexBytes
+from web3 import AsyncWeb3, Web3
+from web3.providers.async_base import AsyncBaseProvider
+
+from pyBaseSwap import AsyncBaseSwap
+
+USDC = Web3.to_checksum_address("0x833589fcd6edb6e08f4c7c32d4f71b54bda02913")
+TOKENS = [Web3.to_checksum_address("0x" + "%02x" % byte * 20) for byte in range(1, 9)]
+GET_USD_PRICE = Web3.keccak(text="getUSDPrice(address)")[:4]
+
+
+class FakeNode(AsyncBaseProvider):
+    """
+    An async Base node that prices every token at its first address byte in USD. Each answer takes
+    a moment, so the requests in flight at the same time are counted.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self.requests, self.in_flight, self.max_in_flight = [], 0, 0
+
+    async def make_request(self, method, params):
+        self.requests.append(method)
+        if method == "eth_chainId":
+            return {"jsonrpc": "2.0", "id": 1, "result": hex(8453)}
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        await asyncio.sleep(0.01)
+        self.in_flight -= 1
+        data = HexBytes(params[0]["data"])
+        assert data[:4] == GET_USD_PRICE
+        token, = abi.decode(["address"], data[4:])
+        return {"jsonrpc": "2.0", "id": 1, "result": "0x" + abi.encode(["uint256"], [int(token[2:4], 16) * 10**6]).hex()}
+
+    async def is_connected(self, show_traceback=False):
+        return True
+
+
+@pytest.fixture
+def node(monkeypatch):
+    node = FakeNode()
+
+    def connect(self):
+        self.blockCache = None
+        return AsyncWeb3(node)
+
+    monkeypatch.setattr(AsyncBaseSwap, "connect", connect)
+    return node
+
+
+def test_construction_makes_no_request_and_init_resolves_the_chain(node, tmp_path, caplog, capsys):
+    bs = AsyncBaseSwap(settings_file_path=str(tmp_path / "Settings.json"))
+    assert node.requests == [] and bs.chain is None
+    with caplog.at_level(logging.INFO):
+        asyncio.run(bs.init())
+    assert node.requests == ["eth_chainId"]
+    assert bs.chain.chainID == 8453 and bs.token == USDC
+    assert "falling back to USDC" in caplog.text and capsys.readouterr().out == ""
+
+
+def test_prices_are_read_concurrently(node, tmp_path):
+    async def main():
+        bs = await AsyncBaseSwap.create(TOKENS[0], str(tmp_path / "Settings.json"))
+        return await asyncio.gather(*[bs.getUSDPriceOf(token) for token in TOKENS])
+
+    assert asyncio.run(main()) == [Decimal(int(token[2:4], 16)) for token in TOKENS]
+    assert node.max_in_flight == len(TOKENS)
+
+
+def test_change_token_makes_no_request(node, tmp_path):
+    async def main():
+        bs = await AsyncBaseSwap.create(TOKENS[0], str(tmp_path / "Settings.json"))
+        requests = len(node.requests)
+        bs.changeToken(TOKENS[1].lower())
+        assert len(node.requests) == requests
+        return await bs.getUSDPrice()
+
+    assert asyncio.run(main()) == Decimal(2)
@@ -0,0 +1,79 @@
+import threading
+import time
+
+import pytest
+from web3 import Web3
+
+from pyBaseSwap.BatchProvider import BatchHTTPProvider
+
+
+class FakeBatchProvider(BatchHTTPProvider):
+    """
+    Answers every request with its own params after a short delay and records the size of each POST.
+    """
+
+    def __init__(self, **kwargs):
+        super().__init__("http://rpc.invalid", **kwargs)
+        self.sizes = []
+        self._sizes_lock = threading.Lock()
+
+    def _post(self, requests):
+        with self._sizes_lock:
+            self.sizes.append(len(requests))
+        time.sleep(0.02)
+        return [{"jsonrpc": "2.0", "id": i, "result": params} for i, (method, params) in enumerate(requests)]
+
+    def make_batch_request(self, requests):
+        return self._post(requests)
+
+
+@pytest.fixture
+def provider(monkeypatch):
+    fake = FakeBatchProvider()
+    monkeypatch.setattr(Web3.HTTPProvider, "make_request", lambda self, method, params: fake._post([(method, params)])[0])
+    return fake
+
+
+def call_concurrently(provider, count):
+    barrier, responses = threading.Barrier(count), {}
+
+    def call(i):
+        barrier.wait()
+        responses[i] = provider.make_request("eth_getBalance", [i, "latest"])
+
+    threads = [threading.Thread(target=call, args=(i,)) for i in range(count)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return responses
+
+
+def test_alone_caller_sends_a_single_request(provider):
+    assert provider.make_request("eth_chainId", [])["result"] == []
+    assert provider.sizes == [1]
+
+
+@pytest.mark.parametrize("max_in_flight", [1, 4])
+def test_concurrent_callers_get_their_own_response_and_no_empty_batch(provider, max_in_flight):
+    provider.max_in_flight = max_in_flight
+    responses = call_concurrently(provider, 20)
+    assert {i: response["result"] for i, response in responses.items()} == {i: [i, "latest"] for i in range(20)}
+    assert 0 not in provider.sizes
+    assert sum(provider.sizes) == 20
+    assert provider.posts == len(provider.sizes) < 20
+
+
+def test_batches_are_split_at_max_batch_size(provider):
+    provider.max_batch_size = 3
+    call_concurrently(provider, 12)
+    assert max(provider.sizes) <= 3 and 0 not in provider.sizes
+
+
+def test_rejected_batch_answers_every_caller_with_the_error(provider, monkeypatch):
+    rejection = {"jsonrpc": "2.0", "id": None, "error": {"code": -32600, "message": "batch too large"}}
+    monkeypatch.setattr(provider, "make_batch_request", lambda requests: (provider._post(requests), rejection)[1])
+    responses = call_concurrently(provider, 12)
+    batched = [response for response in responses.values() if "error" in response]
+    assert len(batched) == 12 - provider.sizes.count(1) > 0
+    assert all(response == rejection for response in batched)
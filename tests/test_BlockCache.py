@@ -0,0 +1,102 @@
+import time
+
+import pytest
+from web3 import Web3
+from web3.providers.base import BaseProvider
+
+from pyBaseSwap.BlockCache import BlockCache
+
+WALLET = Web3.to_checksum_address("0x" + "11" * 20)
+
+
+class FakeProvider(BaseProvider):
+    """
+    Counts the requests per method, balances grow with every read so cached answers are visible.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self.requests, self.head = [], 100
+
+    def make_request(self, method, params):
+        self.requests.append(method)
+        if method == "eth_blockNumber":
+            return {"jsonrpc": "2.0", "id": 1, "result": hex(self.head)}
+        return {"jsonrpc": "2.0", "id": 1, "result": hex(len(self.requests))}
+
+
+@pytest.fixture
+def cached(monkeypatch):
+    provider = FakeProvider()
+    w3 = Web3(provider)
+    cache = BlockCache.attach(w3)
+    monkeypatch.setattr(cache, "watch", lambda make_request: None)  # Heads are fed by the test
+    return w3, cache, provider
+
+
+def test_nothing_is_cached_without_a_head(cached):
+    w3, cache, provider = cached
+    w3.eth.get_balance(WALLET)
+    w3.eth.get_balance(WALLET)
+    assert provider.requests.count("eth_getBalance") == 2
+
+
+def test_repeated_reads_in_a_block_are_served_from_memory(cached):
+    w3, cache, provider = cached
+    cache.new_head(100)
+    first = w3.eth.get_balance(WALLET)
+    assert w3.eth.get_balance(WALLET) == first
+    assert provider.requests.count("eth_getBalance") == 1
+    assert cache.stats() == {"block": 100, "hits": 1, "misses": 1, "entries": 1}
+
+
+def test_new_head_drops_the_entries(cached):
+    w3, cache, provider = cached
+    cache.new_head(100)
+    first = w3.eth.get_balance(WALLET)
+    cache.new_head(100)  # Same head, entries stay
+    assert w3.eth.get_balance(WALLET) == first
+    cache.new_head(101)
+    assert cache.stats()["entries"] == 0
+    assert w3.eth.get_balance(WALLET) != first
+    assert provider.requests.count("eth_getBalance") == 2
+
+
+def test_fixed_block_and_pending_reads_are_not_cached(cached):
+    w3, cache, provider = cached
+    cache.new_head(100)
+    for _ in range(2):
+        w3.eth.get_balance(WALLET, 99)
+        w3.eth.get_transaction_count(WALLET, "pending")
+    assert provider.requests.count("eth_getBalance") == provider.requests.count("eth_getTransactionCount") == 2
+    assert cache.key("eth_getBalance", [WALLET, "latest"]) is not None
+    assert cache.key("eth_sendRawTransaction", ["0x00"]) is None
+
+
+def test_errors_and_answers_from_an_older_head_are_not_stored():
+    cache = BlockCache()
+    cache.new_head(100)
+    key = cache.key("eth_gasPrice", [])
+    cache.put(key, 100, {"jsonrpc": "2.0", "id": 1, "error": {"code": -32000, "message": "unavailable"}})
+    cache.put(key, 99, {"jsonrpc": "2.0", "id": 1, "result": "0x1"})  # Requested before the head moved
+    assert cache.get(key) is None
+    cache.put(key, 100, {"jsonrpc": "2.0", "id": 1, "result": "0x2"})
+    assert cache.get(key)["result"] == "0x2"
+
+
+def test_poller_follows_the_head_and_stops_when_idle():
+    provider = FakeProvider()
+    w3 = Web3(provider)
+    cache = BlockCache.attach(w3, interval=0.01, idle=0.2)
+    w3.eth.get_balance(WALLET)
+    deadline = time.monotonic() + 2
+    while cache.block != 100 and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert cache.block == 100
+    provider.head = 101
+    while cache.block != 101 and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert cache.block == 101
+    while cache._poller is not None and time.monotonic() < deadline + 1:
+        time.sleep(0.05)
+    assert cache._poller is None and cache.block is None  # Idle, heads are no longer followed
@@ -0,0 +1,52 @@
+from eth_abi import abi
+from web3.exceptions import ContractLogicError
+
+from pyBaseSwap.DryRun import DryRun
+
+OWNER = "0x" + "11" * 20
+SPENDER = "0x" + "22" * 20
+
+
+def error_data(reason):
+    return DryRun.ERROR_SELECTOR + abi.encode(["string"], [reason]).hex()
+
+
+def panic_data(code):
+    return DryRun.PANIC_SELECTOR + abi.encode(["uint256"], [code]).hex()
+
+
+def test_error_string_from_a_json_rpc_error():
+    error = {"code": 3, "message": "execution reverted: STF", "data": error_data("STF")}
+    assert DryRun.revertReason(error) == "STF"
+
+
+def test_panic_code_from_nested_data():
+    error = {"code": -32000, "message": "execution reverted", "data": {"data": panic_data(0x11)}}
+    assert DryRun.revertReason(error) == "Panic(0x11)"
+
+
+def test_error_dict_in_the_exception_args():
+    assert DryRun.revertReason(ValueError({"message": "execution reverted", "data": error_data("Too little received")})) == "Too little received"
+
+
+def test_contract_logic_error_data():
+    assert DryRun.revertReason(ContractLogicError("execution reverted", data=error_data("EXPIRED"))) == "EXPIRED"
+
+
+def test_rpc_response_of_the_exception():
+    error = ValueError("call failed")
+    error.rpc_response = {"jsonrpc": "2.0", "id": 1, "error": {"message": "execution reverted", "data": panic_data(1)}}
+    assert DryRun.revertReason(error) == "Panic(0x1)"
+
+
+def test_undecodable_errors_fall_back_to_the_message():
+    assert DryRun.revertReason({"message": "execution reverted", "data": "0xdeadbeef"}) == "execution reverted"
+    assert DryRun.revertReason(TimeoutError("read timed out")) == "read timed out"
+
+
+def test_state_override():
+    state = DryRun(balance=10**18, allowances={"0x" + "ab" * 20: 1}).stateOverride(OWNER, SPENDER)
+    token = next(address for address in state if address.lower() == "0x" + "ab" * 20)
+    assert state[next(address for address in state if address.lower() == OWNER)]["balance"] == "0xde0b6b3a7640000"
+    assert state[token]["stateDiff"] == {DryRun.allowanceSlot(OWNER, SPENDER, 1): "0x" + "ff" * 32}
+    assert DryRun().stateOverride(OWNER, SPENDER) == {}
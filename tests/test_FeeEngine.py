@@ -0,0 +1,97 @@
+import pytest
+
+from pyBaseSwap import FeeEngine as FeeEngineModule
+from pyBaseSwap.FeeEngine import FeeEngine
+
+GWEI = 10**9
+
+
+def history(baseFees, ratios, rewards, oldest=100):
+    """
+    Returns a raw (hex) `eth_feeHistory` result.
+    """
+    return {
+        "oldestBlock": hex(oldest),
+        "baseFeePerGas": [hex(fee) for fee in baseFees],
+        "gasUsedRatio": ratios,
+        "reward": [[hex(reward)] for reward in rewards],
+    }
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(FeeEngineModule.time, "monotonic", lambda: now[0])
+    return now
+
+
+def test_update_reads_the_raw_history():
+    engine = FeeEngine(8453, percentile=60)
+    assert engine.request() == ("eth_feeHistory", ["0xa", "latest", [60]])
+    engine.update(history([10, 11, 12, 13], [0.5, 0.2, 0.2], [3, 1, 2]))
+    assert engine.block == 102  # oldestBlock + 3 history blocks - 1
+    assert engine.baseFee == 13  # The next block's base fee is the last entry
+    assert engine.priorityFee == 2  # Median of the rewards at the percentile
+    assert engine.gasUsedRatio == pytest.approx(0.3)
+
+
+def test_update_takes_decoded_history_without_rewards():
+    engine = FeeEngine(8453)
+    engine.update({"oldestBlock": 7, "baseFeePerGas": [GWEI, GWEI], "gasUsedRatio": [0.1], "reward": []})
+    assert (engine.block, engine.baseFee, engine.priorityFee) == (7, GWEI, 0)
+
+
+@pytest.mark.parametrize("chain_id, ratio, expected", [
+    (8453, 1.0, 102 * GWEI // 100),  # Base: elasticity 6, denominator 250, a full block adds 2%
+    (8453, 1 / 6, GWEI),  # At the target the base fee stays
+    (8453, 0.0, GWEI - GWEI // 250),  # An empty block removes 0.4%
+    (1, 1.0, GWEI + GWEI // 8),  # Mainnet rule: elasticity 2, denominator 8, a full block adds 12.5%
+    (1, 0.0, GWEI - GWEI // 8),
+])
+def test_next_base_fee_follows_the_chain_rule(chain_id, ratio, expected):
+    assert FeeEngine(chain_id).nextBaseFee(GWEI, ratio) == pytest.approx(expected, abs=1)
+
+
+def test_next_base_fee_grows_by_at_least_one_wei():
+    assert FeeEngine(8453).nextBaseFee(1, 1.0) == 2
+
+
+@pytest.mark.parametrize("chain_id", [8453, 1])
+def test_max_base_fee_bounds_full_blocks(chain_id):
+    engine = FeeEngine(chain_id)
+    engine.update(history([GWEI, 7 * GWEI + 3], [1.0], [0]))
+    fullBlocks = engine.baseFee
+    for blocks in range(1, 6):
+        assert engine.maxBaseFee(blocks) >= fullBlocks
+        assert engine.maxBaseFee(blocks) - fullBlocks <= blocks  # Only rounding apart
+        fullBlocks = engine.nextBaseFee(fullBlocks, 1.0)
+
+
+def test_predict_base_fee_uses_the_mean_ratio():
+    engine = FeeEngine(1)
+    engine.update(history([GWEI, GWEI], [1.0], [0]))
+    assert engine.predictBaseFee(1) == GWEI
+    assert engine.predictBaseFee(3) == engine.nextBaseFee(engine.nextBaseFee(GWEI, 1.0), 1.0)
+
+
+def test_fees_cover_the_headroom_and_the_elapsed_blocks(clock):
+    engine = FeeEngine(1, headroom=3, block_time=12)
+    engine.update(history([GWEI, GWEI], [0.5], [2 * GWEI]))
+    assert engine.fees(offset=1) == {"maxFeePerGas": engine.maxBaseFee(4) + 2 * GWEI + 1, "maxPriorityFeePerGas": 2 * GWEI + 1}
+    clock[0] += 25  # Two blocks passed without a refresh
+    assert engine.fees()["maxFeePerGas"] == engine.maxBaseFee(6) + 2 * GWEI
+
+
+def test_stale_by_head_or_block_time(clock):
+    engine = FeeEngine(8453, block_time=2)
+    assert engine.stale()
+    engine.update(history([GWEI, GWEI], [0.5], [1], oldest=50))
+    assert not engine.stale() and not engine.stale(head=50)
+    assert engine.stale(head=51)
+    clock[0] += 2
+    assert engine.stale()
+
+
+def test_of_shares_one_engine_per_chain_and_percentile():
+    assert FeeEngine.of(8453, 50) is FeeEngine.of(8453, 50)
+    assert FeeEngine.of(8453, 50) is not FeeEngine.of(8453, 90)
@@ -0,0 +1,47 @@
+from web3 import Web3
+
+from pyBaseSwap.GasModel import GasModel
+
+WETH = "0x4200000000000000000000000000000000000006"
+TOKEN = Web3.to_checksum_address("0x" + "ab" * 20)
+
+
+def test_key_is_shaped_by_function_and_route():
+    shape = GasModel.key(8453, "swapETHtoTokenV3", [WETH.lower(), TOKEN.lower()])
+    assert shape == (8453, "swapETHtoTokenV3", 1, (WETH, TOKEN))
+    assert GasModel.key(8453, "swapETHtoTokenV2", [WETH, TOKEN]) != shape
+
+
+def test_unknown_shape_has_no_limit():
+    model = GasModel()
+    assert model.limit(GasModel.key(8453, "approve", [TOKEN]), 0.2) is None
+    assert model.stats()["misses"] == 1
+
+
+def test_limit_is_the_highest_sample_plus_margin():
+    model = GasModel()
+    shape = GasModel.key(8453, "swapETHtoTokenV3", [WETH, TOKEN])
+    for gasUsed in (120000, 150001, 130000):
+        model.record(shape, gasUsed)
+    assert model.limit(shape, 0.2) == 180002  # ceil(150001 * 1.2)
+    assert model.limit(shape, 0) == 150001
+
+
+def test_samples_outside_the_window_are_dropped():
+    model = GasModel()
+    shape = GasModel.key(8453, "approve", [TOKEN])
+    model.record(shape, 500000)
+    for _ in range(GasModel.WINDOW):
+        model.record(shape, 50000)
+    assert model.limit(shape, 0) == 50000
+
+
+def test_forget_drops_one_or_all_shapes():
+    model = GasModel()
+    approve, swap = GasModel.key(8453, "approve", [TOKEN]), GasModel.key(8453, "swapETHtoTokenV2", [WETH, TOKEN])
+    model.record(approve, 46000)
+    model.record(swap, 140000)
+    model.forget(approve)
+    assert model.limit(approve, 0) is None and model.limit(swap, 0) == 140000
+    model.forget()
+    assert model.stats()["shapes"] == 0
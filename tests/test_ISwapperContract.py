@@ -0,0 +1,198 @@
+import threading
+
+import pytest
+import rlp
+from eth_abi import abi
+from eth_account import Account
+from hexbytes import HexBytes
+from web3 import Web3
+from web3.providers.base import BaseProvider
+
+from pyBaseSwap import BaseSwap
+from pyBaseSwap.AbiCodec import AbiCodec
+from pyBaseSwap.core_abis import BTTSwapper_ABI
+from pyBaseSwap.ISwapperContract import InterfaceSwapperContract
+from pyBaseSwap.NonceManager import NonceManager
+from pyBaseSwap.PendingSwap import ReceiptPoller
+
+KEY = "0x" + "4c" * 32
+WALLET = Account.from_key(KEY).address
+WETH = Web3.to_checksum_address("0x4200000000000000000000000000000000000006")
+TOKENS = [Web3.to_checksum_address("0x" + "%04x" % index * 10) for index in range(1, 71)]
+FUNCTIONS = {AbiCodec.of(BTTSwapper_ABI).selector(entry["name"]): entry for entry in BTTSwapper_ABI if entry.get("type") == "function"}
+
+
+class FakeNode(BaseProvider):
+    """
+    A Base node with the swapper deployed. Every token in `tokens` was sent to the wallet, ETH
+    costs 2000 USD and every token 1 USD. `getWalletTokenDATA` runs out of gas for more than
+    `limit` tokens and reverts for batches holding a token of `bad`. Records the methods of
+    every POST and the swapper calls as (name, arguments).
+    """
+
+    def __init__(self, tokens=(), limit=1000, bad=()):
+        super().__init__()
+        self.tokens, self.limit, self.bad = list(tokens), limit, set(bad)
+        self.posts, self.calls, self.sent = [], [], []
+        self._lock = threading.Lock()
+
+    def make_request(self, method, params):
+        if method != "eth_chainId":  # Cached by the providers of `connect`, not a request there
+            with self._lock:
+                self.posts.append([method])
+        return self._respond(method, params)
+
+    def make_batch_request(self, requests):
+        with self._lock:
+            self.posts.append([method for method, _ in requests])
+        return [dict(self._respond(method, params), id=index) for index, (method, params) in enumerate(requests)]
+
+    def _respond(self, method, params):
+        try:
+            return {"jsonrpc": "2.0", "id": 0, "result": self._result(method, params)}
+        except ValueError as e:
+            return {"jsonrpc": "2.0", "id": 0, "error": {"code": -32000, "message": str(e)}}
+
+    def _result(self, method, params):
+        if method == "eth_chainId":
+            return hex(8453)
+        if method == "eth_blockNumber":
+            return hex(1000)
+        if method == "eth_getBalance":
+            return hex(2 * 10**18)
+        if method == "eth_gasPrice":
+            return hex(10**6)
+        if method == "eth_getTransactionCount":
+            return hex(7)
+        if method == "eth_estimateGas":
+            return hex(100000)
+        if method == "eth_getLogs":
+            return [
+                {"address": token, "blockNumber": hex(900), "logIndex": "0x0", "transactionIndex": "0x0", "removed": False,
+                 "transactionHash": "0x" + "00" * 32, "blockHash": "0x" + "00" * 32, "data": "0x",
+                 "topics": [Web3.to_hex(Web3.keccak(text="Transfer(address,address,uint256)")), "0x" + "00" * 32, params[0]["topics"][2]]}
+                for token in self.tokens
+            ]
+        if method == "eth_sendRawTransaction":
+            self.sent.append(HexBytes(params[0]))
+            return Web3.to_hex(Web3.keccak(hexstr=params[0]))
+        if method == "eth_getTransactionReceipt":
+            return {"transactionHash": params[0], "status": "0x1", "gasUsed": hex(90000), "blockNumber": hex(1001), "blockHash": "0x" + "00" * 32,
+                    "transactionIndex": "0x0", "cumulativeGasUsed": hex(90000), "effectiveGasPrice": hex(10**6), "logs": [], "logsBloom": "0x" + "00" * 256,
+                    "from": WALLET, "to": None, "contractAddress": None, "type": "0x0"}
+        return self._call(HexBytes(params[0]["data"]))
+
+    def _call(self, data):
+        function = FUNCTIONS[data[:4]]
+        args = abi.decode(AbiCodec.types(function["inputs"]), data[4:])
+        with self._lock:
+            self.calls.append((function["name"], args))
+        if function["name"] == "getUSDPrice":
+            result = [2000 * 10**6 if Web3.to_checksum_address(args[0]) == WETH else 10**6]
+        elif function["name"] == "getWalletTokenDATA":
+            tokens = args[1]
+            if len(tokens) > self.limit:
+                raise ValueError("out of gas")
+            if self.bad.intersection(Web3.to_checksum_address(token) for token in tokens):
+                raise ValueError("execution reverted")
+            n = len(tokens)
+            result = [tokens, ["Token"] * n, ["TKN"] * n, [18] * n, [2] * n, [10**18] * n, [10**6] * n, [5 * 10**14] * n]
+        elif function["name"] == "getSwapPathV2":
+            result = [list(args), [0]]
+        else:  # getAmountsOutV2
+            result = [[args[0], args[0] * 1000]]
+        return "0x" + abi.encode(AbiCodec.types(function["outputs"]), result).hex()
+
+
+@pytest.fixture
+def client(monkeypatch, tmp_path):
+    """
+    Returns a factory of clients on a `FakeNode`, with fresh batch sizes and nonce managers.
+    """
+    monkeypatch.setattr(InterfaceSwapperContract, "_walletBatchSizes", {})
+    monkeypatch.setattr(InterfaceSwapperContract, "_walletBatchLimits", {})
+    monkeypatch.setattr(NonceManager, "_managers", {})
+    monkeypatch.setattr(ReceiptPoller, "interval", 0.01)
+
+    def make(node, **settings):
+        def connect(self):
+            self.blockCache = None
+            return Web3(node)
+
+        monkeypatch.setattr(BaseSwap, "connect", connect)
+        path = tmp_path / "Settings.json"
+        path.write_text(Web3.to_json({"address": WALLET, "private_key": KEY, "MaxTXFeeETH": 1, **settings}))
+        return BaseSwap(TOKENS[0], str(path))
+
+    return make
+
+
+def test_iter_wallet_assets_streams_every_token_once(client):
+    node = FakeNode(TOKENS)
+    rows = client(node).iterWalletAssets(WALLET, blocks_to_check=500, incremental=False)
+    native = next(rows)
+    assert native["Symbol"] == "ETH" and native["BalanceUSD"] == pytest.approx(4000.0)
+    assert not any(method == "eth_getLogs" for post in node.posts for method in post)  # ETH comes before the scan
+    rows = list(rows)
+    assert sorted(row["Address"] for row in rows) == sorted(TOKENS)
+    assert rows[0]["BalanceUSD"] == pytest.approx(1.0)
+    batches = sorted(len(args[1]) for name, args in node.calls if name == "getWalletTokenDATA")
+    assert batches == [len(TOKENS) % 28, 28, 28]
+
+
+def test_wallet_token_data_reads_everything_in_one_post_and_grows_the_batch(client):
+    node = FakeNode()
+    bs = client(node)
+    bs.getUSDPrice()  # Resolves the chain
+    node.posts.clear()
+    rows = bs.getWalletTokenDATA(WALLET, TOKENS)
+    assert node.posts == [["eth_call", "eth_getBalance"] + ["eth_call"] * 3]
+    assert rows[0]["Symbol"] == "ETH" and sorted(row["Address"] for row in rows[1:]) == sorted(TOKENS)
+    assert bs._walletBatchSize() == 42  # Clean full batches, the size grows by half
+
+
+def test_batches_over_the_gas_limit_are_split_and_the_size_stays_below_it(client):
+    node = FakeNode(limit=20)
+    bs = client(node)
+    assert len(bs.getWalletTokenDATA(WALLET, TOKENS)) == len(TOKENS) + 1
+    assert sorted(len(args[1]) for name, args in node.calls if name == "getWalletTokenDATA") == [14] * 5 + [28] * 2
+    assert bs._walletBatchSize() == 21  # Halved to 14, then grown again after the clean retry round
+    for _ in range(3):
+        assert len(bs.getWalletTokenDATA(WALLET, TOKENS)) == len(TOKENS) + 1
+        assert bs._walletBatchSize() <= 20  # Stays below the smallest size that failed
+
+
+def test_a_reverting_token_is_skipped_without_shrinking_the_batch(client, caplog):
+    node = FakeNode(bad={TOKENS[5]})
+    bs = client(node)
+    rows = bs.getWalletTokenDATA(WALLET, TOKENS)
+    assert sorted(row["Address"] for row in rows[1:]) == sorted(TOKENS[:5] + TOKENS[6:])
+    assert TOKENS[5] in caplog.text
+    assert bs._walletBatchSize() == 42
+
+
+def sent_transaction(raw):
+    """
+    Returns the nonce, gas price, gas, value and minimum output of a signed legacy `swapETHtoTokenV2`.
+    """
+    fields = rlp.decode(bytes(raw))
+    nonce, gasPrice, gas, value = (int.from_bytes(fields[index], "big") for index in (0, 1, 2, 4))
+    return nonce, gasPrice, gas, value, abi.decode(["address[]", "uint256[]", "uint256"], fields[5][4:])[2]
+
+
+def test_fast_prepare_reads_everything_in_one_batch_and_signs_locally(client):
+    node = FakeNode()
+    success, tx_hash, gas = client(node, FastPrepare=True).SwapFromETHtoTokenV2(10**15)
+    assert success and tx_hash == Web3.keccak(node.sent[0]).hex().removeprefix("0x")
+    assert node.posts[:3] == [["eth_call"], ["eth_call", "eth_estimateGas", "eth_gasPrice", "eth_getTransactionCount"], ["eth_sendRawTransaction"]]  # Route, preparation, send
+    assert sent_transaction(node.sent[0]) == (7, 10**6, 110000, 10**15, 10**18 * 97 // 100)  # 3 % slippage on the quote
+
+
+def test_fast_prepare_skips_the_nonce_read_once_synced(client):
+    node = FakeNode()
+    bs = client(node, FastPrepare=True)
+    bs.SwapFromETHtoTokenV2(10**15)
+    node.posts.clear()
+    bs.SwapFromETHtoTokenV2(10**15)
+    assert node.posts[:3] == [["eth_call"], ["eth_call", "eth_estimateGas", "eth_gasPrice"], ["eth_sendRawTransaction"]]
+    assert [sent_transaction(raw)[0] for raw in node.sent] == [7, 8]
@@ -0,0 +1,73 @@
+import threading
+from types import SimpleNamespace
+
+import pytest
+
+from pyBaseSwap import LogScanner as LogScannerModule
+from pyBaseSwap.LogScanner import LogScanner
+
+
+class FakeNode:
+    """
+    Serves `eth_getLogs` for one log every `every` blocks, rejecting ranges longer than `limit`
+    blocks and failing the first `failures` requests with a transient error.
+    """
+
+    def __init__(self, limit=1000, failures=0, every=7):
+        self.limit, self.failures, self.every = limit, failures, every
+        self.ranges = []
+        self._lock = threading.Lock()
+
+    def get_logs(self, params):
+        start, end = int(params["fromBlock"], 16), int(params["toBlock"], 16)
+        with self._lock:
+            self.ranges.append((start, end))
+            if self.failures:
+                self.failures -= 1
+                raise ConnectionError("connection reset by peer")
+        if end - start + 1 > self.limit:
+            raise ValueError({"code": -32005, "message": f"block range is too large, max {self.limit}"})
+        return [{"blockNumber": block, "logIndex": 0, "topics": params["topics"]} for block in range(start, end + 1) if block % self.every == 0]
+
+
+def scanner(node, **kwargs):
+    return LogScanner(SimpleNamespace(eth=node), **kwargs)
+
+
+def test_scan_returns_every_log_in_order():
+    logs = scanner(FakeNode(), window=300, concurrency=4).scan({"topics": ["0x01"]}, 1, 5000)
+    assert [log["blockNumber"] for log in logs] == list(range(7, 5001, 7))
+
+
+def test_windows_cover_the_range_exactly_once():
+    windows = sorted((start, end) for start, end, _ in scanner(FakeNode(), window=300).iterLogs({"topics": []}, 10, 4321))
+    assert windows[0][0] == 10 and windows[-1][1] == 4321
+    assert all(previous[1] + 1 == following[0] for previous, following in zip(windows, windows[1:]))
+
+
+def test_too_large_window_is_split_and_the_window_shrinks():
+    node = FakeNode(limit=1000)
+    scan = scanner(node, window=5000, concurrency=1)
+    logs = scan.scan({"topics": []}, 0, 9999)
+    assert len(logs) == len(range(0, 10000, 7))
+    assert node.ranges[:3] == [(0, 4999), (0, 2499), (0, 1249)]
+    assert scan.window <= 1000
+
+
+def test_fast_empty_windows_grow_up_to_max_window():
+    scan = scanner(FakeNode(limit=10**9, every=10**9), window=100, concurrency=1, max_window=800)
+    assert scan.scan({"topics": []}, 1, 5000) == []
+    assert scan.window == 800
+
+
+def test_transient_errors_are_retried(monkeypatch):
+    monkeypatch.setattr(LogScannerModule.time, "sleep", lambda seconds: None)
+    node = FakeNode(failures=2)
+    assert len(scanner(node, window=1000, concurrency=1).scan({"topics": []}, 0, 999)) == len(range(0, 1000, 7))
+    assert node.ranges == [(0, 999)] * 3
+
+
+def test_errors_are_raised_once_the_retries_are_used_up(monkeypatch):
+    monkeypatch.setattr(LogScannerModule.time, "sleep", lambda seconds: None)
+    with pytest.raises(ConnectionError):
+        scanner(FakeNode(failures=10), window=1000, retries=2).scan({"topics": []}, 0, 999)
@@ -0,0 +1,85 @@
+import asyncio
+from decimal import Decimal
+from types import SimpleNamespace
+
+from eth_abi import abi
+from web3 import Web3
+
+from pyBaseSwap.AbiCodec import AbiCodec
+from pyBaseSwap.core_abis import BTTSwapper_ABI, IERC20_ABI, Multicall3_ABI
+from pyBaseSwap.core_chains import chains
+from pyBaseSwap.Multicall import AsyncMulticallBatch, Multicall, MulticallBatch
+
+CHAIN = chains(8453)
+TOKEN = Web3.to_checksum_address("0x" + "ab" * 20)
+BROKEN = Web3.to_checksum_address("0x" + "ee" * 20)
+WALLET = Web3.to_checksum_address("0x" + "11" * 20)
+
+
+class FakeNode:
+    """
+    Executes `aggregate3` calls: decodes the sub calls with `eth_abi` and answers each from `ANSWERS`.
+    Sub calls to `BROKEN` fail.
+    """
+
+    ANSWERS = {"getUSDPrice": 2500 * 10**6, "decimals": 6, "symbol": "USDC", "balanceOf": 42, "getEthBalance": 3 * 10**18, "getBlockNumber": 123}
+
+    def __init__(self):
+        self.calls, self.subcalls = [], []
+        self.codecs = [AbiCodec.of(contract_abi) for contract_abi in (BTTSwapper_ABI, IERC20_ABI, Multicall3_ABI)]
+
+    def answer(self, target, data):
+        for codec in self.codecs:
+            for name, (selector, input_types, output_types) in codec.functions.items():
+                if data[:4] == selector:
+                    self.subcalls.append((Web3.to_checksum_address(target), name, list(abi.decode(input_types, data[4:]))))
+                    return abi.encode(output_types, [self.ANSWERS[name]])
+        raise AssertionError(f"Unknown selector {data[:4].hex()}")
+
+    def call(self, txn, block_identifier):
+        assert txn["to"] == CHAIN.Multicall3
+        self.calls.append(block_identifier)
+        data = bytes.fromhex(txn["data"][2:])
+        assert data[:4] == AbiCodec.of(Multicall3_ABI).selector("aggregate3")
+        (subcalls,) = abi.decode(["(address,bool,bytes)[]"], data[4:])
+        results = [(False, b"") if Web3.to_checksum_address(target) == BROKEN else (True, self.answer(target, payload))
+                   for target, allowFailure, payload in subcalls]
+        assert all(allowFailure for _, allowFailure, _ in subcalls)
+        return abi.encode(["(bool,bytes)[]"], [results])
+
+
+def client(w3):
+    return SimpleNamespace(w3=w3, chain=CHAIN, IERC20=SimpleNamespace(get_token_address=lambda: TOKEN))
+
+
+def test_batch_reads_in_one_call_and_keeps_the_order():
+    node = FakeNode()
+    batch = MulticallBatch(client(SimpleNamespace(eth=node)))
+    results = batch.getUSDPrice().decimals().symbol(TOKEN).balanceOf(None, WALLET).getETHBalanceOf(WALLET).getBlockNumber().execute()
+    assert results == [Decimal(2500), 6, "USDC", 42, Decimal(3), 123]
+    assert len(node.calls) == 1
+    assert node.subcalls[0] == (CHAIN.BTTSwapper, "getUSDPrice", [TOKEN.lower()])
+    assert node.subcalls[3] == (TOKEN, "balanceOf", [WALLET.lower()])
+    assert node.subcalls[4] == (CHAIN.Multicall3, "getEthBalance", [WALLET.lower()])
+
+
+def test_failed_sub_call_returns_none():
+    batch = MulticallBatch(client(SimpleNamespace(eth=FakeNode())))
+    assert batch.decimals(BROKEN).decimals(TOKEN).execute() == [None, 6]
+
+
+def test_calls_are_split_in_chunks_of_max_calls():
+    node = FakeNode()
+    calls = [(TOKEN, IERC20_ABI, "decimals", [], None)] * 7
+    assert Multicall(SimpleNamespace(eth=node), CHAIN, max_calls=3).aggregate(calls, 99) == [6] * 7
+    assert node.calls == [99, 99, 99]
+
+
+def test_async_batch_reads_the_chunks_concurrently():
+    node = FakeNode()
+
+    async def call(txn, block_identifier):
+        return node.call(txn, block_identifier)
+
+    batch = AsyncMulticallBatch(client(SimpleNamespace(eth=SimpleNamespace(call=call))))
+    assert asyncio.run(batch.getNativPrice().decimals().execute()) == [Decimal(2500), 6]
@@ -0,0 +1,135 @@
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+from hexbytes import HexBytes
+
+from pyBaseSwap.AsyncW3Utils import AsyncW3Utils
+from pyBaseSwap.NonceManager import NonceManager
+from pyBaseSwap.RetryPolicy import UnconfirmedTransaction
+from pyBaseSwap.W3Utils import W3Utils
+
+ADDRESS = "0x" + "11" * 20
+
+
+def manager(count=5):
+    reads = []
+
+    def get_transaction_count(address, block):
+        reads.append(block)
+        return count
+
+    return NonceManager(SimpleNamespace(eth=SimpleNamespace(get_transaction_count=get_transaction_count)), ADDRESS), reads
+
+
+def test_allocate_syncs_once_then_counts_locally():
+    nonces, reads = manager(5)
+    assert [nonces.allocate() for _ in range(3)] == [5, 6, 7]
+    assert reads == ["pending"]
+
+
+def test_seed_skips_the_read():
+    nonces, reads = manager(5)
+    nonces.seed(9)
+    nonces.seed(1)  # Already synced, ignored
+    assert nonces.allocate() == 9
+    assert reads == []
+
+
+def test_released_gap_is_reused_first():
+    nonces, _ = manager(0)
+    assert [nonces.allocate() for _ in range(3)] == [0, 1, 2]
+    assert nonces.release(1) is False
+    assert nonces.allocate() == 1
+    assert nonces.allocate() == 3
+
+
+def test_release_of_the_last_nonce_shrinks_over_gaps():
+    nonces, _ = manager(0)
+    for _ in range(4):
+        nonces.allocate()  # 0..3
+    nonces.release(1)
+    nonces.release(2)
+    nonces.release(3)  # 1..3 unsent, the next fresh nonce falls back to 1
+    assert [nonces.allocate() for _ in range(3)] == [1, 2, 3]
+
+
+def test_nonce_error_resyncs():
+    nonces, reads = manager(5)
+    nonce = nonces.allocate()
+    assert nonces.release(nonce, ValueError("nonce too low: next nonce 7")) is True
+    assert not nonces.synced
+    nonces.allocate()
+    assert reads == ["pending", "pending"]
+
+
+def test_release_after_invalidate_is_ignored():
+    nonces, _ = manager(5)
+    nonce = nonces.allocate()
+    nonces.invalidate()
+    assert nonces.release(nonce) is False
+    assert not nonces.synced
+
+
+def test_of_shares_one_manager_per_chain_and_address():
+    w3 = SimpleNamespace()
+    assert NonceManager.of(w3, ADDRESS.lower(), 8453) is NonceManager.of(w3, ADDRESS, 8453)
+    assert NonceManager.of(w3, ADDRESS, 8453) is not NonceManager.of(w3, ADDRESS, 1)
+
+
+class FakeNode:
+    """
+    Answers every `eth_sendRawTransaction` with an error and counts the sends.
+    """
+
+    def __init__(self, error):
+        self.error, self.sent = error, []
+
+    def send_raw_transaction(self, raw):
+        self.sent.append(raw)
+        raise self.error
+
+
+def client(node, chain_id, asynchronous=False):
+    """
+    Returns the parts of a `W3Utils` that `sendTransaction` uses, around a fake node.
+    """
+    async def count(address, block):
+        return 5
+
+    async def send(raw):
+        return node.send_raw_transaction(raw)
+
+    eth = SimpleNamespace(get_transaction_count=count, send_raw_transaction=send) if asynchronous else \
+        SimpleNamespace(get_transaction_count=lambda address, block: 5, send_raw_transaction=node.send_raw_transaction)
+    signer = SimpleNamespace(sign=lambda txn: SimpleNamespace(raw_transaction=bytes([txn["nonce"]]), hash=HexBytes(bytes([txn["nonce"]]) * 32)))
+    return SimpleNamespace(w3=SimpleNamespace(eth=eth), signer=signer), {"from": ADDRESS, "chainId": chain_id}
+
+
+@pytest.mark.parametrize("message, chain_id", [("already known", 9001), ("known transaction: 0x5e1f", 9002)])
+def test_known_transaction_is_not_resent(message, chain_id):
+    node = FakeNode(ValueError({"code": -32000, "message": message}))
+    w3U, txn = client(node, chain_id)
+    with pytest.raises(UnconfirmedTransaction) as raised:
+        W3Utils.sendTransaction(w3U, txn, retries=3)
+    assert node.sent == [bytes([5])]
+    assert raised.value.tx_hash == HexBytes(bytes([5]) * 32).hex()
+    nonces = NonceManager.of(w3U.w3, ADDRESS, chain_id)
+    assert nonces.synced and nonces.allocate() == 6  # The nonce stays in use
+    assert not NonceManager.is_nonce_error(message) and NonceManager.is_known_error(message)
+
+
+def test_known_transaction_is_not_resent_async():
+    node = FakeNode(ValueError({"code": -32000, "message": "already known"}))
+    w3U, txn = client(node, 9003, asynchronous=True)
+    with pytest.raises(UnconfirmedTransaction):
+        asyncio.run(AsyncW3Utils.sendTransaction(w3U, txn, retries=3))
+    assert node.sent == [bytes([5])]
+
+
+def test_nonce_error_is_resent_with_a_resynced_nonce():
+    node = FakeNode(ValueError({"code": -32000, "message": "nonce too low"}))
+    w3U, txn = client(node, 9004)
+    with pytest.raises(ValueError):
+        W3Utils.sendTransaction(w3U, txn, retries=1)
+    assert len(node.sent) == 2
@@ -0,0 +1,72 @@
+from types import SimpleNamespace
+
+import pytest
+from web3.exceptions import TimeExhausted
+
+from pyBaseSwap.PendingSwap import PendingSwap, ReceiptPoller
+
+TX_HASH = "0x" + "ab" * 32
+
+
+class FakeW3U:
+    """
+    Answers the batched receipt requests of the poller from a script of rounds.
+    """
+
+    def __init__(self, *rounds):
+        self.settings = SimpleNamespace(settings={"Accelerate": 0})
+        self.rounds = list(rounds)
+
+    def batchRequest(self, calls):
+        answer = self.rounds.pop(0) if self.rounds else None
+        if isinstance(answer, Exception):
+            raise answer
+        return [answer] * len(calls)
+
+
+def poller(w3U):
+    receipts = ReceiptPoller(w3U)
+    receipts.interval = 0.01
+    return receipts
+
+
+def test_mined_receipt_resolves_the_handle():
+    receipts = poller(FakeW3U(None, {"status": "0x1", "transactionHash": TX_HASH}))
+    pending = PendingSwap(TX_HASH, 21000)
+    receipts.track(pending, timeout=5)
+    assert receipts.wait(pending, 5) == (True, TX_HASH, 21000)
+    assert len(receipts) == 0
+
+
+def test_failing_round_keeps_the_poller_alive(monkeypatch):
+    receipts = poller(FakeW3U({"status": "0x0", "transactionHash": TX_HASH}))
+    poll, calls = receipts._poll, []
+
+    def flaky(hashes):
+        calls.append(hashes)
+        if len(calls) == 1:
+            raise RuntimeError("round failed")
+        poll(hashes)
+
+    monkeypatch.setattr(receipts, "_poll", flaky)
+    pending = PendingSwap(TX_HASH, 21000)
+    receipts.track(pending, timeout=5)
+    assert receipts.wait(pending, 5) == (False, TX_HASH, 21000)
+    assert len(calls) == 2
+
+
+def test_expired_handle_fails_and_resyncs_the_nonces():
+    nonces = SimpleNamespace(invalidated=False)
+    nonces.invalidate = lambda: setattr(nonces, "invalidated", True)
+    receipts = poller(FakeW3U())
+    pending = PendingSwap(TX_HASH)
+    receipts.track(pending, timeout=0.05, nonces=nonces)
+    with pytest.raises(TimeExhausted):
+        receipts.wait(pending, 0.05)
+    assert nonces.invalidated
+
+
+def test_wait_gives_up_when_the_handle_is_never_resolved():
+    receipts = poller(FakeW3U())
+    with pytest.raises(TimeExhausted):
+        receipts.wait(PendingSwap(TX_HASH), 0.01)  # Never tracked, the wait times out on its own
@@ -0,0 +1,97 @@
+import aiohttp
+import pytest
+import requests
+from multidict import CIMultiDict, CIMultiDictProxy
+from web3.exceptions import ContractLogicError, TimeExhausted
+from yarl import URL
+
+from pyBaseSwap.RetryPolicy import RetryPolicy, SwapOutcome, UnconfirmedTransaction
+
+
+def http_error(status):
+    response = requests.Response()
+    response.status_code = status
+    return requests.exceptions.HTTPError(f"{status} Error", response=response)
+
+
+def client_response_error(status):
+    info = aiohttp.RequestInfo(URL("http://rpc"), "POST", CIMultiDictProxy(CIMultiDict()), URL("http://rpc"))
+    return aiohttp.ClientResponseError(info, (), status=status)
+
+
+@pytest.mark.parametrize("error, errorClass", [
+    (ValueError({"code": -32000, "message": "insufficient funds for gas * price + value"}), RetryPolicy.INSUFFICIENT_FUNDS),
+    (ValueError("replacement transaction underpriced"), RetryPolicy.UNDERPRICED),
+    (ValueError("max fee per gas less than block base fee"), RetryPolicy.UNDERPRICED),
+    (ValueError("nonce too low: next nonce 7, tx nonce 5"), RetryPolicy.NONCE),
+    (ValueError("nonce too high"), RetryPolicy.NONCE),
+    # The node already holds the transaction, sending it again could swap twice
+    (ValueError({"code": -32000, "message": "already known"}), RetryPolicy.NOT_MINED),
+    (ValueError("known transaction: 0x5e1f"), RetryPolicy.NOT_MINED),
+    (ValueError("unknown transaction type"), RetryPolicy.UNKNOWN),
+    (ValueError("execution reverted: STF"), RetryPolicy.REVERT),
+    (ContractLogicError("0x"), RetryPolicy.REVERT),
+    (TimeExhausted("not in the chain after 120 seconds"), RetryPolicy.NOT_MINED),
+    (UnconfirmedTransaction("0xab", TimeoutError()), RetryPolicy.NOT_MINED),
+    (http_error(429), RetryPolicy.TIMEOUT),
+    (http_error(503), RetryPolicy.TIMEOUT),
+    (http_error(400), RetryPolicy.UNKNOWN),
+    (client_response_error(502), RetryPolicy.TIMEOUT),
+    (client_response_error(401), RetryPolicy.UNKNOWN),
+    (requests.exceptions.ConnectionError("connection reset"), RetryPolicy.TIMEOUT),
+    (aiohttp.ServerDisconnectedError(), RetryPolicy.TIMEOUT),
+    (TimeoutError(), RetryPolicy.TIMEOUT),
+    (ValueError({"code": -32005, "message": "Too Many Requests"}), RetryPolicy.TIMEOUT),
+    # Status codes and short tokens inside other messages are not transient errors
+    (ValueError("token 0x5030429502 has no pool"), RetryPolicy.UNKNOWN),
+    (ValueError("stfu"), RetryPolicy.UNKNOWN),
+])
+def test_classify(error, errorClass):
+    assert RetryPolicy.classify(error) == errorClass
+
+
+def test_delay_grows_up_to_the_max_and_stops_for_final_classes():
+    policy = RetryPolicy()
+    assert [policy.delay(RetryPolicy.TIMEOUT, n) for n in (1, 2, 6)] == [0.05, 0.1, 1.0]
+    assert policy.delay(RetryPolicy.INSUFFICIENT_FUNDS, 1) is None
+    assert policy.delay(RetryPolicy.NOT_MINED, 1) is None
+
+
+def test_run_retries_until_success():
+    calls = []
+
+    def attempt():
+        calls.append(1)
+        if len(calls) < 3:
+            raise ValueError("nonce too low")
+        return True, "0xab", 21000
+
+    outcome = RetryPolicy().run(attempt, trys=3)
+    assert isinstance(outcome, SwapOutcome)
+    assert tuple(outcome) == (True, "0xab", 21000)
+    assert outcome.attempts == 3
+
+
+@pytest.mark.parametrize("message", ["already known", "known transaction: 0x5e1f"])
+def test_run_does_not_retry_a_known_transaction(message):
+    calls = []
+
+    def attempt():
+        calls.append(1)
+        raise ValueError({"code": -32000, "message": message})
+
+    outcome = RetryPolicy().run(attempt, trys=5)
+    assert len(calls) == 1 and outcome.errorClass == RetryPolicy.NOT_MINED
+
+
+def test_run_does_not_retry_an_unconfirmed_transaction():
+    calls = []
+
+    def attempt():
+        calls.append(1)
+        raise UnconfirmedTransaction("0xab", requests.exceptions.ReadTimeout())
+
+    outcome = RetryPolicy().run(attempt, trys=5)
+    assert len(calls) == 1
+    assert not outcome.status and outcome.errorClass == RetryPolicy.NOT_MINED
+    assert isinstance(outcome.error, UnconfirmedTransaction)
@@ -0,0 +1,63 @@
+from web3 import Web3
+
+from pyBaseSwap import RouteCache as RouteCacheModule
+from pyBaseSwap.RouteCache import RouteCache
+
+WETH = "0x4200000000000000000000000000000000000006"
+TOKEN = Web3.to_checksum_address("0x" + "ab" * 20)
+OTHER = Web3.to_checksum_address("0x" + "cd" * 20)
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+def cache(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(RouteCacheModule.time, "monotonic", clock)
+    return RouteCache(), clock
+
+
+def test_key_normalizes_addresses_and_version():
+    assert RouteCache.key(8453, WETH.lower(), TOKEN.lower(), "3") == (8453, WETH, TOKEN, 3)
+    assert RouteCache.key(8453, TOKEN) == (8453, TOKEN, None, None)
+
+
+def test_entry_expires_after_the_ttl(monkeypatch):
+    routes, clock = cache(monkeypatch)
+    key = RouteCache.key(8453, WETH, TOKEN, 3)
+    routes.put(key, [WETH, TOKEN])
+    clock.now += 60
+    assert routes.get(key, ttl=60) == [WETH, TOKEN]
+    clock.now += 0.5
+    assert routes.get(key, ttl=60) is None
+    assert routes.stats() == {"hits": 1, "misses": 1, "entries": 0}
+
+
+def test_entry_expires_after_max_blocks(monkeypatch):
+    routes, _ = cache(monkeypatch)
+    key = RouteCache.key(8453, WETH, TOKEN, 2)
+    routes.put(key, [WETH, TOKEN], block=100)
+    assert routes.get(key, max_blocks=30) == [WETH, TOKEN]  # Block unknown to the caller, only the ttl counts
+    assert routes.get(key, max_blocks=30, block=130) == [WETH, TOKEN]
+    assert routes.get(key, max_blocks=30, block=131) is None
+
+
+def test_entry_without_block_only_expires_by_time(monkeypatch):
+    routes, _ = cache(monkeypatch)
+    key = RouteCache.key(8453, TOKEN)
+    routes.put(key, 3)
+    assert routes.get(key, block=10**9) == 3
+
+
+def test_invalidate_drops_the_routes_of_a_token(monkeypatch):
+    routes, _ = cache(monkeypatch)
+    keys = [RouteCache.key(8453, WETH, TOKEN, 3), RouteCache.key(8453, TOKEN), RouteCache.key(8453, WETH, OTHER, 3), RouteCache.key(1, WETH, TOKEN, 3)]
+    for key in keys:
+        routes.put(key, "route")
+    routes.invalidate(TOKEN.lower(), chain_id=8453)
+    assert [routes.get(key) for key in keys] == [None, None, "route", "route"]
@@ -0,0 +1,29 @@
+from eth_account import Account
+
+from pyBaseSwap.Signer import Signer
+
+KEY = "0x" + "4c" * 32
+
+
+def transaction(nonce):
+    return {"to": "0x" + "22" * 20, "value": 1, "gas": 21000, "maxFeePerGas": 10**9, "maxPriorityFeePerGas": 10**8,
+            "nonce": nonce, "chainId": 8453, "data": "0x"}
+
+
+def test_one_signer_per_key():
+    assert Signer.of(KEY) is Signer.of(KEY)
+    assert Signer.of(KEY).address == Account.from_key(KEY).address
+
+
+def test_sign_matches_eth_account():
+    signed = Signer.of(KEY).sign(transaction(0))
+    assert signed.raw_transaction == Account.sign_transaction(transaction(0), KEY).raw_transaction
+    assert Account.recover_transaction(signed.raw_transaction) == Signer.of(KEY).address
+
+
+def test_parallel_batch_keeps_the_order():
+    txns = [transaction(nonce) for nonce in range(8)]
+    sequential = Signer.of(KEY).signBatch(txns)
+    parallel = Signer.of(KEY).signBatch(txns, workers=4)
+    assert [signed.raw_transaction for signed in parallel] == [signed.raw_transaction for signed in sequential]
+    assert [signed.raw_transaction for signed in sequential] == [Signer.of(KEY).sign(txn).raw_transaction for txn in txns]
@@ -0,0 +1,94 @@
+import threading
+from decimal import Decimal
+
+import pytest
+from eth_abi import abi
+from hexbytes import HexBytes
+from web3 import Web3
+from web3.providers.base import BaseProvider
+
+from pyBaseSwap import BaseSwap
+from pyBaseSwap.TokenHandle import TokenHandle
+
+TOKENS = [Web3.to_checksum_address("0x" + "%02x" % byte * 20) for byte in range(1, 9)]
+WALLET = Web3.to_checksum_address("0x" + "ee" * 20)
+SELECTORS = {Web3.keccak(text=f"{name}(address)")[:4]: name for name in ("getUSDPrice", "balanceOf")}
+
+
+class FakeNode(BaseProvider):
+    """
+    A Base node that prices every token at its first address byte in USD and gives every wallet
+    a balance of the token's first address byte, recording the calls as (to, name, argument).
+    """
+
+    def __init__(self):
+        super().__init__()
+        self.calls = []
+        self._lock = threading.Lock()
+
+    def make_request(self, method, params):
+        if method == "eth_chainId":
+            return {"jsonrpc": "2.0", "id": 1, "result": hex(8453)}
+        data = HexBytes(params[0]["data"])
+        name, (argument,) = SELECTORS[data[:4]], abi.decode(["address"], data[4:])
+        with self._lock:
+            self.calls.append((Web3.to_checksum_address(params[0]["to"]), name, Web3.to_checksum_address(argument)))
+        token = Web3.to_checksum_address(argument if name == "getUSDPrice" else params[0]["to"])
+        value = int(token[2:4], 16) * (10**6 if name == "getUSDPrice" else 1)
+        return {"jsonrpc": "2.0", "id": 1, "result": "0x" + abi.encode(["uint256"], [value]).hex()}
+
+
+@pytest.fixture
+def client(monkeypatch, tmp_path):
+    node = FakeNode()
+
+    def connect(self):
+        self.blockCache = None
+        return Web3(node)
+
+    monkeypatch.setattr(BaseSwap, "connect", connect)
+    bs = BaseSwap(TOKENS[0], str(tmp_path / "Settings.json"))
+    bs.node = node
+    return bs
+
+
+def test_handle_reads_its_own_token_and_leaves_the_client_alone(client):
+    handle = client.tokenHandle(TOKENS[1].lower())
+    assert isinstance(handle, TokenHandle) and handle.token == TOKENS[1]
+    assert handle.getUSDPrice() == Decimal(2)
+    assert handle.get_token_balance_(WALLET) == 2
+    assert client.token == TOKENS[0] and client.getUSDPrice() == Decimal(1)
+    assert client.node.calls[:2] == [(client.chain.BTTSwapper, "getUSDPrice", TOKENS[1]), (TOKENS[1], "balanceOf", WALLET)]
+
+
+def test_handles_are_bound_to_one_token(client):
+    handle = client.tokenHandle(TOKENS[1])
+    with pytest.raises(TypeError):
+        handle.changeToken(TOKENS[2])
+    with pytest.raises(AttributeError):
+        handle.token = TOKENS[2]
+    assert handle.token == TOKENS[1]
+
+
+def test_handles_share_the_client_state(client):
+    handle = client.tokenHandle(TOKENS[1])
+    assert handle.w3 is client.w3 and handle.w3U is client and handle.BTTSwapper is client.BTTSwapper
+    instance = handle.token_Instance
+    client.reload()  # New connection, the handle follows it
+    assert handle.w3 is client.w3 and handle.token_Instance is not instance
+    assert handle.token_Instance.address == TOKENS[1]
+
+
+def test_handles_trade_different_tokens_in_parallel(client):
+    prices = {}
+
+    def read(token):
+        prices[token] = client.tokenHandle(token).getUSDPrice()
+
+    threads = [threading.Thread(target=read, args=(token,)) for token in TOKENS]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert prices == {token: Decimal(int(token[2:4], 16)) for token in TOKENS}
+    assert client.token == TOKENS[0]
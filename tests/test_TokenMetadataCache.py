@@ -0,0 +1,63 @@
+import json
+from types import SimpleNamespace
+
+import pytest
+from web3 import Web3
+
+from pyBaseSwap import TokenMetadataCache as TokenMetadataCacheModule
+from pyBaseSwap.TokenMetadataCache import TokenMetadataCache
+
+USDC = Web3.to_checksum_address("0x833589fcd6edb6e08f4c7c32d4f71b54bda02913")
+TOKEN = Web3.to_checksum_address("0x" + "ab" * 20)
+
+
+def test_fields_are_kept_per_chain_and_merged():
+    cache = TokenMetadataCache()
+    cache.set(8453, USDC.lower(), decimals=6)
+    cache.set(8453, USDC, symbol="USDC", name=None)  # None never overwrites
+    assert [cache.get(8453, USDC, field) for field in TokenMetadataCache.FIELDS] == [6, None, "USDC"]
+    assert cache.get(1, USDC, "decimals") is None
+    assert cache.missing(8453, [USDC, TOKEN], ("decimals", "symbol")) == [TOKEN]
+    assert cache.missing(8453, [USDC]) == [USDC]  # The name is still unknown
+
+
+@pytest.mark.parametrize("name", ["metadata.json", "metadata.db"])
+def test_entries_survive_a_restart(tmp_path, name):
+    path = str(tmp_path / name)
+    TokenMetadataCache(path).update(8453, {USDC: {"decimals": 6, "name": "USD Coin", "symbol": "USDC"}, TOKEN: {"decimals": 18}})
+    cache = TokenMetadataCache(path)
+    assert cache.get(8453, USDC, "name") == "USD Coin"
+    assert cache.get(8453, TOKEN, "decimals") == 18
+
+
+def test_json_store_layout(tmp_path):
+    path = tmp_path / "metadata.json"
+    TokenMetadataCache(str(path)).set(8453, USDC, decimals=6)
+    assert json.loads(path.read_text()) == {"8453": {USDC: {"decimals": 6}}}
+
+
+def test_unreadable_json_store_starts_empty(tmp_path):
+    path = tmp_path / "metadata.json"
+    path.write_text("{not json")
+    assert TokenMetadataCache(str(path)).get(8453, USDC, "decimals") is None
+
+
+def test_prefetch_reads_only_uncached_tokens_in_one_multicall(monkeypatch):
+    batches = []
+
+    class FakeMulticall:
+        def __init__(self, w3, chain):
+            pass
+
+        def aggregate(self, calls):
+            batches.append([(target, name) for target, _, name, _, _ in calls])
+            return [{"decimals": 18, "name": "Token", "symbol": "TKN"}[name] for _, _, name, _, _ in calls]
+
+    monkeypatch.setattr(TokenMetadataCacheModule, "Multicall", FakeMulticall)
+    cache = TokenMetadataCache()
+    cache.set(8453, USDC, decimals=6, name="USD Coin", symbol="USDC")
+    chain = SimpleNamespace(chainID=8453)
+    cache.prefetch(None, chain, [USDC, TOKEN.lower()])
+    cache.prefetch(None, chain, [USDC, TOKEN])  # Everything cached now, no read
+    assert batches == [[(TOKEN, "decimals"), (TOKEN, "name"), (TOKEN, "symbol")]]
+    assert cache.get(8453, TOKEN, "symbol") == "TKN"
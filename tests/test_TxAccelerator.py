@@ -0,0 +1,80 @@
+from types import SimpleNamespace
+
+from pyBaseSwap.TxAccelerator import TxAccelerator
+
+
+class FakeW3U:
+    """
+    The settings and `MaxTXFeeETH` check `TxAccelerator` reads from `W3Utils`.
+    """
+
+    def __init__(self, accelerate=2, max_fee_eth=1.0):
+        self.settings = SimpleNamespace(settings={"Accelerate": accelerate, "MaxTXFeeETH": max_fee_eth})
+
+    def checkGasCost(self, gas, gas_price, overhead=True):
+        cost = gas * gas_price / 10**18
+        return gas, cost, cost <= self.settings.settings["MaxTXFeeETH"]
+
+
+def eip1559(tip=100, fee=1000):
+    return {"nonce": 7, "gas": 100000, "maxPriorityFeePerGas": tip, "maxFeePerGas": fee, "data": "0x01"}
+
+
+def test_due_after_the_configured_blocks_and_again_after_each_replacement():
+    accelerator = TxAccelerator(FakeW3U(accelerate=2))
+    accelerator.watch("swap", eip1559())
+    assert accelerator.due(100) == []  # First seen
+    assert accelerator.due(101) == []
+    assert accelerator.due(102) == ["swap"]
+    assert accelerator.due(103) == []
+    assert accelerator.due(104) == ["swap"]
+
+
+def test_due_is_empty_when_disabled():
+    accelerator = TxAccelerator(FakeW3U(accelerate=0))
+    accelerator.watch("swap", eip1559())
+    assert accelerator.due(100) == accelerator.due(200) == []
+
+
+def test_due_stops_after_max_bumps():
+    accelerator = TxAccelerator(FakeW3U(accelerate=1), maxBumps=2)
+    accelerator.watch("swap", eip1559())
+    accelerator.due(0)
+    for head in (1, 2):
+        assert accelerator.due(head) == ["swap"]
+        assert accelerator.replace("swap") is not None
+    assert accelerator.due(3) == []
+
+
+def test_replace_bumps_fees_by_at_least_the_bump():
+    accelerator = TxAccelerator(FakeW3U(), bump=0.125)
+    accelerator.watch("swap", eip1559(tip=100, fee=1000))
+    txn, gas = accelerator.replace("swap")
+    assert (txn["maxPriorityFeePerGas"], txn["maxFeePerGas"]) == (113, 1125)  # ceil(x * 1.125)
+    assert (txn["nonce"], txn["gas"], txn["data"]) == (7, 100000, "0x01")
+    assert gas[2]
+    txn, _ = accelerator.replace("swap")  # Bumps from the last replacement
+    assert (txn["maxPriorityFeePerGas"], txn["maxFeePerGas"]) == (128, 1266)
+
+
+def test_replace_bumps_tiny_fees_by_at_least_one_wei():
+    accelerator = TxAccelerator(FakeW3U())
+    accelerator.watch("swap", {"nonce": 1, "gas": 21000, "gasPrice": 1})
+    txn, _ = accelerator.replace("swap")
+    assert txn["gasPrice"] == 2
+
+
+def test_replace_follows_higher_current_fees():
+    accelerator = TxAccelerator(FakeW3U())
+    accelerator.watch("swap", eip1559(tip=100, fee=1000))
+    txn, _ = accelerator.replace("swap", {"maxPriorityFeePerGas": 500, "maxFeePerGas": 400})
+    assert txn["maxPriorityFeePerGas"] == 500
+    assert txn["maxFeePerGas"] == 1125  # Never below the tip, never below the bump
+
+
+def test_replace_above_max_fee_stops_watching():
+    accelerator = TxAccelerator(FakeW3U(max_fee_eth=0.0001))
+    accelerator.watch("swap", {"nonce": 1, "gas": 100000, "gasPrice": 10**9})  # 0.0001 ETH
+    assert accelerator.replace("swap") is None
+    assert len(accelerator) == 0
+    assert accelerator.replace("unknown") is None
@@ -0,0 +1,90 @@
+import itertools
+from types import SimpleNamespace
+
+from hexbytes import HexBytes
+from web3 import Web3
+
+from pyBaseSwap.W3Utils import W3Utils
+from pyBaseSwap.WalletIndex import WalletIndex
+
+TRANSFER = Web3.keccak(text="Transfer(address,address,uint256)")
+WALLETS = [Web3.to_checksum_address("0x" + byte * 20) for byte in ("11", "22", "33")]
+TOKENS = [Web3.to_checksum_address("0x" + byte * 20) for byte in ("a1", "a2", "a3", "a4")]
+CHAIN_IDS = itertools.count(9101)  # One chain per node, scans stay apart in the shared wallet index
+
+
+def topic(wallet):
+    return HexBytes("0x" + wallet[2:].lower().rjust(64, "0"))
+
+
+class FakeEth:
+    """
+    Serves the Transfer logs of `transfers` ((block, token, recipient) tuples) to the recipients in the
+    OR list of the third topic, and records every query as (fromBlock, toBlock, recipients).
+    """
+
+    def __init__(self, transfers, block_number=1000):
+        self.transfers, self.block_number, self.chain_id = transfers, block_number, next(CHAIN_IDS)
+        self.queries = []
+
+    def get_logs(self, params):
+        start, end = int(params["fromBlock"], 16), int(params["toBlock"], 16)
+        recipients = params["topics"][2] if isinstance(params["topics"][2], list) else [params["topics"][2]]
+        self.queries.append((start, end, len(recipients)))
+        return [
+            {"address": token, "blockNumber": block, "logIndex": 0, "topics": [TRANSFER, topic(WALLETS[0]), topic(recipient)]}
+            for block, token, recipient in self.transfers
+            if start <= block <= end and Web3.to_hex(topic(recipient)) in recipients
+        ]
+
+
+def utils(eth):
+    return W3Utils(SimpleNamespace(settings={}), SimpleNamespace(eth=eth, keccak=Web3.keccak))
+
+
+TRANSFERS = [(950, TOKENS[0], WALLETS[0]), (960, TOKENS[1], WALLETS[1]), (970, TOKENS[0], WALLETS[1]), (10, TOKENS[2], WALLETS[2])]
+
+
+def test_logs_are_sorted_back_to_their_wallets():
+    eth = FakeEth(TRANSFERS)
+    tokens = utils(eth).getWalletsTokens(WALLETS, blocks_to_check=500)
+    assert tokens == {WALLETS[0]: [TOKENS[0]], WALLETS[1]: [TOKENS[1], TOKENS[0]], WALLETS[2]: []}  # Block 10 is out of range
+    assert eth.queries == [(500, 1000, 3)]  # One query for all wallets
+
+
+def test_wallets_are_queried_in_chunks():
+    eth = FakeEth(TRANSFERS)
+    utils(eth).getWalletsTokens([wallet.lower() for wallet in WALLETS], blocks_to_check=500, chunk_size=2)
+    assert eth.queries == [(500, 1000, 2), (500, 1000, 1)]
+
+
+def test_scanned_wallets_only_fetch_the_new_blocks():
+    eth = FakeEth(TRANSFERS)
+    utils(eth).getWalletTokens(WALLETS[0], blocks_to_check=500)
+    eth.block_number = 1100
+    eth.transfers.append((1050, TOKENS[3], WALLETS[0]))
+    eth.queries.clear()
+    tokens = utils(eth).getWalletsTokens(WALLETS[:2], blocks_to_check=600)
+    assert tokens[WALLETS[0]] == [TOKENS[0], TOKENS[3]]  # Kept from the first scan plus the new transfer
+    assert eth.queries == [(1000 - WalletIndex.REORG_BLOCKS + 1, 1100, 1), (500, 1100, 1)]  # The fresh wallet is scanned in full
+
+
+def test_iter_wallet_tokens_yields_each_token_as_its_window_arrives():
+    eth = FakeEth([(100, TOKENS[0], WALLETS[0]), (150, TOKENS[0], WALLETS[0]), (900, TOKENS[1], WALLETS[0])])
+    tokens = utils(eth).iterWalletTokens(WALLETS[0], batch_size=100, blocks_to_check=1000, concurrency=1)
+    assert next(tokens) == TOKENS[0]
+    assert eth.queries[-1][1] < 900  # The rest of the range is not fetched yet
+    assert list(tokens) == [TOKENS[1]]  # Each token once
+
+
+def test_iter_wallet_tokens_starts_with_the_indexed_tokens_and_records_the_scan():
+    eth = FakeEth([(950, TOKENS[0], WALLETS[0])])
+    assert list(utils(eth).iterWalletTokens(WALLETS[0], blocks_to_check=500)) == [TOKENS[0]]
+    eth.block_number = 1100
+    eth.transfers.append((1050, TOKENS[1], WALLETS[0]))
+    eth.queries.clear()
+    tokens = utils(eth).iterWalletTokens(WALLETS[0], blocks_to_check=600)
+    assert next(tokens) == TOKENS[0]
+    assert eth.queries == []  # Known from the wallet index, nothing fetched yet
+    assert list(tokens) == [TOKENS[1]]
+    assert eth.queries == [(1000 - WalletIndex.REORG_BLOCKS + 1, 1100, 1)]
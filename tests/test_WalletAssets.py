@@ -0,0 +1,86 @@
+import csv
+import io
+import importlib.util
+from decimal import Decimal
+
+import pytest
+
+from pyBaseSwap.WalletAssets import WalletAsset, WalletAssets
+
+ETH = 10**18
+
+
+def wallet():
+    """
+    Returns a wallet priced at 2000 USD per ETH: 1000 USDC (0.5 ETH each), 2 WETH (1 ETH each) and 0.5 ETH.
+    """
+    assets = WalletAssets(2000)
+    assets.extend((
+        ["0xUSDC", "0xWETH"], ["USD Coin", "Wrapped Ether"], ["USDC", "WETH"], [6, 18], [3, 2],
+        [1000 * 10**6, 2 * ETH], [10**6, 2000 * 10**6], [ETH // 2000, ETH],
+    ))
+    assets.append_native(ETH // 2)
+    return assets
+
+
+def test_rows_read_like_token_data_dicts():
+    assets = wallet()
+    usdc = assets[0]
+    assert (usdc["Symbol"], usdc["Decimals"], usdc["UniswapV"], usdc.Balance) == ("USDC", 6, 3, Decimal(1000))
+    assert usdc["BalanceUSD"] == pytest.approx(1000.0)
+    assert assets[-1].to_dict()["Address"] == WalletAssets.NATIVE
+    assert set(assets[0].to_dict()) == set(WalletAsset.KEYS)
+    assert [row.Symbol for row in assets[1:]] == ["WETH", "ETH"]
+    with pytest.raises(IndexError):
+        assets[3]
+    with pytest.raises(KeyError):
+        assets[0]["Price"]
+
+
+def test_sort_orders_by_value_and_keeps_the_columns_aligned():
+    assets = wallet().sort()
+    assert [row.Symbol for row in assets] == ["WETH", "USDC", "ETH"]
+    assert [row.Decimals for row in assets] == [18, 6, 18]
+    assert [assets.value_wei(i) for i in range(3)] == [2 * ETH, ETH // 2, ETH // 2]
+    assert assets.sort(reverse=False)[-1].Symbol == "WETH"
+
+
+def test_total_usd_sums_exact_wei_values():
+    assert wallet().total_usd() == pytest.approx(3 * 2000.0)
+
+
+def test_decimals_above_255_are_kept():
+    assets = WalletAssets(2000)
+    assets.append("0xODD", "Odd", "ODD", 300, 2, 10**300, 0, ETH)
+    assert assets[0].Decimals == 300 and assets.value_wei(0) == ETH
+
+
+def test_to_csv_writes_one_column_per_key():
+    out = io.StringIO()
+    wallet().sort().to_csv(out)
+    rows = list(csv.DictReader(io.StringIO(out.getvalue())))
+    assert tuple(rows[0]) == WalletAsset.KEYS
+    assert [row["Symbol"] for row in rows] == ["WETH", "USDC", "ETH"]
+    assert rows[1]["BalanceWei"] == str(1000 * 10**6) and float(rows[1]["BalanceUSD"]) == pytest.approx(1000.0)
+
+
+def test_to_csv_to_a_path(tmp_path):
+    path = tmp_path / "wallet.csv"
+    wallet().to_csv(str(path))
+    assert path.read_text().splitlines()[0] == ",".join(WalletAsset.KEYS)
+
+
+@pytest.mark.skipif(importlib.util.find_spec("pyarrow") is not None, reason="pyarrow is installed")
+def test_to_parquet_names_the_missing_dependency(tmp_path):
+    with pytest.raises(ImportError, match="pip install pyarrow"):
+        wallet().to_parquet(str(tmp_path / "wallet.parquet"))
+
+
+def test_to_parquet_writes_the_columns_of_to_csv(tmp_path):
+    parquet = pytest.importorskip("pyarrow.parquet")
+    path = str(tmp_path / "wallet.parquet")
+    wallet().sort().to_parquet(path)
+    table = parquet.read_table(path)
+    assert tuple(table.column_names) == WalletAsset.KEYS
+    assert table.column("BalanceWei").to_pylist()[0] == str(2 * ETH)
+    assert table.column("USDPrice").to_pylist()[0] == pytest.approx(2000.0)
@@ -0,0 +1,54 @@
+from web3 import Web3
+
+from pyBaseSwap.WalletIndex import WalletIndex
+
+WALLET = Web3.to_checksum_address("0x" + "11" * 20)
+TOKEN = Web3.to_checksum_address("0x" + "ab" * 20)
+REORG = WalletIndex.REORG_BLOCKS
+
+
+def scanned(from_block, to_block):
+    index = WalletIndex()
+    index.record(8453, WALLET, from_block, to_block, {})
+    return index
+
+
+def test_unscanned_wallet_misses_the_whole_range():
+    assert WalletIndex().missing(8453, WALLET, 100, 200) == [(100, 200)]
+
+
+def test_scanned_wallet_only_misses_new_blocks_and_the_reorg_margin():
+    assert scanned(100, 200).missing(8453, WALLET, 100, 250) == [(200 - REORG + 1, 250)]
+
+
+def test_deeper_scan_adds_the_older_range():
+    assert scanned(100, 200).missing(8453, WALLET, 50, 250) == [(50, 99), (200 - REORG + 1, 250)]
+
+
+def test_range_inside_a_young_checkpoint_is_rescanned_from_its_start():
+    assert scanned(100, 105).missing(8453, WALLET, 100, 105) == [(100, 105)]
+
+
+def test_disjoint_range_is_scanned_in_full():
+    index = scanned(100, 200)
+    assert index.missing(8453, WALLET, 300, 400) == [(300, 400)]
+    assert index.missing(8453, WALLET, 10, 50) == [(10, 50)]
+
+
+def test_checkpoints_are_kept_per_chain():
+    assert scanned(100, 200).missing(1, WALLET, 100, 200) == [(100, 200)]
+
+
+def test_adjacent_scans_extend_the_checkpoint():
+    index = scanned(100, 200)
+    index.record(8453, WALLET, 201, 300, {TOKEN.lower(): 250})
+    assert index.checkpoint(8453, WALLET) == (100, 300)
+    assert index.tokens(8453, WALLET, since_block=250) == [TOKEN]
+
+
+def test_record_persists_to_sqlite(tmp_path):
+    path = str(tmp_path / "wallets.db")
+    WalletIndex(path).record(8453, WALLET, 100, 200, {TOKEN: 150})
+    index = WalletIndex(path)
+    assert index.missing(8453, WALLET, 100, 200) == [(200 - REORG + 1, 200)]
+    assert index.tokens(8453, WALLET) == [TOKEN]